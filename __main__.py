@@ -1,57 +1,158 @@
 import argparse
 import sys
-from src.tools.create_character import main as create_character
-from src.tools.generate_complete_character import generate_complete_character
-from src.tools.character_card import main as create_card
-from src.tools.chat_interface import main as chat_interface
+
+# Command implementations are imported inside their branch so that e.g. `help`
+# doesn't pay for importing the LLM, web and image stacks.
 
 def show_help():
     print("vibe-seeder - LLM-based role-playing characters with mood & randomness control")
     print("\nCommands:")
     print("  character   - Create a new character with OCEAN traits")
     print("  complete    - Create a complete character with card (recommended)")
+    print("  bulk        - Generate many characters with cards concurrently (resumable)")
     print("  card        - Generate a card for an existing character")
     print("  chat        - Chat with a character (with memory/RAG)")
     print("  web         - Start web interface for character creation")
+    print("  migrate-logs - Convert legacy .json logs to append-only JSON Lines")
+    print("  migrate-storage - Copy characters, memories and logs into SQLite")
+    print("  importtime  - Check module import times against their budgets")
+    print("  benchmark   - Run the end-to-end benchmark suite (JSON report)")
+    print("  fake-llm    - Serve a fake OpenAI-compatible LLM API for offline runs")
     print("  help        - Show this help message")
     print("\nExample usage:")
     print("  python -m vibe-seeder complete")
+    print("  python -m vibe-seeder bulk 200 --workers 8 --seed 1234")
     print("  python -m vibe-seeder chat")
     print("  python -m vibe-seeder web")
     print("  python -m vibe-seeder card data/characters/emma_frost.json")
+    print("  python -m vibe-seeder migrate-storage data/vibe.db")
+    print("  python -m vibe-seeder benchmark --quick -o bench.json")
+    print("\nOptions (any command):")
+    print("  --profile          Profile the command with cProfile (prints the top functions)")
+    print("  --profile-out FILE Where to save the profile (default logs/profiles/<command>-<time>.prof)")
+    print("  --trace FILE       Record chat pipeline spans (.json: Chrome trace, else JSON Lines)")
+    print("\n  python -m vibe-seeder chat --profile --trace logs/chat_trace.json")
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="vibe-seeder CLI", add_help=False)
-    parser.add_argument('command', nargs='?', default='help', help='Command to run')
-    parser.add_argument('args', nargs='*', help='Additional arguments')
-    
-    args = parser.parse_args()
-    
-    if args.command == 'character':
-        sys.argv = [sys.argv[0]] + args.args
+
+def run_command(command: str, command_args: list):
+    """Run one CLI command with its own arguments"""
+    if command == 'character':
+        from src.tools.create_character import main as create_character
+        sys.argv = [sys.argv[0]] + command_args
         create_character()
-    elif args.command == 'complete':
-        sys.argv = [sys.argv[0]] + args.args
+    elif command == 'complete':
+        from src.tools.generate_complete_character import generate_complete_character
+        sys.argv = [sys.argv[0]] + command_args
         generate_complete_character()
-    elif args.command == 'card':
-        if not args.args:
+    elif command == 'bulk':
+        from src.tools.bulk_generate import main as bulk_generate
+        sys.argv = [sys.argv[0]] + command_args
+        bulk_generate()
+    elif command == 'card':
+        if not command_args:
             print("Error: Please provide a character file path")
             print("Example: python -m vibe-seeder card data/characters/character_name.json")
             sys.exit(1)
-        sys.argv = [sys.argv[0]] + args.args
+        from src.tools.character_card import main as create_card
+        sys.argv = [sys.argv[0]] + command_args
         create_card()
-    elif args.command == 'chat':
-        sys.argv = [sys.argv[0]] + args.args
+    elif command == 'chat':
+        from src.tools.chat_interface import main as chat_interface
+        sys.argv = [sys.argv[0]] + command_args
         chat_interface()
-    elif args.command == 'web':
-        # Import here to avoid circular imports
+    elif command == 'web':
         from src.api.main import start as start_web
         start_web()
-    elif args.command == 'help' or args.command == '--help':
+    elif command == 'migrate-logs':
+        from src.utils.logger import migrate_logs
+        for log_path in migrate_logs():
+            print(f"Migrated {log_path}")
+    elif command == 'migrate-storage':
+        from src.storage.storage_loader import migrate_to_sqlite
+        counts = migrate_to_sqlite(command_args[0] if command_args else None)
+        print(f"Migrated {counts['characters']} characters, {counts['memories']} memories "
+              f"and {counts['log_entries']} log entries to SQLite")
+        print("Set VIBE_STORAGE=sqlite to use it")
+    elif command == 'importtime':
+        from src.tools.import_benchmark import main as import_benchmark
+        sys.argv = [sys.argv[0]] + command_args
+        import_benchmark()
+    elif command == 'benchmark':
+        from src.tools.benchmark import main as benchmark
+        sys.argv = [sys.argv[0]] + command_args
+        benchmark()
+    elif command == 'fake-llm':
+        from src.tools.fake_llm_server import main as fake_llm_server
+        sys.argv = [sys.argv[0]] + command_args
+        fake_llm_server()
+    elif command == 'help' or command == '--help':
         show_help()
     else:
-        print(f"Unknown command: {args.command}")
+        print(f"Unknown command: {command}")
         show_help()
         sys.exit(1)
+
+
+def pop_global_options(argv: list) -> tuple:
+    """
+    Remove --profile, --profile-out and --trace from `argv`, wherever they
+    appear (options after the command are otherwise passed on to it).
+
+    Returns:
+        (remaining arguments, {"profile": bool, "profile_out": str, "trace": str})
+    """
+    options = {"profile": False, "profile_out": None, "trace": None}
+    remaining = []
+    args = iter(argv)
+    for arg in args:
+        name, sep, value = arg.partition("=")
+        if arg == "--profile":
+            options["profile"] = True
+        elif name in ("--profile-out", "--trace"):
+            key = name[2:].replace("-", "_")
+            options[key] = value if sep else next(args, None)
+            if key == "profile_out":
+                options["profile"] = True
+        else:
+            remaining.append(arg)
+    return remaining, options
+
+
+def run_profiled(command: str, command_args: list, output_path: str = None):
+    """Run a command under cProfile, save the stats and print the most expensive calls"""
+    import cProfile
+    import pstats
+    import time
+    from pathlib import Path
+
+    if output_path is None:
+        output_path = str(Path("logs") / "profiles" / f"{command}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(run_command, command, command_args)
+    finally:
+        # Also on Ctrl+C, which is how chat and web usually end
+        profiler.dump_stats(output_path)
+        print(f"\nProfile saved to {output_path} (inspect with: python -m pstats {output_path})", file=sys.stderr)
+        pstats.Stats(output_path, stream=sys.stderr).sort_stats("cumulative").print_stats(20)
+
+
+if __name__ == "__main__":
+    argv, options = pop_global_options(sys.argv[1:])
+    parser = argparse.ArgumentParser(description="vibe-seeder CLI", add_help=False)
+    parser.add_argument('command', nargs='?', default='help', help='Command to run')
+    # REMAINDER passes options such as --workers through to the command
+    parser.add_argument('args', nargs=argparse.REMAINDER, help='Additional arguments')
     
-    
\ No newline at end of file
+    args = parser.parse_args(argv)
+
+    if options["trace"]:
+        from src.utils.tracing import tracer
+        tracer.enable(options["trace"])
+    
+    if options["profile"]:
+        run_profiled(args.command, args.args, options["profile_out"])
+    else:
+        run_command(args.command, args.args)
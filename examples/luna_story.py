@@ -13,6 +13,7 @@ def main():
 
         if user_input.lower() in ["exit", "quit"]:
             print("Ending chat with Luna.")
+            luna.end()
             break
 
         response = luna.chat(user_input)
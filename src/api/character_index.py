@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class CharacterSummary:
+    """What the listing endpoints need from one character file"""
+
+    def __init__(self, stem: str, character: Dict, mtime: float):
+        self.stem = stem
+        self.mtime = mtime
+        self.name = character.get("name", "Unknown")
+        self.traits = character.get("traits", [])
+        self.style = character.get("style", "")
+        self.core_seed = character.get("core_seed", "")
+        self.vibe_keywords = character.get("vibe_keywords", [])
+        self.has_image = False
+
+    @staticmethod
+    def normalize(terms: List) -> Set[str]:
+        """Lowercased terms, for filtering"""
+        return {term.strip().lower() for term in terms if isinstance(term, str)}
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "traits": self.traits,
+            "style": self.style,
+            "core_seed": self.core_seed,
+            "vibe_keywords": self.vibe_keywords,
+            "file": f"{self.stem}.json",
+            "file_stem": self.stem,
+            "has_image": self.has_image,
+        }
+
+
+class CharacterIndex:
+    """
+    In-memory index of the character catalog in `characters_dir`.
+
+    Built on first use and kept fresh by mtime checks: the directory's mtime
+    is checked on every read (catching added and removed files) and every
+    file's mtime at most every `rescan_interval` seconds (catching files
+    rewritten in place). Only changed files are re-read. The web API also
+    calls `invalidate()` after writing a character or card itself.
+
+    Listings are served from a sorted stem list and a trait/keyword
+    inverted index, so a page costs O(page) rather than O(catalog).
+    `version` changes whenever the catalog does, for ETags.
+    """
+
+    def __init__(self, characters_dir: str, rescan_interval: float = 5.0):
+        self.characters_dir = characters_dir
+        self.rescan_interval = rescan_interval
+        self._entries: Dict[str, CharacterSummary] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._sorted: List[str] = []
+        self._by_trait: Dict[str, Set[str]] = {}
+        self._by_keyword: Dict[str, Set[str]] = {}
+        self._dir_mtime: Optional[float] = None
+        self._last_scan = 0.0
+        self._dirty = True
+        self._lock = threading.Lock()
+        self._generation = f"{int(time.time()):x}"
+        self._changes = 0
+
+    @property
+    def version(self) -> str:
+        return f"{self._generation}.{self._changes}"
+
+    def invalidate(self) -> None:
+        """Force a rescan on the next read (after the API writes a character or card)"""
+        self._dirty = True
+
+    def _directory_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.characters_dir).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Bring the index up to date if the catalog may have changed.
+
+        Returns:
+            True if anything changed
+        """
+        dir_mtime = self._directory_mtime()
+        due = time.monotonic() - self._last_scan >= self.rescan_interval
+        if not (force or self._dirty or due or dir_mtime != self._dir_mtime):
+            return False
+
+        with self._lock:
+            self._dirty = False
+            self._last_scan = time.monotonic()
+            self._dir_mtime = dir_mtime
+            return self._scan()
+
+    def _scan(self) -> bool:
+        # Called with the lock held
+        json_files: Dict[str, float] = {}
+        cards: Set[str] = set()
+        if os.path.isdir(self.characters_dir):
+            with os.scandir(self.characters_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith("_card.png"):
+                        cards.add(entry.name[:-len("_card.png")])
+                    elif entry.name.endswith(".json") and entry.is_file():
+                        json_files[entry.name[:-len(".json")]] = entry.stat().st_mtime
+
+        # Copy on write: readers keep using the previous maps while this scan runs
+        entries = dict(self._entries)
+        changed = False
+        for stem in list(self._mtimes):
+            if stem not in json_files:
+                del self._mtimes[stem]
+                entries.pop(stem, None)
+                changed = True
+
+        for stem, mtime in json_files.items():
+            if self._mtimes.get(stem) == mtime:
+                continue
+            # Remember the mtime even for unreadable files so they aren't re-read every scan
+            self._mtimes[stem] = mtime
+            entries.pop(stem, None)
+            changed = True
+            try:
+                with open(os.path.join(self.characters_dir, f"{stem}.json"), 'r', encoding='utf-8') as f:
+                    character = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if isinstance(character, dict):
+                entries[stem] = CharacterSummary(stem, character, mtime)
+
+        for stem, summary in entries.items():
+            has_image = stem in cards
+            if summary.has_image != has_image:
+                summary.has_image = has_image
+                changed = True
+
+        if changed:
+            by_trait: Dict[str, Set[str]] = {}
+            by_keyword: Dict[str, Set[str]] = {}
+            for stem, summary in entries.items():
+                for trait in summary.normalize(summary.traits):
+                    by_trait.setdefault(trait, set()).add(stem)
+                for keyword in summary.normalize(summary.vibe_keywords):
+                    by_keyword.setdefault(keyword, set()).add(stem)
+            self._entries = entries
+            self._sorted = sorted(entries)
+            self._by_trait = by_trait
+            self._by_keyword = by_keyword
+            self._changes += 1
+        return changed
+
+    def get(self, stem: str) -> Optional[CharacterSummary]:
+        self.refresh()
+        return self._entries.get(stem)
+
+    def list_page(self, page: int = 1, per_page: int = 50, trait: Optional[str] = None,
+                  keyword: Optional[str] = None) -> Tuple[List[CharacterSummary], int]:
+        """
+        One page of characters sorted by file stem, optionally filtered.
+
+        Args:
+            page: 1-based page number
+            per_page: Page size
+            trait: Only characters with this trait (case-insensitive)
+            keyword: Only characters with this vibe keyword (case-insensitive)
+
+        Returns:
+            (characters on the page, total matching characters)
+        """
+        self.refresh()
+        entries = self._entries
+        stems = self._sorted
+        matching = None
+        for term, index in ((trait, self._by_trait), (keyword, self._by_keyword)):
+            if term:
+                found = index.get(term.strip().lower(), set())
+                matching = found if matching is None else matching & found
+        if matching is not None:
+            stems = sorted(matching)
+        start = max(0, (page - 1) * per_page)
+        return [entries[stem] for stem in stems[start:start + per_page] if stem in entries], len(stems)
+
+    def etag(self, *query) -> str:
+        """ETag for a listing: the catalog version plus the query that produced it"""
+        digest = hashlib.sha1(json.dumps(query).encode("utf-8")).hexdigest()[:12]
+        return f'W/"{self.version}-{digest}"'
@@ -0,0 +1,150 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+class CachedImage:
+    """An image file's bytes and strong ETag, valid while its mtime and size are unchanged"""
+
+    def __init__(self, data: bytes, mtime_ns: int, size: int, media_type: str):
+        self.data = data
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.media_type = media_type
+        self.digest = hashlib.sha1(data).hexdigest()
+        self.etag = f'"{self.digest}"'
+
+
+class ImageCache:
+    """
+    LRU of image bytes bounded by `max_bytes`, revalidated against the file's
+    mtime and size on every lookup so regenerated cards are picked up.
+
+    With `max_bytes` 0 nothing is kept and every lookup reads the file.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_item_bytes: int = 4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self._entries: "OrderedDict[str, CachedImage]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, path: str, media_type: str = "image/png") -> Optional[CachedImage]:
+        """
+        The image at `path`, from the cache if it is still current.
+
+        Returns:
+            The cached image, or None if the file does not exist
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self._entries.move_to_end(path)
+                self.stats["hits"] += 1
+                return entry
+            self.stats["misses"] += 1
+
+        with open(path, "rb") as f:
+            data = f.read()
+        entry = CachedImage(data, stat.st_mtime_ns, len(data), media_type)
+        if entry.size <= min(self.max_bytes, self.max_item_bytes):
+            self._store(path, entry)
+        return entry
+
+    def _store(self, path: str, entry: CachedImage) -> None:
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[path] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range `Range: bytes=...` header.
+
+    Returns:
+        Inclusive (start, end), or None if the header is malformed or names
+        several ranges (the full content is served then)
+
+    Raises:
+        ValueError: If the range is unsatisfiable
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(0, size - int(last))
+            end = size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise ValueError("unsatisfiable range")
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def image_response(request: Request, image: CachedImage, cache_control: str = "public, no-cache") -> Response:
+    """
+    Serve `image` honouring If-None-Match (304) and single byte ranges (206).
+
+    "no-cache" lets browsers keep the image but revalidate it on each view,
+    which costs a bodiless 304 while the card is unchanged.
+    """
+    headers: Dict[str, str] = {
+        "ETag": image.etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        if "*" in tags or image.etag in tags or f"W/{image.etag}" in tags:
+            return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == image.etag):
+        try:
+            byte_range = parse_range(range_header, image.size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{image.size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{image.size}"
+            return Response(image.data[start:end + 1], status_code=206, media_type=image.media_type, headers=headers)
+
+    return Response(image.data, media_type=image.media_type, headers=headers)
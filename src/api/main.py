@@ -1,26 +1,68 @@
-from fastapi import FastAPI, Request, Form, UploadFile, File, HTTPException, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, JSONResponse
+from fastapi import FastAPI, Request, Form, UploadFile, File, HTTPException, Depends, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, JSONResponse, StreamingResponse, Response, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool, iterate_in_threadpool
+from contextlib import asynccontextmanager
+from pydantic import BaseModel
 import uvicorn
 import os
+import asyncio
 import json
 import random
+import time
 from pathlib import Path
 from typing import Dict, List, Optional
-import base64
 from io import BytesIO
+from PIL import Image
 
 from src.tools.create_character import clean_output
-from src.generator.character_generator import generate_character
-from src.tools.character_card import create_character_card
+from src.generator.character_generator import generate_character_async
+from src.generator.async_llm_loader import async_manager
+from src.responder.prompt_builder import prompt_builder
+from src.responder.responder import generate_response, generate_response_stream, load_character, ChatSession
+from src.utils.logger import log_interaction, log_writer
+from src.memory.consolidation import consolidation_executor
+from src.tools.character_card import create_character_card, thumbnail_path, write_thumbnails, THUMBNAIL_WIDTHS
+from src.storage.storage_loader import save_character as store_character
+from src.api.sessions import SessionEntry, SessionRegistry
+from src.api.character_index import CharacterIndex
+from src.api.image_cache import CachedImage, ImageCache, image_response
+from src.utils.metrics import registry
+
+
+# Chat sessions kept between requests (LRU-bounded, expired when idle)
+sessions = SessionRegistry(
+    max_sessions=int(os.environ.get("VIBE_MAX_SESSIONS", 256)),
+    idle_timeout=float(os.environ.get("VIBE_SESSION_IDLE_TIMEOUT", 1800))
+)
+
+
+async def sweep_sessions(interval: float = 30):
+    """Periodically expire idle sessions and run idle consolidations"""
+    while True:
+        await asyncio.sleep(interval)
+        await run_in_threadpool(sessions.sweep)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the character index, sweep idle chat sessions while running; consolidate them and release pooled LLM connections on shutdown"""
+    await run_in_threadpool(character_index.refresh, True)
+    sweeper = asyncio.create_task(sweep_sessions())
+    yield
+    sweeper.cancel()
+    await run_in_threadpool(sessions.close_all)
+    await async_manager.close()
+
 
 # Create FastAPI app
 app = FastAPI(
     title="Vibe-Seeder Character Creator",
     description="Web interface for creating characters with OCEAN traits",
-    version="0.3"
+    version="0.3",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -32,6 +74,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+HTTP_IN_FLIGHT = registry.gauge("vibe_http_requests_in_flight", "HTTP requests being handled")
+HTTP_SECONDS = registry.histogram("vibe_http_request_seconds", "HTTP request latency (until the response starts)",
+                                  ["method", "route", "status"])
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Time every request, labelled by route template so per-character URLs share a series"""
+    started = time.perf_counter()
+    status = 500
+    HTTP_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        HTTP_SECONDS.labels(request.method, getattr(route, "path", "unmatched"), status).observe(
+            time.perf_counter() - started)
+
+
 # Create templates directory and templates object
 templates_path = Path("src/api/templates")
 templates_path.mkdir(parents=True, exist_ok=True)
@@ -44,10 +108,138 @@ static_path.mkdir(parents=True, exist_ok=True)
 templates = Jinja2Templates(directory=str(templates_path))
 app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
 
-# Make sure character data directory exists
+# The web catalog is served from these JSON files with any storage backend
+# (save_character keeps them written); chat loads characters from the backend
 characters_dir = Path("data/characters")
 characters_dir.mkdir(parents=True, exist_ok=True)
 
+# Listings are served from an in-memory index instead of reading every file per request
+character_index = CharacterIndex(str(characters_dir))
+
+MAX_PAGE_SIZE = 200
+
+# Hot card images kept in memory (VIBE_IMAGE_CACHE_MB=0 disables)
+image_cache = ImageCache(max_bytes=int(float(os.environ.get("VIBE_IMAGE_CACHE_MB", 32)) * 1024 * 1024))
+
+
+def hit_ratio(hits: int, misses: int) -> float:
+    return hits / (hits + misses) if hits + misses else 0.0
+
+
+def collect_app_metrics() -> List:
+    """Scrape-time values for state that already keeps its own counters"""
+    caches = []
+    if async_manager.cache is not None:
+        stats = async_manager.cache.stats
+        caches.append(("completion", stats["hits"] + stats["disk_hits"], stats["misses"]))
+    caches.append(("image", image_cache.stats["hits"], image_cache.stats["misses"]))
+    prompt_stats = prompt_builder.stats()
+    caches.append(("prompt_prefix", prompt_stats["prefix_hits"], prompt_stats["prefix_misses"]))
+
+    collected = [
+        ("vibe_cache_hit_ratio", "gauge", "Hits / lookups since startup, per cache",
+         [({"cache": name}, hit_ratio(hits, misses)) for name, hits, misses in caches]),
+        ("vibe_cache_lookups_total", "counter", "Cache lookups by cache and result",
+         [({"cache": name, "result": result}, count) for name, hits, misses in caches
+          for result, count in (("hit", hits), ("miss", misses))]),
+        ("vibe_prompt_reuse_ratio", "gauge", "Share of prompt text repeated from the previous turn",
+         [({}, prompt_stats["prompt_reuse_ratio"])]),
+        ("vibe_chat_sessions_active", "gauge", "Registered chat sessions", [({}, len(sessions))]),
+        ("vibe_chat_sessions_total", "counter", "Chat session lifecycle events",
+         [({"event": event}, count) for event, count in sessions.stats.items()]),
+    ]
+
+    log_stats = log_writer.stats()
+    collected.append(("vibe_log_queue_depth", "gauge", "Log entries waiting for the writer thread",
+                      [({}, log_stats.pop("pending"))]))
+    collected.append(("vibe_log_entries_total", "counter", "Background log writer events",
+                      [({"event": event}, count) for event, count in log_stats.items()]))
+
+    dispatcher = async_manager.dispatcher
+    if dispatcher is not None:
+        stats = dict(dispatcher.stats)
+        collected.append(("vibe_llm_dispatcher_max_queue", "gauge", "Deepest dispatcher queue seen",
+                          [({}, stats.pop("max_queue"))]))
+        collected.append(("vibe_llm_dispatcher_total", "counter", "LLM dispatcher events",
+                          [({"event": event}, count) for event, count in stats.items()]))
+    return collected
+
+
+registry.register_collector(collect_app_metrics)
+
+
+class ChatRequest(BaseModel):
+    """Body of a chat request (session_id continues a registered session)"""
+    message: str
+    seed: Optional[int] = None
+    session_id: Optional[str] = None
+
+
+class SessionRequest(BaseModel):
+    """Body of a session creation request"""
+    character: str
+
+
+def load_character_or_404(character_name: str) -> Dict:
+    """Load a character by file stem or raise a 404"""
+    file_path = characters_dir / f"{character_name}.json"
+    
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail="Character not found")
+    
+    # Empty when the storage backend has no such character or the file is unreadable
+    character = load_character(str(file_path))
+    if not character.get("name"):
+        raise HTTPException(status_code=404, detail="Character not found in storage")
+    return character
+
+
+def get_session_or_404(session_id: str, character_name: Optional[str] = None) -> SessionEntry:
+    """Look up a registered session (of `character_name`, if given) or raise a 404"""
+    entry = sessions.get(session_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    if character_name is not None and entry.character_slug != character_name:
+        raise HTTPException(status_code=404, detail="Session not found for this character")
+    return entry
+
+
+def session_links(entry: SessionEntry) -> Dict[str, str]:
+    return {
+        "self": f"/api/sessions/{entry.session_id}",
+        "messages": f"/api/sessions/{entry.session_id}/messages",
+        "websocket": f"/api/characters/{entry.character_slug}/chat/ws?session_id={entry.session_id}"
+    }
+
+
+def log_turn(chat_session: ChatSession, message: str) -> None:
+    """Log the turn that just completed in `chat_session`"""
+    result = chat_session.last_result
+    log_interaction(chat_session.character['name'], message, result.response, result.seed,
+                    memories_used=result.memories_used, memory_added=result.memory_added)
+
+
+async def stream_turn(chat_session: ChatSession, message: str, seed: Optional[int]):
+    """Run one streamed turn in the threadpool, yielding response chunks as they arrive"""
+    chunks = generate_response_stream(message, chat_session.character, chat_session, seed)
+    async for chunk in iterate_in_threadpool(chunks):
+        yield chunk
+    log_turn(chat_session, message)
+
+
+def character_links(file_stem: str) -> Dict[str, str]:
+    return {
+        "self": f"/api/characters/{file_stem}",
+        "download": f"/api/characters/{file_stem}/download",
+        "image": f"/api/characters/{file_stem}/image"
+    }
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Whether the client's cached copy (If-None-Match) is still current"""
+    if_none_match = request.headers.get("if-none-match", "")
+    return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
 
 def generate_ocean_profile() -> Dict[str, float]:
     """Generate random OCEAN personality profile"""
@@ -61,14 +253,8 @@ def generate_ocean_profile() -> Dict[str, float]:
 
 
 def save_character(character):
-    """Save character to file"""
-    filename = character["name"].lower().replace(" ", "_")
-    output_path = characters_dir / f"{filename}.json"
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(character, f, indent=2, ensure_ascii=False)
-    
-    return output_path
+    """Save character to the storage backend (and its catalog file)"""
+    return Path(store_character(character, str(characters_dir)))
 
 
 def create_character_image(character):
@@ -81,10 +267,20 @@ def create_character_image(character):
     return output_path
 
 
-def image_to_base64(image_path):
-    """Convert image to base64 for embedding in HTML"""
-    with open(image_path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode('utf-8')
+def load_thumbnail(card_path: Path, card: CachedImage, size: str) -> CachedImage:
+    """The `size` thumbnail of `card`, generating it if the card predates thumbnails or changed"""
+    path = thumbnail_path(str(card_path), size, card.digest)
+    thumbnail = image_cache.get(path)
+    if thumbnail is None:
+        write_thumbnails(Image.open(BytesIO(card.data)), str(card_path), card.digest, [size])
+        thumbnail = image_cache.get(path)
+    return thumbnail
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics in the Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -126,20 +322,19 @@ async def create_character(
             "neuroticism": max(0, min(1, neuroticism)),
         }
     
-    # Generate character
-    raw_result = generate_character(ocean)
+    # Generate character without blocking the event loop
+    raw_result = await generate_character_async(ocean)
     
     # Parse output
     character = clean_output(raw_result)
     
     # Save character
-    character_path = save_character(character)
-    
-    # Create character card
-    card_path = create_character_image(character)
+    character_path = await run_in_threadpool(save_character, character)
     
-    # Convert image to base64 for display
-    card_base64 = image_to_base64(card_path)
+    # Create character card (CPU-bound rendering runs in the threadpool)
+    card_path = await run_in_threadpool(create_character_image, character)
+    character_index.invalidate()
+    file_stem = character_path.stem
     
     return templates.TemplateResponse(
         "character_result.html",
@@ -147,8 +342,8 @@ async def create_character(
             "request": request,
             "character": character,
             "ocean": ocean,
-            "card_base64": card_base64,
-            "download_url": f"/api/characters/{character['name'].lower().replace(' ', '_')}/download"
+            "card_url": f"/api/characters/{file_stem}/image",
+            "download_url": f"/api/characters/{file_stem}/download"
         }
     )
 
@@ -184,73 +379,78 @@ async def download_character_image(character_name: str):
 
 
 @app.get("/api/characters", response_class=JSONResponse)
-async def list_characters_api():
-    """API endpoint to list all characters"""
-    characters = []
+async def list_characters_api(request: Request, page: int = 1, per_page: int = 50,
+                              trait: Optional[str] = None, keyword: Optional[str] = None):
+    """
+    API endpoint to list characters, a page at a time.
     
-    for file in characters_dir.glob("*.json"):
-        if file.is_file():
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    character = json.load(f)
-                    characters.append({
-                        "name": character.get("name", "Unknown"),
-                        "traits": character.get("traits", []),
-                        "file": file.name,
-                        "file_stem": file.stem,
-                        "has_image": (characters_dir / f"{file.stem}_card.png").exists(),
-                        "links": {
-                            "self": f"/api/characters/{file.stem}",
-                            "download": f"/api/characters/{file.stem}/download",
-                            "image": f"/api/characters/{file.stem}/image"
-                        }
-                    })
-            except json.JSONDecodeError:
-                continue
+    Filters by trait and/or vibe keyword. Responses carry an ETag; a request
+    with a matching If-None-Match gets 304 Not Modified.
+    """
+    page = max(1, page)
+    per_page = max(1, min(MAX_PAGE_SIZE, per_page))
+    await run_in_threadpool(character_index.refresh)
+    etag = character_index.etag("api", page, per_page, trait, keyword)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
     
-    return {"characters": characters}
+    summaries, total = character_index.list_page(page, per_page, trait, keyword)
+    characters = [{**summary.to_dict(), "links": character_links(summary.stem)} for summary in summaries]
+    return JSONResponse(
+        {"characters": characters, "page": page, "per_page": per_page, "total": total},
+        headers=headers
+    )
 
 
 @app.get("/characters", response_class=HTMLResponse)
-async def characters_page(request: Request):
-    """Web page to list all characters"""
-    characters = []
+async def characters_page(request: Request, page: int = 1, per_page: int = 24,
+                          trait: Optional[str] = None, keyword: Optional[str] = None):
+    """Web page to list characters, a page at a time"""
+    page = max(1, page)
+    per_page = max(1, min(MAX_PAGE_SIZE, per_page))
+    await run_in_threadpool(character_index.refresh)
+    etag = character_index.etag("html", page, per_page, trait, keyword)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
     
-    for file in characters_dir.glob("*.json"):
-        if file.is_file():
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    character = json.load(f)
-                    characters.append({
-                        "name": character.get("name", "Unknown"),
-                        "traits": character.get("traits", []),
-                        "style": character.get("style", ""),
-                        "core_seed": character.get("core_seed", ""),
-                        "file": file.name,
-                        "file_stem": file.stem,
-                        "has_image": (characters_dir / f"{file.stem}_card.png").exists()
-                    })
-            except json.JSONDecodeError:
-                continue
-    
-    return templates.TemplateResponse(
+    summaries, total = character_index.list_page(page, per_page, trait, keyword)
+    response = templates.TemplateResponse(
         "characters_list.html", 
-        {"request": request, "characters": characters}
+        {
+            "request": request,
+            "characters": [summary.to_dict() for summary in summaries],
+            "page": page,
+            "pages": max(1, -(-total // per_page)),
+            "per_page": per_page,
+            "total": total,
+            "trait": trait or "",
+            "keyword": keyword or ""
+        }
     )
+    response.headers.update(headers)
+    return response
 
 
 @app.get("/api/characters/{character_name}/image")
-async def get_character_image(character_name: str):
-    """Get character image for display in gallery"""
+async def get_character_image(request: Request, character_name: str, size: Optional[str] = None):
+    """
+    Get character image for display in gallery (ETag revalidation and byte ranges supported).
+    
+    ?size=small or ?size=medium serves a thumbnail instead of the full card.
+    """
+    if size is not None and size not in THUMBNAIL_WIDTHS:
+        raise HTTPException(status_code=400, detail=f"Unknown image size; use one of {', '.join(THUMBNAIL_WIDTHS)}")
     file_path = characters_dir / f"{character_name}_card.png"
     
-    if not file_path.exists():
+    image = await run_in_threadpool(image_cache.get, str(file_path))
+    if image is None:
         raise HTTPException(status_code=404, detail="Character image not found")
+    if size is not None:
+        image = await run_in_threadpool(load_thumbnail, file_path, image, size)
     
-    return FileResponse(
-        path=file_path,
-        media_type="image/png"
-    )
+    return image_response(request, image)
 
 
 @app.get("/api/characters/{character_name}", response_class=JSONResponse)
@@ -279,6 +479,126 @@ async def get_character(character_name: str):
         raise HTTPException(status_code=500, detail=f"Error loading character: {str(e)}")
 
 
+@app.post("/api/characters/{character_name}/chat/stream")
+async def stream_chat(character_name: str, chat_request: ChatRequest):
+    """
+    Chat with a character, forwarding response tokens as server-sent events.
+    
+    With a session_id the turn continues that session; otherwise it is a one-turn session.
+    """
+    entry = None
+    character = None
+    if chat_request.session_id:
+        entry = get_session_or_404(chat_request.session_id, character_name)
+    else:
+        character = await run_in_threadpool(load_character_or_404, character_name)
+    
+    async def event_stream():
+        if entry is not None:
+            lock, chat_session = entry.lock, entry.session
+        else:
+            # Created here so the finally below always releases it, even if the client disconnects
+            lock, chat_session = asyncio.Lock(), await run_in_threadpool(sessions.new_session, character)
+        try:
+            async with lock:
+                async for chunk in stream_turn(chat_session, chat_request.message, chat_request.seed):
+                    yield f"data: {json.dumps({'text': chunk}, ensure_ascii=False)}\n\n"
+            
+            # Final event carries the turn metadata (memories used, timings, token counts)
+            summary = chat_session.last_result.to_dict()
+            del summary["response"]
+            yield f"data: {json.dumps({'result': summary}, ensure_ascii=False)}\n\n"
+            yield "data: [DONE]\n\n"
+        finally:
+            if entry is None:
+                # One-turn session: summarize it off the request path
+                consolidation_executor.submit(sessions.finish, chat_session)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.post("/api/sessions", status_code=201)
+async def create_session(session_request: SessionRequest):
+    """Start a chat session with a character"""
+    character = await run_in_threadpool(load_character_or_404, session_request.character)
+    entry = await run_in_threadpool(sessions.create, session_request.character, character)
+    return {**entry.to_dict(), "links": session_links(entry)}
+
+
+@app.get("/api/sessions/{session_id}")
+async def get_session(session_id: str):
+    """Get a session's state"""
+    entry = get_session_or_404(session_id)
+    return {**entry.to_dict(), "links": session_links(entry)}
+
+
+@app.delete("/api/sessions/{session_id}")
+async def close_session(session_id: str):
+    """End a session; its pending conversation is summarized into memory in the background"""
+    if not sessions.close(session_id):
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return {"closed": session_id}
+
+
+@app.post("/api/sessions/{session_id}/messages")
+async def send_message(session_id: str, chat_request: ChatRequest):
+    """Send a message in a session and get the complete reply"""
+    entry = get_session_or_404(session_id)
+    async with entry.lock:
+        result = await run_in_threadpool(
+            generate_response, chat_request.message, entry.session.character, entry.session, chat_request.seed
+        )
+        log_turn(entry.session, chat_request.message)
+    return result.to_dict()
+
+
+@app.websocket("/api/characters/{character_name}/chat/ws")
+async def chat_websocket(websocket: WebSocket, character_name: str, session_id: Optional[str] = None):
+    """
+    Turn-by-turn chat over a websocket.
+    
+    Joins the session given by ?session_id= or starts a new one, announced as
+    {"session_id": ...}. Each client message {"message": ..., "seed": ...}
+    is answered by {"text": chunk} events and a final {"result": ...}.
+    """
+    await websocket.accept()
+    entry = sessions.get(session_id) if session_id else None
+    if entry is not None and entry.character_slug != character_name:
+        await websocket.close(code=4404, reason="Session not found for this character")
+        return
+    if entry is None:
+        try:
+            character = await run_in_threadpool(load_character_or_404, character_name)
+        except HTTPException:
+            await websocket.close(code=4404, reason="Character not found")
+            return
+        entry = await run_in_threadpool(sessions.create, character_name, character)
+    await websocket.send_json({"session_id": entry.session_id, "links": session_links(entry)})
+    
+    try:
+        while True:
+            try:
+                data = json.loads(await websocket.receive_text())
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                await websocket.send_json({"error": "expected a JSON object like {\"message\": \"...\"}"})
+                continue
+            message = data.get("message")
+            if not message:
+                await websocket.send_json({"error": "message is required"})
+                continue
+            
+            async with entry.lock:
+                entry.touch()
+                async for chunk in stream_turn(entry.session, message, data.get("seed")):
+                    await websocket.send_json({"text": chunk})
+                await websocket.send_json({"result": entry.session.last_result.to_dict()})
+    except WebSocketDisconnect:
+        # The session stays registered for reconnects until it expires
+        pass
+
+
 @app.get("/characters/{character_name}", response_class=HTMLResponse)
 async def view_character(request: Request, character_name: str):
     """View a specific character's details"""
@@ -291,12 +611,8 @@ async def view_character(request: Request, character_name: str):
         with open(file_path, 'r', encoding='utf-8') as f:
             character = json.load(f) 
         
-        # Check if character image exists
-        card_path = characters_dir / f"{character_name}_card.png"
-        card_base64 = ""
-        has_image = card_path.exists()
-        if has_image:
-            card_base64 = image_to_base64(card_path)
+        # The page links the image route, which browsers cache and revalidate
+        has_image = (characters_dir / f"{character_name}_card.png").exists()
         
         # Get OCEAN profile from character data
         ocean_data = character.get("ocean", {})
@@ -314,7 +630,6 @@ async def view_character(request: Request, character_name: str):
                 "request": request,
                 "character": character,
                 "ocean": ocean,
-                "card_base64": card_base64,
                 "has_image": has_image,
                 "file_stem": character_name,
                 "download_url": f"/api/characters/{character_name}/download"
@@ -0,0 +1,199 @@
+import time
+import uuid
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from src.memory.consolidation import ConsolidationPolicy, consolidation_executor
+from src.memory.memory_manager import MemoryManager
+from src.responder.responder import ChatSession
+
+
+class SessionEntry:
+    """A registered chat session and its bookkeeping"""
+
+    def __init__(self, session_id: str, character_slug: str, session: ChatSession):
+        self.session_id = session_id
+        self.character_slug = character_slug
+        self.session = session
+        self.created = time.time()
+        self.last_used = self.created
+        # Turns of one session run one at a time, in arrival order
+        self.lock = asyncio.Lock()
+        self.idle_consolidated = False
+
+    def touch(self) -> None:
+        self.last_used = time.time()
+        self.idle_consolidated = False
+
+    def to_dict(self) -> Dict:
+        return {
+            "session_id": self.session_id,
+            "character": self.character_slug,
+            "created": self.created,
+            "last_used": self.last_used,
+            "messages": len(self.session.conversation_history),
+            "stats": dict(self.session.stats)
+        }
+
+
+class SessionRegistry:
+    """
+    Bounded in-memory registry of web chat sessions.
+
+    Holds at most `max_sessions` sessions, evicting the least recently used,
+    and expires sessions idle for `idle_timeout` seconds; evicted and expired
+    sessions are consolidated into memory on the consolidation worker.
+
+    All sessions of a character share one MemoryManager, whose lock
+    serializes memory writes, so concurrent users of the same character
+    never race on memory ids or duplicate checks. Managers are reference
+    counted by the sessions using them; once none do, at most
+    `max_idle_managers` are kept (least recently used first out) so a
+    returning character doesn't reload its memories. The policy's idle
+    consolidation runs from `sweep()` instead of a timer thread per session.
+    """
+
+    def __init__(self, max_sessions: int = 256, idle_timeout: float = 1800,
+                 policy: Optional[ConsolidationPolicy] = None, max_idle_managers: int = 32):
+        self.max_sessions = max_sessions
+        self.max_idle_managers = max_idle_managers
+        self.idle_timeout = idle_timeout
+        self.policy = policy or ConsolidationPolicy()
+        self._session_policy = ConsolidationPolicy(
+            every_n_turns=self.policy.every_n_turns,
+            token_budget=self.policy.token_budget,
+            idle_seconds=0,
+            on_session_end=self.policy.on_session_end,
+            duplicate_threshold=self.policy.duplicate_threshold
+        )
+        self._sessions: "OrderedDict[str, SessionEntry]" = OrderedDict()
+        self._memory_managers: "OrderedDict[str, MemoryManager]" = OrderedDict()
+        # Sessions (registered or not) using each manager
+        self._manager_refs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {"created": 0, "evicted": 0, "expired": 0, "closed": 0}
+
+    def _acquire_manager(self, name: str) -> MemoryManager:
+        """The MemoryManager shared by every session of character `name`, counting one more user"""
+        with self._lock:
+            memory_manager = self._memory_managers.get(name)
+            if memory_manager is not None:
+                self._memory_managers.move_to_end(name)
+                self._manager_refs[name] = self._manager_refs.get(name, 0) + 1
+                return memory_manager
+        # Loading memories reads disk; do it outside the registry lock
+        loaded = MemoryManager(name)
+        with self._lock:
+            memory_manager = self._memory_managers.setdefault(name, loaded)
+            self._memory_managers.move_to_end(name)
+            self._manager_refs[name] = self._manager_refs.get(name, 0) + 1
+        return memory_manager
+
+    def _release_manager(self, name: str) -> None:
+        """Drop one user of a manager, evicting unused managers beyond `max_idle_managers`"""
+        with self._lock:
+            refs = self._manager_refs.get(name, 0) - 1
+            if refs > 0:
+                self._manager_refs[name] = refs
+                return
+            self._manager_refs.pop(name, None)
+            idle = [key for key in self._memory_managers if key not in self._manager_refs]
+            for key in idle[:max(0, len(idle) - self.max_idle_managers)]:
+                del self._memory_managers[key]
+
+    def new_session(self, character: Dict) -> ChatSession:
+        """
+        A ChatSession using the shared memory manager, without registering it.
+
+        Pass it to `finish()` when done so the manager can be released.
+        """
+        memory_manager = self._acquire_manager(character['name'])
+        return ChatSession(character, policy=self._session_policy, memory_manager=memory_manager)
+
+    def finish(self, session: ChatSession) -> None:
+        """Consolidate what is left of a session and release its memory manager"""
+        try:
+            session.end_session()
+        finally:
+            self._release_manager(session.character['name'])
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, character_slug: str, character: Dict) -> SessionEntry:
+        """Create and register a session, evicting the least recently used one if full"""
+        entry = SessionEntry(uuid.uuid4().hex, character_slug, self.new_session(character))
+        evicted = []
+        with self._lock:
+            self._sessions[entry.session_id] = entry
+            self.stats["created"] += 1
+            while len(self._sessions) > self.max_sessions:
+                evicted.append(self._sessions.popitem(last=False)[1])
+                self.stats["evicted"] += 1
+        for old in evicted:
+            self._retire(old)
+        return entry
+
+    def get(self, session_id: str) -> Optional[SessionEntry]:
+        """Look up a session and mark it as recently used"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self._sessions.move_to_end(session_id)
+                entry.touch()
+        return entry
+
+    def close(self, session_id: str) -> bool:
+        """Remove a session and consolidate what is left of it"""
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None:
+                self.stats["closed"] += 1
+        if entry is None:
+            return False
+        self._retire(entry)
+        return True
+
+    def _retire(self, entry: SessionEntry) -> None:
+        consolidation_executor.submit(self.finish, entry.session)
+
+    def sweep(self) -> int:
+        """
+        Expire sessions idle longer than `idle_timeout` and consolidate those
+        idle longer than the policy's `idle_seconds`.
+
+        Returns:
+            Number of expired sessions
+        """
+        now = time.time()
+        expired: List[SessionEntry] = []
+        idle: List[SessionEntry] = []
+        with self._lock:
+            for session_id, entry in list(self._sessions.items()):
+                if entry.lock.locked():
+                    continue
+                idle_for = now - entry.last_used
+                if idle_for > self.idle_timeout:
+                    expired.append(self._sessions.pop(session_id))
+                    self.stats["expired"] += 1
+                elif self.policy.idle_seconds and idle_for > self.policy.idle_seconds and not entry.idle_consolidated:
+                    entry.idle_consolidated = True
+                    idle.append(entry)
+        for entry in expired:
+            self._retire(entry)
+        for entry in idle:
+            entry.session.consolidate_in_background()
+        return len(expired)
+
+    def close_all(self) -> None:
+        """Consolidate and drop every session (server shutdown)"""
+        with self._lock:
+            entries = list(self._sessions.values())
+            self._sessions.clear()
+        for entry in entries:
+            try:
+                self.finish(entry.session)
+            except Exception as e:
+                print(f"❌ Could not consolidate session {entry.session_id}: {e}")
@@ -1,7 +1,7 @@
 import json
 from src.persona.persona_loader import load_persona
 from src.seeder.seed_generator import generate_seed
-from src.responder.responder import generate_response
+from src.responder.responder import generate_response, ChatSession
 from src.utils.logger import log_interaction
 
 
@@ -10,6 +10,7 @@ class VibeCharacter:
         self.persona = load_persona(character_name)
         self.seed = self.persona.get("core_seed", None)
         self.name = self.persona["name"]
+        self.session = ChatSession(self.persona)
 
     def introduce(self):
         intro = f"Hi, I'm {self.name}."
@@ -24,9 +25,14 @@ class VibeCharacter:
         self.seed = generate_seed(self.persona)
 
         # Generate response based on enforced seed
-        response = generate_response(user_input, self.persona, self.seed)
+        result = generate_response(user_input, self.persona, self.session, seed=self.seed)
 
         # Log it
-        log_interaction(self.name, user_input, response, self.seed)
+        log_interaction(self.name, user_input, result.response, result.seed,
+                        memories_used=result.memories_used, memory_added=result.memory_added)
 
-        return response
+        return result.response
+
+    def end(self):
+        """Consolidate the remaining conversation into memory"""
+        self.session.end_session()
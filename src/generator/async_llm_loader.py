@@ -0,0 +1,87 @@
+import json
+import time
+import asyncio
+from typing import Optional
+
+from src.generator.backends import LLMBackend, LLMBackendError, OpenAICompatibleBackend
+from src.generator.completion_cache import CompletionCache
+from src.generator.connection_pool import AsyncHTTPConnectionPool
+from src.generator.dispatcher import LLMDispatcher
+from src.generator.llm_loader import LLM_IN_FLIGHT, BaseLLMManager, manager
+from src.utils.tracing import current_span, traced
+
+
+class AsyncLLMManager(BaseLLMManager):
+    """
+    asyncio counterpart of LLMManager for use inside the web server's event loop.
+
+    Requests are awaited on the shared dispatcher when there is one. Without
+    it, the OpenAI-compatible backend is called over an asyncio connection
+    pool and other backends run in a worker thread.
+    """
+    pool: Optional[AsyncHTTPConnectionPool]
+
+    def __init__(self, backend: Optional[LLMBackend] = None, cache: Optional[CompletionCache] = None,
+                 dispatcher: Optional[LLMDispatcher] = None, **backend_config):
+        super().__init__(backend, cache, dispatcher, **backend_config)
+        self.pool = None
+        if isinstance(self.backend, OpenAICompatibleBackend):
+            self.pool = AsyncHTTPConnectionPool(**self.backend.pool_config)
+
+    async def _complete_http(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int) -> str:
+        payload = self.backend.build_payload(prompt, max_tokens, temperature, top_p, seed)
+        headers = {"Content-Type": "application/json"}
+        status, reason, raw_data = await self.pool.request(
+            "POST", "/v1/completions", body=json.dumps(payload).encode(), headers=headers
+        )
+        return self.backend.parse_completion(status, reason, raw_data)
+
+    @traced("llm.call")
+    async def call_webui_api(self, prompt: str, max_tokens: int = 300, temperature = 0.9, top_p = 0.95, seed=-1,
+                             client: str = None, prompt_type: str = "other") -> str:
+        """
+        Await a completion from the configured backend without blocking the event loop.
+        """
+        current_span().set(prompt_type=prompt_type, client=client)
+        key = self.cache_key(prompt, max_tokens, temperature, top_p, seed)
+        if key is not None:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            self.record_cache_lookup(prompt_type, cached is not None)
+            if cached is not None:
+                return cached
+
+        started = time.perf_counter()
+        result = "[ERROR]"
+        LLM_IN_FLIGHT.inc()
+        try:
+            if self.dispatcher is not None:
+                result = await asyncio.wrap_future(
+                    self.dispatcher.submit(prompt, max_tokens, temperature, top_p, seed, client)
+                )
+            elif self.pool is not None:
+                result = await self._complete_http(prompt, max_tokens, temperature, top_p, seed)
+            else:
+                result = await asyncio.to_thread(self.backend.complete, prompt, max_tokens, temperature, top_p, seed)
+        except LLMBackendError as e:
+            print(f"❌ {e}")
+            return "[ERROR]"
+        except Exception as e:
+            print("❌ API call failed:", e)
+            return "[ERROR]"
+        finally:
+            LLM_IN_FLIGHT.dec()
+            self.record_completion(prompt_type, started, result)
+
+        # Outside the try: a cache failure must not turn a completion into [ERROR]
+        if key is not None:
+            await asyncio.to_thread(self.cache.put, key, result)
+        return result
+
+    async def close(self) -> None:
+        """Close pooled connections to the LLM server"""
+        if self.pool is not None:
+            await self.pool.close()
+
+
+# Shares the sync manager's backend (so an in-process model is only loaded once), cache and dispatch queue
+async_manager = AsyncLLMManager(backend=manager.backend, cache=manager.cache, dispatcher=manager.dispatcher)
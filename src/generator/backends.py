@@ -0,0 +1,399 @@
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+from typing import Dict, Iterator, List, Optional, Union
+
+from src.generator.connection_pool import HTTPConnectionPool
+
+
+class LLMBackendError(Exception):
+    """Raised by a backend when a completion could not be produced"""
+
+
+class LLMBackend:
+    """
+    Interface for text completion backends used by LLMManager.
+
+    `seed` is -1 when no specific seed is requested. Backends that set
+    `supports_batch` complete several prompts with the same sampling
+    parameters in one call.
+    """
+    name = "base"
+    supports_batch = False
+
+    @property
+    def model_id(self) -> str:
+        """Identifies the model behind this backend (part of the completion cache key)"""
+        return self.name
+
+    def complete(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int) -> str:
+        raise NotImplementedError
+
+    def complete_batch(self, prompts: List[str], max_tokens: int, temperature: float, top_p: float,
+                       seed: int) -> List[str]:
+        """Complete several prompts, in order (one call each unless the backend batches)"""
+        return [self.complete(prompt, max_tokens, temperature, top_p, seed) for prompt in prompts]
+
+    def stream(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int) -> Iterator[str]:
+        """Yield the completion in chunks (backends without streaming yield it whole)"""
+        yield self.complete(prompt, max_tokens, temperature, top_p, seed)
+
+    def close(self) -> None:
+        pass
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """
+    text-generation-webui (or any OpenAI-compatible server) over v1/completions,
+    using a pool of keep-alive connections.
+
+    Multi-prompt batches are only sent when `batch` (or VIBE_LLM_BATCH=1) is
+    set: text-generation-webui rejects them, vLLM and llama.cpp's server
+    accept them.
+    """
+    name = "openai"
+
+    def __init__(self, host: str = None, port: int = None, pool_size: int = None,
+                 timeout: float = 180, idle_timeout: float = 30, batch: bool = None):
+        self.supports_batch = batch if batch is not None else os.environ.get("VIBE_LLM_BATCH") == "1"
+        self.pool_config = {
+            "host": host or os.environ.get("VIBE_LLM_HOST", "localhost"),
+            "port": port or int(os.environ.get("VIBE_LLM_PORT", 5000)),
+            "pool_size": pool_size or int(os.environ.get("VIBE_LLM_POOL_SIZE", 4)),
+            "timeout": timeout,
+            "idle_timeout": idle_timeout
+        }
+        self.pool = HTTPConnectionPool(**self.pool_config)
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}@{self.pool_config['host']}:{self.pool_config['port']}"
+
+    def build_payload(self, prompt: Union[str, List[str]], max_tokens: int, temperature: float, top_p: float, seed: int) -> dict:
+        """Build the v1/completions request body"""
+        return {
+            "model": "gpt-4",  # dummy name for OpenAI-compatible API
+            "prompt": prompt,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "seed": seed,  # -1 lets the server pick a random seed
+            "preset": "None"  # CRITICAL to bypass internal limits
+        }
+
+    def parse_completion(self, status: int, reason: str, raw_data: bytes) -> str:
+        """Extract the completion text from a v1/completions response"""
+        if status != 200:
+            raise LLMBackendError(f"LLM returned error: {status} {reason}")
+
+        data = json.loads(raw_data.decode())
+        return data["choices"][0]["text"].strip()
+
+    def complete(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int) -> str:
+        payload = self.build_payload(prompt, max_tokens, temperature, top_p, seed)
+        headers = {"Content-Type": "application/json"}
+        status, reason, raw_data = self.pool.request(
+            "POST", "/v1/completions", body=json.dumps(payload).encode(), headers=headers
+        )
+        return self.parse_completion(status, reason, raw_data)
+
+    def complete_batch(self, prompts: List[str], max_tokens: int, temperature: float, top_p: float,
+                       seed: int) -> List[str]:
+        if not self.supports_batch:
+            return super().complete_batch(prompts, max_tokens, temperature, top_p, seed)
+
+        # A list prompt returns one choice per prompt, identified by index
+        payload = self.build_payload(prompts, max_tokens, temperature, top_p, seed)
+        headers = {"Content-Type": "application/json"}
+        status, reason, raw_data = self.pool.request(
+            "POST", "/v1/completions", body=json.dumps(payload).encode(), headers=headers
+        )
+        if status != 200:
+            raise LLMBackendError(f"LLM returned error: {status} {reason}")
+        choices = json.loads(raw_data.decode())["choices"]
+        texts = {choice.get("index", i): choice["text"].strip() for i, choice in enumerate(choices)}
+        if any(i not in texts for i in range(len(prompts))):
+            raise LLMBackendError(f"LLM returned {len(choices)} choices for {len(prompts)} prompts")
+        return [texts[i] for i in range(len(prompts))]
+
+    def stream(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int) -> Iterator[str]:
+        """Consume the server-sent events feed of v1/completions with stream: true"""
+        payload = self.build_payload(prompt, max_tokens, temperature, top_p, seed)
+        payload["stream"] = True
+
+        headers = {"Content-Type": "application/json", "Accept": "text/event-stream"}
+        lines = self.pool.stream_lines(
+            "POST", "/v1/completions", body=json.dumps(payload).encode(), headers=headers
+        )
+        try:
+            status_line = next(lines).decode()
+            if not status_line.startswith("200"):
+                raise LLMBackendError(f"LLM returned error: {status_line}")
+
+            done = False
+            for raw_line in lines:
+                line = raw_line.decode("utf-8").strip()
+                # Skip blank separators, comments, other SSE fields and anything after [DONE]
+                if done or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    done = True
+                    continue
+                text = json.loads(data)["choices"][0].get("text", "")
+                if text:
+                    yield text
+        finally:
+            lines.close()
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+class LMStudioBackend(LLMBackend):
+    """
+    Model served by LM Studio through its Python SDK (`lmstudio`, imported on first use).
+    """
+    name = "lmstudio"
+
+    def __init__(self, model: str = None):
+        self.model_name = model or os.environ.get("VIBE_LLM_MODEL", "mn-darkest-universe-29b")
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}:{self.model_name}"
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                import lmstudio as lms
+                self._model = lms.llm(self.model_name)
+        return self._model
+
+    def _config(self, max_tokens: int, temperature: float, top_p: float) -> dict:
+        return {"maxTokens": max_tokens, "temperature": temperature, "topPSampling": top_p}
+
+    def complete(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int) -> str:
+        result = self._load().complete(prompt, config=self._config(max_tokens, temperature, top_p))
+        return result.content.strip()
+
+    def stream(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int) -> Iterator[str]:
+        for fragment in self._load().complete_stream(prompt, config=self._config(max_tokens, temperature, top_p)):
+            yield fragment.content
+
+
+class TransformersBackend(LLMBackend):
+    """
+    In-process Hugging Face transformers pipeline (CPU unless CUDA is available).
+
+    transformers and torch are imported, and the model loaded, on first use.
+    """
+    name = "transformers"
+    supports_batch = True
+
+    def __init__(self, model: str = None):
+        self.model_name = model or os.environ.get("VIBE_LLM_MODEL", "Qwen/Qwen2.5-0.5B-Instruct")
+        self._pipeline = None
+        self._lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}:{self.model_name}"
+
+    def _load(self):
+        with self._lock:
+            if self._pipeline is None:
+                import torch
+                from transformers import pipeline
+                self._pipeline = pipeline(
+                    "text-generation", model=self.model_name,
+                    device=0 if torch.cuda.is_available() else -1
+                )
+        return self._pipeline
+
+    def _generate_kwargs(self, max_tokens: int, temperature: float, top_p: float) -> dict:
+        return {
+            "max_new_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "do_sample": True,
+        }
+
+    def complete(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int) -> str:
+        from transformers import set_seed
+
+        generator = self._load()
+        if seed >= 0:
+            set_seed(seed)
+        output = generator(prompt, return_full_text=False, **self._generate_kwargs(max_tokens, temperature, top_p))
+        return output[0]["generated_text"].strip()
+
+    def complete_batch(self, prompts: List[str], max_tokens: int, temperature: float, top_p: float,
+                       seed: int) -> List[str]:
+        from transformers import set_seed
+
+        generator = self._load()
+        if generator.tokenizer.pad_token_id is None:
+            generator.tokenizer.pad_token_id = generator.tokenizer.eos_token_id
+        if seed >= 0:
+            set_seed(seed)
+        outputs = generator(prompts, return_full_text=False, batch_size=len(prompts),
+                            **self._generate_kwargs(max_tokens, temperature, top_p))
+        return [output[0]["generated_text"].strip() for output in outputs]
+
+    def stream(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int) -> Iterator[str]:
+        from transformers import TextIteratorStreamer, set_seed
+
+        generator = self._load()
+        if seed >= 0:
+            set_seed(seed)
+        streamer = TextIteratorStreamer(generator.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        inputs = generator.tokenizer(prompt, return_tensors="pt").to(generator.model.device)
+        worker = threading.Thread(
+            target=generator.model.generate,
+            kwargs=dict(inputs, streamer=streamer, **self._generate_kwargs(max_tokens, temperature, top_p)),
+            daemon=True
+        )
+        worker.start()
+        for text in streamer:
+            if text:
+                yield text
+        worker.join()
+
+
+class LlamaCppBackend(LLMBackend):
+    """
+    In-process GGUF model through llama-cpp-python (imported on first use), on CPU by default.
+    """
+    name = "llamacpp"
+
+    def __init__(self, model: str = None, n_ctx: int = 4096):
+        self.model_path = model or os.environ.get("VIBE_LLM_MODEL", "")
+        self.n_ctx = n_ctx
+        self._llm = None
+        self._lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}:{self.model_path}"
+
+    def _load(self):
+        if self._llm is None:
+            from llama_cpp import Llama
+            self._llm = Llama(model_path=self.model_path, n_ctx=self.n_ctx, verbose=False)
+        return self._llm
+
+    def _kwargs(self, max_tokens: int, temperature: float, top_p: float, seed: int) -> dict:
+        kwargs = {"max_tokens": max_tokens, "temperature": temperature, "top_p": top_p}
+        if seed >= 0:
+            kwargs["seed"] = seed
+        return kwargs
+
+    def complete(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int) -> str:
+        # A llama.cpp context is not thread-safe
+        with self._lock:
+            output = self._load()(prompt, **self._kwargs(max_tokens, temperature, top_p, seed))
+        return output["choices"][0]["text"].strip()
+
+    def stream(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int) -> Iterator[str]:
+        with self._lock:
+            for chunk in self._load()(prompt, stream=True, **self._kwargs(max_tokens, temperature, top_p, seed)):
+                text = chunk["choices"][0]["text"]
+                if text:
+                    yield text
+
+
+FAKE_WORDS = (
+    "moon quiet coffee rain midnight laughter stars secret ocean letter music memory "
+    "garden storm whisper lantern journey silver dream city autumn echo river smile"
+).split()
+
+
+class FakeBackend(LLMBackend):
+    """
+    Deterministic stand-in for tests and benchmarks: the same (prompt, seed) always
+    produces the same text, with optional simulated latency and no server.
+
+    Character creation prompts get a parseable character sheet. Batches cost
+    one latency period, like a server that batches on the GPU.
+    """
+    name = "fake"
+    supports_batch = True
+
+    def __init__(self, latency: float = None, tokens_per_second: float = None):
+        self.latency = latency if latency is not None else float(os.environ.get("VIBE_FAKE_LATENCY", 0))
+        self.tokens_per_second = tokens_per_second or float(os.environ.get("VIBE_FAKE_TPS", 0)) or None
+        self.calls = 0
+
+    def _rng(self, prompt: str, seed: int) -> random.Random:
+        digest = hashlib.sha256(f"{seed}:{prompt}".encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def completion_text(self, prompt: str, max_tokens: int, seed: int) -> str:
+        """The (deterministic) completion of `prompt`"""
+        rng = self._rng(prompt, seed)
+        if "OCEAN:" in prompt and "Vibe Keywords" in prompt:
+            name = " ".join(rng.choice(FAKE_WORDS).capitalize() for _ in range(2))
+            traits = "\n".join(rng.choice(FAKE_WORDS) for _ in range(3))
+            keywords = "\n".join(rng.choice(FAKE_WORDS) for _ in range(3))
+            return (
+                f"Name: {name}\nTraits:\n{traits}\n"
+                f"Speaking Style: {' '.join(rng.choices(FAKE_WORDS, k=8))}\n"
+                f"Backstory: {' '.join(rng.choices(FAKE_WORDS, k=20))}\n"
+                f"Vibe Keywords:\n{keywords}\n"
+                f"Core Seed: {rng.randint(10000, 99999999)}"
+            )
+        return " ".join(rng.choices(FAKE_WORDS, k=max(1, min(max_tokens, 40) // 2)))
+
+    def complete(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int) -> str:
+        self.calls += 1
+        text = self.completion_text(prompt, max_tokens, seed)
+        if self.latency:
+            time.sleep(self.latency)
+        if self.tokens_per_second:
+            time.sleep(len(text.split()) / self.tokens_per_second)
+        return text
+
+    def complete_batch(self, prompts: List[str], max_tokens: int, temperature: float, top_p: float,
+                       seed: int) -> List[str]:
+        self.calls += 1
+        texts = [self.completion_text(prompt, max_tokens, seed) for prompt in prompts]
+        if self.latency:
+            time.sleep(self.latency)
+        if self.tokens_per_second:
+            time.sleep(max(len(text.split()) for text in texts) / self.tokens_per_second)
+        return texts
+
+    def stream(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int) -> Iterator[str]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        for i, word in enumerate(self.completion_text(prompt, max_tokens, seed).split(" ")):
+            if self.tokens_per_second:
+                time.sleep(1 / self.tokens_per_second)
+            yield word if i == 0 else f" {word}"
+
+
+BACKENDS: Dict[str, type] = {
+    backend.name: backend
+    for backend in (OpenAICompatibleBackend, LMStudioBackend, TransformersBackend, LlamaCppBackend, FakeBackend)
+}
+
+
+def create_backend(name: Optional[str] = None, **config) -> LLMBackend:
+    """
+    Create the backend named `name` or by the VIBE_LLM_BACKEND environment variable.
+
+    Args:
+        name: One of "openai" (default), "lmstudio", "transformers", "llamacpp" or "fake"
+        config: Backend constructor arguments (e.g. host/port for "openai", model for local backends)
+    """
+    name = name or os.environ.get("VIBE_LLM_BACKEND", "openai")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}'. Available: {', '.join(BACKENDS)}")
+    return BACKENDS[name](**config)
@@ -1,6 +1,6 @@
-from transformers import pipeline, set_seed
 from src.generator.llm_loader import manager
-from typing import Dict
+from src.generator.async_llm_loader import async_manager
+from typing import Dict, Tuple
 
 
 def get_sampling_params(ocean: dict) -> dict:
@@ -22,15 +22,9 @@ def get_sampling_params(ocean: dict) -> dict:
     return {"temperature": temperature, "top_p": top_p}
 
 
-def generate_character(ocean: Dict[str, float]) -> str:
+def build_character_request(ocean: Dict[str, float]) -> Tuple[str, dict]:
     """
-    Generate a character based on OCEAN profile
-    
-    Args:
-        ocean: Dictionary with OCEAN trait values (0.0-1.0)
-        
-    Returns:
-        Generated character text
+    Build the character creation prompt and sampling params for an OCEAN profile
     """
     prompt = manager.generate_prompt("character_creation", 
         openness=ocean['openness'],
@@ -41,13 +35,45 @@ def generate_character(ocean: Dict[str, float]) -> str:
     )
     
     params = get_sampling_params(ocean)
+    return prompt, params
+
+
+def generate_character(ocean: Dict[str, float], seed: int = -1) -> str:
+    """
+    Generate a character based on OCEAN profile
+    
+    Args:
+        ocean: Dictionary with OCEAN trait values (0.0-1.0)
+        seed: Sampling seed; with a fixed seed, repeated generations are served from the completion cache
+        
+    Returns:
+        Generated character text
+    """
+    prompt, params = build_character_request(ocean)
     
     result = manager.call_webui_api(
         prompt, 
         max_tokens=300, 
         temperature=params["temperature"], 
-        top_p=params["top_p"]
+        top_p=params["top_p"],
+        seed=seed,
+        prompt_type="character_creation"
     )
     return result
 
 
+async def generate_character_async(ocean: Dict[str, float], seed: int = -1) -> str:
+    """
+    Async version of generate_character that awaits the LLM without blocking the event loop
+    """
+    prompt, params = build_character_request(ocean)
+    
+    result = await async_manager.call_webui_api(
+        prompt, 
+        max_tokens=300, 
+        temperature=params["temperature"], 
+        top_p=params["top_p"],
+        seed=seed,
+        prompt_type="character_creation"
+    )
+    return result
@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class CompletionCache:
+    """
+    Content-addressed cache of completions.
+
+    Entries are keyed on (model, prompt hash, seed, temperature, top_p,
+    max_tokens), so only requests that would sample identically share an
+    entry. A bounded LRU in memory sits in front of an on-disk tier (one
+    JSON file per entry under `disk_dir`); entries older than `ttl` seconds
+    are ignored and the disk tier is trimmed to `max_disk_bytes`, oldest
+    first. Disk errors (full disk, permissions, files evicted concurrently)
+    are counted in `stats["disk_errors"]` and never raised to callers.
+
+    Requests without a fixed seed (seed < 0) are never cached.
+    """
+
+    def __init__(self, max_entries: int = 1024, disk_dir: Optional[str] = os.path.join("data", "cache", "completions"),
+                 max_disk_bytes: int = 64 * 1024 * 1024, ttl: Optional[float] = 7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "disk_errors": 0}
+
+    @staticmethod
+    def make_key(model: str, prompt: str, seed: int, temperature: float, top_p: float, max_tokens: int) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        material = json.dumps([model, prompt_hash, seed, float(temperature), float(top_p), max_tokens])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], key + ".json")
+
+    def _expired(self, entry: Dict) -> bool:
+        return self.ttl is not None and time.time() - entry["created"] > self.ttl
+
+    def _remember(self, key: str, entry: Dict) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached completion text for `key`, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry):
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry["text"]
+                del self._entries[key]
+
+        if self.disk_dir:
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                entry = None
+            if entry is not None and not self._expired(entry):
+                with self._lock:
+                    self._remember(key, entry)
+                    self.stats["disk_hits"] += 1
+                return entry["text"]
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, text: str) -> None:
+        """Store a completion (errors are never cached)"""
+        if not text or text == "[ERROR]":
+            return
+        entry = {"text": text, "created": time.time()}
+        with self._lock:
+            self._remember(key, entry)
+            self.stats["stores"] += 1
+
+        if self.disk_dir:
+            try:
+                self._store_on_disk(key, entry)
+            except OSError as e:
+                # The entry is still served from memory; a cache write never fails the caller
+                with self._lock:
+                    self.stats["disk_errors"] += 1
+                print(f"❌ Completion cache write failed: {e}")
+
+    def _store_on_disk(self, key: str, entry: Dict) -> None:
+        path = self._path(key)
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique temp name so concurrent writers of the same key never interleave
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += len(data)
+            over_budget = self._disk_bytes > self.max_disk_bytes
+        if over_budget:
+            self.evict()
+
+    def _scan_disk_bytes(self) -> int:
+        total = 0
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    continue  # Removed by a concurrent eviction
+        return total
+
+    def evict(self) -> int:
+        """
+        Remove expired disk entries, then the oldest until the disk tier is
+        at 90% of `max_disk_bytes`.
+
+        Returns:
+            Number of entries removed
+        """
+        if not self.disk_dir or not os.path.isdir(self.disk_dir):
+            return 0
+
+        files = []
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue  # Removed by a concurrent eviction
+                files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+
+        total = sum(size for _, size, _ in files)
+        cutoff = time.time() - self.ttl if self.ttl is not None else None
+        removed = 0
+        for mtime, size, path in files:
+            if total <= self.max_disk_bytes * 0.9 and (cutoff is None or mtime >= cutoff):
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self._disk_bytes = total
+            self.stats["evictions"] += removed
+        return removed
+
+    def clear(self) -> None:
+        """Drop every entry from memory and disk"""
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir and os.path.isdir(self.disk_dir):
+            for root, _, names in os.walk(self.disk_dir):
+                for name in names:
+                    os.remove(os.path.join(root, name))
+        self._disk_bytes = 0
+
+
+def create_completion_cache() -> Optional[CompletionCache]:
+    """
+    Completion cache configured by VIBE_CACHE ("memory", "disk" (default) or "off"),
+    VIBE_CACHE_DIR, VIBE_CACHE_MAX_MB and VIBE_CACHE_TTL (seconds, 0 for no expiry).
+    """
+    mode = os.environ.get("VIBE_CACHE", "disk")
+    if mode == "off":
+        return None
+    ttl = float(os.environ.get("VIBE_CACHE_TTL", 7 * 24 * 3600))
+    return CompletionCache(
+        disk_dir=os.environ.get("VIBE_CACHE_DIR", os.path.join("data", "cache", "completions")) if mode == "disk" else None,
+        max_disk_bytes=int(float(os.environ.get("VIBE_CACHE_MAX_MB", 64)) * 1024 * 1024),
+        ttl=ttl or None
+    )
@@ -0,0 +1,292 @@
+import asyncio
+import http.client
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+
+# Errors that mean a kept-alive socket was closed by the server while idle.
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+
+class HTTPConnectionPool:
+    """
+    Thread-safe pool of persistent HTTP connections to a single host.
+
+    Connections are reused across requests (HTTP/1.1 keep-alive). Idle
+    connections older than `idle_timeout` are closed instead of reused, and a
+    request that fails on a reused socket is retried once on a fresh one.
+    Such a failure usually means the server restarted, so the other idle
+    sockets are dropped as well.
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 5000, pool_size: int = 4,
+                 timeout: float = 180, idle_timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+
+        self._idle: Deque[Tuple[http.client.HTTPConnection, float]] = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._closed = False
+        self.stats = {"created": 0, "reused": 0, "expired": 0, "reconnects": 0}
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        self.stats["created"] += 1
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def acquire(self, fresh: bool = False) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Take a connection out of the pool, blocking while all slots are in use.
+
+        Args:
+            fresh: Open a new connection instead of reusing an idle one
+
+        Returns:
+            Tuple of (connection, whether it was reused from the idle list)
+        """
+        self._slots.acquire()
+        now = time.monotonic()
+        with self._lock:
+            while self._idle and not fresh:
+                conn, last_used = self._idle.pop()
+                if now - last_used <= self.idle_timeout:
+                    self.stats["reused"] += 1
+                    return conn, True
+                self.stats["expired"] += 1
+                conn.close()
+        return self._new_connection(), False
+
+    def discard_idle(self) -> None:
+        """Close every idle connection (after one turned out stale, the rest likely are too)"""
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for conn, _ in idle:
+            conn.close()
+
+    def release(self, conn: http.client.HTTPConnection, reusable: bool = True) -> None:
+        """Return a connection to the pool (or close it if it can't be reused)"""
+        try:
+            with self._lock:
+                if reusable and not self._closed:
+                    self._idle.append((conn, time.monotonic()))
+                    return
+            conn.close()
+        finally:
+            self._slots.release()
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, str, bytes]:
+        """
+        Send a request and read the full response body.
+
+        Returns:
+            Tuple of (status code, reason phrase, body bytes)
+        """
+        headers = dict(headers or {})
+        headers.setdefault("Connection", "keep-alive")
+
+        for attempt in range(2):
+            conn, reused = self.acquire(fresh=attempt > 0)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except STALE_CONNECTION_ERRORS:
+                self.release(conn, reusable=False)
+                if reused and attempt == 0:
+                    self.stats["reconnects"] += 1
+                    self.discard_idle()
+                    continue
+                raise
+            except Exception:
+                self.release(conn, reusable=False)
+                raise
+
+            self.release(conn, reusable=not response.will_close)
+            return response.status, response.reason, data
+
+    def stream_lines(self, method: str, path: str, body: Optional[bytes] = None,
+                     headers: Optional[Dict[str, str]] = None) -> Iterator[bytes]:
+        """
+        Send a request and yield the response body line by line as it arrives.
+
+        The first yielded item is the status line as b"<status> <reason>". The
+        connection goes back to the pool only if the body was fully consumed.
+        """
+        headers = dict(headers or {})
+        headers.setdefault("Connection", "keep-alive")
+
+        for attempt in range(2):
+            conn, reused = self.acquire(fresh=attempt > 0)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                self.release(conn, reusable=False)
+                if reused and attempt == 0:
+                    self.stats["reconnects"] += 1
+                    self.discard_idle()
+                    continue
+                raise
+            except Exception:
+                self.release(conn, reusable=False)
+                raise
+            break
+
+        finished = False
+        try:
+            yield f"{response.status} {response.reason}".encode()
+            while True:
+                line = response.readline()
+                if not line:
+                    break
+                yield line
+            finished = True
+        finally:
+            self.release(conn, reusable=finished and not response.will_close)
+
+    def close(self) -> None:
+        """Close all idle connections and stop accepting returned ones"""
+        with self._lock:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                conn.close()
+
+
+class AsyncHTTPConnectionPool:
+    """
+    asyncio counterpart of HTTPConnectionPool.
+
+    Speaks a minimal HTTP/1.1 over `asyncio.open_connection` (Content-Length
+    and chunked bodies), so awaiting a completion never blocks the event loop.
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 5000, pool_size: int = 4,
+                 timeout: float = 180, idle_timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+
+        self._idle: Deque[Tuple[asyncio.StreamReader, asyncio.StreamWriter, float]] = deque()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.stats = {"created": 0, "reused": 0, "expired": 0, "reconnects": 0}
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+        return self._slots
+
+    async def _acquire(self, fresh: bool = False) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        now = time.monotonic()
+        while self._idle and not fresh:
+            reader, writer, last_used = self._idle.pop()
+            if now - last_used <= self.idle_timeout and not reader.at_eof():
+                self.stats["reused"] += 1
+                return reader, writer, True
+            self.stats["expired"] += 1
+            writer.close()
+        self.stats["created"] += 1
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        return reader, writer, False
+
+    def _release(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 reusable: bool = True) -> None:
+        if reusable:
+            self._idle.append((reader, writer, time.monotonic()))
+        else:
+            writer.close()
+
+    async def _exchange(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                        method: str, path: str, body: bytes,
+                        headers: Dict[str, str]) -> Tuple[int, str, Dict[str, str], bytes]:
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 f"Content-Length: {len(body)}"]
+        lines += [f"{key}: {value}" for key, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by server")
+        _, status, reason = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            response_headers[key.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            data = b"".join(chunks)
+        elif "content-length" in response_headers:
+            data = await reader.readexactly(int(response_headers["content-length"]))
+        else:
+            data = await reader.read()
+            response_headers["connection"] = "close"
+
+        return int(status), reason, response_headers, data
+
+    async def request(self, method: str, path: str, body: Optional[bytes] = None,
+                      headers: Optional[Dict[str, str]] = None) -> Tuple[int, str, bytes]:
+        """
+        Send a request and read the full response body.
+
+        Returns:
+            Tuple of (status code, reason phrase, body bytes)
+        """
+        body = body or b""
+        headers = dict(headers or {})
+        headers.setdefault("Connection", "keep-alive")
+
+        async with self._get_slots():
+            for attempt in range(2):
+                reader, writer, reused = await self._acquire(fresh=attempt > 0)
+                try:
+                    status, reason, response_headers, data = await asyncio.wait_for(
+                        self._exchange(reader, writer, method, path, body, headers), self.timeout
+                    )
+                except (asyncio.IncompleteReadError, ConnectionError) + STALE_CONNECTION_ERRORS:
+                    self._release(reader, writer, reusable=False)
+                    if reused and attempt == 0:
+                        self.stats["reconnects"] += 1
+                        await self.close()
+                        continue
+                    raise
+                except BaseException:
+                    self._release(reader, writer, reusable=False)
+                    raise
+
+                keep_alive = response_headers.get("connection", "").lower() != "close"
+                self._release(reader, writer, reusable=keep_alive)
+                return status, reason, data
+
+    async def close(self) -> None:
+        """Close all idle connections (also used to drop them after a stale one)"""
+        while self._idle:
+            _, writer, _ = self._idle.pop()
+            writer.close()
@@ -0,0 +1,195 @@
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from src.generator.backends import LLMBackend, LLMBackendError
+
+
+class LLMRequest:
+    """A completion (or stream slot) waiting in the dispatcher's queue"""
+
+    def __init__(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int,
+                 client: str, stream: bool = False):
+        self.prompt = prompt
+        self.params = (max_tokens, temperature, top_p, seed)
+        self.client = client
+        self.stream = stream
+        self.future: Future = Future()
+
+    @property
+    def key(self) -> Tuple:
+        return (self.prompt,) + self.params
+
+
+class LLMDispatcher:
+    """
+    Sits between the LLM managers and a backend and shapes the load on it.
+
+    - Single-flight: identical in-flight requests with a fixed seed share one
+      backend call (requests with a random seed are independent samples).
+    - Fair queue: waiting requests are served round-robin across clients
+      (e.g. characters), so one busy client can't starve the others.
+    - Max concurrency: at most `max_concurrency` backend calls or streams
+      run at once.
+    - Batching: when the backend supports multi-prompt completions, queued
+      requests with the same sampling parameters are sent as one call of
+      up to `max_batch` prompts.
+
+    `submit()` returns a Future, so async callers can await it without
+    holding a thread.
+    """
+
+    def __init__(self, backend: LLMBackend, max_concurrency: Optional[int] = None, max_batch: int = 8):
+        self.backend = backend
+        self.max_concurrency = max_concurrency or int(os.environ.get("VIBE_LLM_MAX_CONCURRENCY", 4))
+        self.max_batch = max_batch
+
+        self._queues: "OrderedDict[str, Deque[LLMRequest]]" = OrderedDict()
+        self._inflight: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._pending = threading.Condition(self._lock)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.stats = {"submitted": 0, "coalesced": 0, "backend_calls": 0, "batched_prompts": 0, "max_queue": 0}
+
+    def _start(self) -> None:
+        # Called with the lock held
+        if self._thread is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="llm-dispatch")
+            self._thread = threading.Thread(target=self._run, name="llm-dispatcher", daemon=True)
+            self._thread.start()
+
+    def _enqueue(self, request: LLMRequest) -> None:
+        # Called with the lock held
+        self._queues.setdefault(request.client, deque()).append(request)
+        queued = sum(len(queue) for queue in self._queues.values())
+        self.stats["max_queue"] = max(self.stats["max_queue"], queued)
+        self._start()
+        self._pending.notify()
+
+    def submit(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int,
+               client: str = "default") -> Future:
+        """Queue a completion; the Future resolves to its text"""
+        request = LLMRequest(prompt, max_tokens, temperature, top_p, seed, client or "default")
+        with self._lock:
+            self.stats["submitted"] += 1
+            if seed is not None and seed >= 0:
+                existing = self._inflight.get(request.key)
+                if existing is not None:
+                    self.stats["coalesced"] += 1
+                    return existing
+                self._inflight[request.key] = request.future
+                request.future.add_done_callback(lambda _, key=request.key: self._forget(key))
+            self._enqueue(request)
+        return request.future
+
+    def _forget(self, key: Tuple) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def complete(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int,
+                 client: str = "default") -> str:
+        """Blocking completion through the queue"""
+        return self.submit(prompt, max_tokens, temperature, top_p, seed, client).result()
+
+    def stream(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int,
+               client: str = "default") -> Iterator[str]:
+        """Wait for a turn in the fair queue, then stream from the backend while holding a concurrency slot"""
+        request = LLMRequest(prompt, max_tokens, temperature, top_p, seed, client or "default", stream=True)
+        with self._lock:
+            self.stats["submitted"] += 1
+            self._enqueue(request)
+        request.future.result()
+        try:
+            with self._lock:
+                self.stats["backend_calls"] += 1
+            yield from self.backend.stream(prompt, max_tokens, temperature, top_p, seed)
+        finally:
+            self._slots.release()
+
+    def _next_batch(self) -> List[LLMRequest]:
+        """Pop the next request round-robin, plus compatible queued ones if the backend batches"""
+        # Called with the lock held and at least one request queued
+        client, queue = next(iter(self._queues.items()))
+        first = queue.popleft()
+        self._queues.move_to_end(client)
+        batch = [first]
+
+        if not first.stream and getattr(self.backend, "supports_batch", False):
+            for queue in self._queues.values():
+                for request in list(queue):
+                    if len(batch) >= self.max_batch:
+                        break
+                    if not request.stream and request.params == first.params:
+                        queue.remove(request)
+                        batch.append(request)
+
+        for client in [client for client, queue in self._queues.items() if not queue]:
+            del self._queues[client]
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            self._slots.acquire()
+            with self._lock:
+                while not self._queues and not self._closed:
+                    self._pending.wait()
+                if self._closed:
+                    self._slots.release()
+                    return
+                batch = self._next_batch()
+
+            if batch[0].stream:
+                # The streaming caller releases the slot when it finishes
+                batch[0].future.set_result(True)
+            else:
+                self._executor.submit(self._execute, batch)
+
+    def _execute(self, batch: List[LLMRequest]) -> None:
+        try:
+            max_tokens, temperature, top_p, seed = batch[0].params
+            with self._lock:
+                self.stats["backend_calls"] += 1
+                if len(batch) > 1:
+                    self.stats["batched_prompts"] += len(batch)
+            if len(batch) == 1:
+                results = [self.backend.complete(batch[0].prompt, max_tokens, temperature, top_p, seed)]
+            else:
+                results = self.backend.complete_batch(
+                    [request.prompt for request in batch], max_tokens, temperature, top_p, seed
+                )
+            if len(results) != len(batch):
+                # zip() would leave the extra callers waiting forever
+                raise LLMBackendError(f"Backend returned {len(results)} completions for {len(batch)} prompts")
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+        except Exception as e:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Stop the dispatch thread; queued requests fail"""
+        with self._lock:
+            self._closed = True
+            pending = [request for queue in self._queues.values() for request in queue]
+            self._queues.clear()
+            self._pending.notify_all()
+        for request in pending:
+            request.future.set_exception(RuntimeError("LLM dispatcher closed"))
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+def create_dispatcher(backend: LLMBackend) -> Optional[LLMDispatcher]:
+    """Dispatcher for `backend`, or None when VIBE_LLM_MAX_CONCURRENCY is 0 (direct backend calls)"""
+    max_concurrency = int(os.environ.get("VIBE_LLM_MAX_CONCURRENCY", 4))
+    if max_concurrency <= 0:
+        return None
+    return LLMDispatcher(backend, max_concurrency=max_concurrency)
@@ -1,24 +1,41 @@
 import os
-from transformers import pipeline, set_seed
-import torch
-import requests
-import sseclient
-import json
-import http
-
-import lmstudio as lms
+import time
+
 import yaml
+from typing import Iterator, Optional
+
+from src.generator.backends import LLMBackend, LLMBackendError, create_backend
+from src.generator.completion_cache import CompletionCache, create_completion_cache
+from src.generator.dispatcher import LLMDispatcher, create_dispatcher
+from src.utils.metrics import registry
+from src.utils.tracing import current_span, keep_context, span, traced
+
 
+# prompt_type is the prompts.yaml template a request was built from
+LLM_SECONDS = registry.histogram("vibe_llm_request_seconds", "LLM completion latency (cache misses)", ["prompt_type"])
+LLM_FIRST_TOKEN_SECONDS = registry.histogram("vibe_llm_first_token_seconds", "Time to the first streamed chunk", ["prompt_type"])
+LLM_TOKENS = registry.counter("vibe_llm_tokens_generated_total", "Tokens in LLM completions (cache misses)", ["prompt_type"])
+LLM_ERRORS = registry.counter("vibe_llm_errors_total", "LLM calls that returned [ERROR]", ["prompt_type"])
+LLM_CACHE = registry.counter("vibe_llm_cache_requests_total", "Completion cache lookups by result (hit or miss)", ["prompt_type", "result"])
+LLM_IN_FLIGHT = registry.gauge("vibe_llm_requests_in_flight", "LLM calls waiting for or receiving a completion")
 
-class LLMManager:
-    # model: Pipeline
+
+class BaseLLMManager:
+    """
+    Prompt templates and the completion backend shared by the sync and async managers.
+    """
     prompts: dict
-    
-    def __init__(self):
-        # self.model = lms.llm("mn-darkest-universe-29b")
+    backend: LLMBackend
+    cache: Optional[CompletionCache]
+    dispatcher: Optional[LLMDispatcher]
+
+    def __init__(self, backend: Optional[LLMBackend] = None, cache: Optional[CompletionCache] = None,
+                 dispatcher: Optional[LLMDispatcher] = None, **backend_config):
         self.prompts = self.load_prompts(os.path.join(os.path.dirname(__file__), "prompts.yaml"))
-        # self.model = pipeline("Lucy-in-the-Sky/Mixtral-8x7B-Instruct-v0.1-Q4_K_M-GGUF", device=0 if torch.cuda.is_available() else -1)
-            
+        self.backend = backend or create_backend(**backend_config)
+        self.cache = cache if cache is not None else create_completion_cache()
+        self.dispatcher = dispatcher if dispatcher is not None else create_dispatcher(self.backend)
+
     def load_prompts(self, prompts_file_path: str) -> dict:
         """
         Load prompts from a YAML file.
@@ -29,49 +46,137 @@ class LLMManager:
             prompts = yaml.safe_load(file)
         return prompts
     
+    @traced("llm.generate_prompt")
     def generate_prompt(self, prompt_type: str, **kwargs) -> str:
         prompt_template = self.prompts.get(prompt_type)
         if not prompt_template:
             raise ValueError(f"Prompt type '{prompt_type}' not found.")
         return prompt_template.format(**kwargs)
-    
-    def call_webui_api(self, prompt: str, max_tokens: int = 300, temperature = 0.9, top_p = 0.95, seed=-1) -> str:
+
+    def cache_key(self, prompt: str, max_tokens: int, temperature: float, top_p: float, seed: int) -> Optional[str]:
+        """Completion cache key, or None when the request can't be cached (no cache or random seed)"""
+        if self.cache is None or seed is None or seed < 0:
+            return None
+        return self.cache.make_key(self.backend.model_id, prompt, seed, temperature, top_p, max_tokens)
+
+    @staticmethod
+    def record_cache_lookup(prompt_type: str, hit: bool) -> None:
+        current_span().set(cache="hit" if hit else "miss")
+        LLM_CACHE.labels(prompt_type, "hit" if hit else "miss").inc()
+
+    @staticmethod
+    def record_completion(prompt_type: str, started: float, result: str) -> None:
+        """Record a finished backend call in the LLM metrics"""
+        if result == "[ERROR]":
+            current_span().set(error="[ERROR]")
+            LLM_ERRORS.labels(prompt_type).inc()
+            return
+        # Imported here: the token counter lives with the responder, which imports this module
+        from src.responder.context_assembler import count_tokens
+
+        LLM_SECONDS.labels(prompt_type).observe(time.perf_counter() - started)
+        tokens = count_tokens(result)
+        current_span().set(tokens=tokens)
+        LLM_TOKENS.labels(prompt_type).inc(tokens)
+
+
+class LLMManager(BaseLLMManager):
+    """
+    Completions through the configured backend (see src/generator/backends.py).
+    """
+
+    @traced("llm.call")
+    def call_webui_api(self, prompt: str, max_tokens: int = 300, temperature = 0.9, top_p = 0.95, seed=-1,
+                       client: str = None, prompt_type: str = "other") -> str:
         """
-        Call text-generation-webui OpenAI-compatible API (v1/completions) using raw HTTP to avoid cutoff issues.
+        Get a completion from the configured backend (text-generation-webui's
+        OpenAI-compatible API by default, or an in-process model).
+
+        Requests with a fixed seed are served from the completion cache when possible.
+        Others go through the dispatcher, which queues them fairly per `client`
+        (e.g. character name), coalesces identical ones and batches compatible ones.
+        `prompt_type` labels the call in the metrics and traces.
         """
-            
-        payload = {
-                "model": "gpt-4",  # dummy name for OpenAI-compatible API
-                "prompt": prompt,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-                "top_p": top_p,
-                "preset": "None"  # CRITICAL to bypass internal limits
-            }
+        current_span().set(prompt_type=prompt_type, client=client)
+        key = self.cache_key(prompt, max_tokens, temperature, top_p, seed)
+        if key is not None:
+            cached = self.cache.get(key)
+            self.record_cache_lookup(prompt_type, cached is not None)
+            if cached is not None:
+                return cached
 
+        started = time.perf_counter()
+        result = "[ERROR]"
         try:
-                conn = http.client.HTTPConnection("localhost", 5000, timeout=180)
-                headers = {
-                    "Content-Type": "application/json",
-                    "Connection": "keep-alive"
-                }
+            with LLM_IN_FLIGHT.track_inprogress():
+                if self.dispatcher is not None:
+                    result = self.dispatcher.complete(prompt, max_tokens, temperature, top_p, seed, client)
+                else:
+                    result = self.backend.complete(prompt, max_tokens, temperature, top_p, seed)
+        except LLMBackendError as e:
+            print(f"❌ {e}")
+            return "[ERROR]"
+        except Exception as e:
+            print("❌ API call failed:", e)
+            return "[ERROR]"
+        finally:
+            self.record_completion(prompt_type, started, result)
 
-                conn.request("POST", "/v1/completions", body=json.dumps(payload), headers=headers)
-                response = conn.getresponse()
+        # Outside the try: a cache failure must not turn a completion into [ERROR]
+        if key is not None:
+            self.cache.put(key, result)
+        return result
 
-                if response.status != 200:
-                    print(f"❌ LLM returned error: {response.status} {response.reason}")
-                    return "[ERROR]"
+    @keep_context
+    def stream_webui_api(self, prompt: str, max_tokens: int = 300, temperature = 0.9, top_p = 0.95, seed=-1,
+                         client: str = None, prompt_type: str = "other") -> Iterator[str]:
+        """
+        Stream a completion from the configured backend, yielding text chunks as soon as they arrive.
 
-                raw_data = response.read().decode()
-                conn.close()
+        A cached completion is yielded as a single chunk; a fully streamed one is added to the cache.
+        """
+        with span("llm.call", prompt_type=prompt_type, client=client):
+            key = self.cache_key(prompt, max_tokens, temperature, top_p, seed)
+            if key is not None:
+                cached = self.cache.get(key)
+                self.record_cache_lookup(prompt_type, cached is not None)
+                if cached is not None:
+                    yield cached
+                    return
 
-                data = json.loads(raw_data)
-                return data["choices"][0]["text"].strip()
+            started = time.perf_counter()
+            chunks = []
+            LLM_IN_FLIGHT.inc()
+            try:
+                if self.dispatcher is not None:
+                    stream = self.dispatcher.stream(prompt, max_tokens, temperature, top_p, seed, client)
+                else:
+                    stream = self.backend.stream(prompt, max_tokens, temperature, top_p, seed)
+                for chunk in stream:
+                    if not chunks:
+                        LLM_FIRST_TOKEN_SECONDS.labels(prompt_type).observe(time.perf_counter() - started)
+                    chunks.append(chunk)
+                    yield chunk
+            except LLMBackendError as e:
+                print(f"❌ {e}")
+                chunks = ["[ERROR]"]
+                yield "[ERROR]"
+            except Exception as e:
+                print("❌ API streaming call failed:", e)
+                chunks = ["[ERROR]"]
+                yield "[ERROR]"
+            else:
+                if key is not None:
+                    self.cache.put(key, "".join(chunks).strip())
+            finally:
+                LLM_IN_FLIGHT.dec()
+                self.record_completion(prompt_type, started, "".join(chunks).strip() if chunks else "[ERROR]")
 
-        except Exception as e:
-                print("❌ API call failed:", e)
-                return "[ERROR]"
+    def close(self) -> None:
+        """Release the backend's connections or resources"""
+        if self.dispatcher is not None:
+            self.dispatcher.close()
+        self.backend.close()
 
 
 manager = LLMManager()
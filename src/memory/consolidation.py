@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Summarization runs on this worker so it never delays a reply
+consolidation_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-consolidation")
+
+
+class ConsolidationPolicy:
+    """
+    Decides when a chat session's recent messages are summarized into memory.
+
+    A consolidation is due when `every_n_turns` turns or more than
+    `token_budget` (approximate) tokens have accumulated since the last one,
+    after `idle_seconds` without a new turn, or when the session ends.
+    """
+
+    def __init__(self, every_n_turns: int = 6, token_budget: int = 1500,
+                 idle_seconds: float = 300, on_session_end: bool = True,
+                 duplicate_threshold: float = 0.85):
+        self.every_n_turns = every_n_turns
+        self.token_budget = token_budget
+        self.idle_seconds = idle_seconds
+        self.on_session_end = on_session_end
+        self.duplicate_threshold = duplicate_threshold
+
+    def should_consolidate(self, pending_turns: int, pending_tokens: int) -> bool:
+        """Whether the pending (unsummarized) conversation should be consolidated now"""
+        if pending_turns <= 0:
+            return False
+        return pending_turns >= self.every_n_turns or pending_tokens >= self.token_budget
+
+
+def approximate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)"""
+    return len(text) // 4 + 1
@@ -1,9 +1,33 @@
 import os
-import json
+import re
 import time
+import threading
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from src.generator.llm_loader import manager
+from src.generator.async_llm_loader import async_manager
+from src.memory.vector_index import MemoryVectorIndex
+from src.storage.base import slugify
+from src.storage.storage_loader import get_storage
+from src.utils.metrics import registry
+from src.utils.tracing import traced
+
+
+# Retrieval is a local embedding search, not an LLM call, so it has its own histogram
+MEMORY_RETRIEVAL_SECONDS = registry.histogram("vibe_memory_retrieval_seconds", "Memory retrieval (embedding search) latency")
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+def novel_sentences(existing: str, addition: str, embedder, threshold: float = 0.85) -> List[str]:
+    """Sentences of `addition` not already said (nearly verbatim) by a sentence of `existing`"""
+    old = [s for s in SENTENCE_BOUNDARY.split(existing.strip()) if s]
+    new = [s for s in SENTENCE_BOUNDARY.split(addition.strip()) if s]
+    if not old or not new:
+        return new
+    vectors = embedder.embed(old + new)
+    similarity = vectors[len(old):] @ vectors[:len(old)].T
+    return [sentence for sentence, row in zip(new, similarity) if row.max() < threshold]
 
 
 class MemoryManager:
@@ -14,26 +38,16 @@ class MemoryManager:
     def __init__(self, character_name: str):
         self.character_name = character_name
         self.memory_dir = os.path.join("data", "memories")
-        self.memory_file = os.path.join(self.memory_dir, f"{character_name.lower().replace(' ', '_')}_memories.json")
+        self.memory_file = os.path.join(self.memory_dir, f"{slugify(character_name)}_memories.json")
         os.makedirs(self.memory_dir, exist_ok=True)
-        self.memories = self._load_memories()
-        
-    def _load_memories(self) -> List[Dict[str, Any]]:
-        """Load memories from file or create empty memory list"""
-        if os.path.exists(self.memory_file):
-            try:
-                with open(self.memory_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                print(f"Error reading memory file for {self.character_name}. Creating new memories.")
-                return []
-        return []
-    
-    def _save_memories(self) -> None:
-        """Save memories to file"""
-        with open(self.memory_file, 'w', encoding='utf-8') as f:
-            json.dump(self.memories, f, indent=2, ensure_ascii=False)
+        self.store = get_storage().memory_store(slugify(character_name))
+        self.memories = self.store.load()
+        self.index = MemoryVectorIndex(os.path.splitext(self.memory_file)[0])
+        self.index.sync(self.memories)
+        # Memories may be added from the consolidation worker while a reply is being built
+        self._lock = threading.RLock()
     
+    @traced("memory.add")
     def add_memory(self, content: str, importance: float = 0.5, 
                   metadata: Optional[Dict[str, Any]] = None) -> None:
         """
@@ -47,18 +61,67 @@ class MemoryManager:
         if metadata is None:
             metadata = {}
             
-        memory = {
-            "id": len(self.memories) + 1,
-            "timestamp": datetime.now().isoformat(),
-            "unix_time": time.time(),
-            "content": content,
-            "importance": importance,
-            "metadata": metadata
-        }
-        
-        self.memories.append(memory)
-        self._save_memories()
+        with self._lock:
+            # Ids are assigned under the lock: sessions sharing this manager may add concurrently
+            memory = {
+                "id": self.store.next_id(),
+                "timestamp": datetime.now().isoformat(),
+                "unix_time": time.time(),
+                "content": content,
+                "importance": importance,
+                "metadata": metadata
+            }
+            compacted = self.store.append(memory)
+            self.index.add(memory)
+            # The index is persisted alongside snapshots; newer rows are re-embedded on load
+            if compacted:
+                self.index.save()
+
+    def add_or_merge_memory(self, content: str, importance: float = 0.5,
+                            metadata: Optional[Dict[str, Any]] = None,
+                            threshold: float = 0.85) -> bool:
+        """
+        Add a memory, or merge it into a recent one it nearly duplicates, as one atomic step
+
+        Returns:
+            True if a new memory was added, False if it was merged
+        """
+        with self._lock:
+            position, similarity = self.index.most_similar(content)
+            if position is None or similarity < threshold:
+                self.add_memory(content, importance, metadata)
+                return True
+            self.merge_memory(position, content, importance, metadata, threshold)
+            return False
+
+    @traced("memory.merge")
+    def merge_memory(self, position: int, content: str, importance: float = 0.5,
+                     metadata: Optional[Dict[str, Any]] = None, threshold: float = 0.85) -> None:
+        """
+        Fold an overlapping summary into the memory at index `position`
+
+        Sentences the memory doesn't already cover are appended to it, it keeps
+        the higher importance and it is re-timestamped, so it ranks as recent.
+        """
+        with self._lock:
+            memory = self.memories[position]
+            added = novel_sentences(memory["content"], content, self.index.embedder, threshold)
+            if added:
+                memory["content"] = " ".join([memory["content"].strip()] + added)
+            memory["importance"] = max(memory.get("importance", 0.5), importance)
+            memory["timestamp"] = datetime.now().isoformat()
+            memory["unix_time"] = time.time()
+            merged_metadata = dict(memory.get("metadata") or {})
+            merged_metadata.update(metadata or {})
+            merged_metadata["merges"] = merged_metadata.get("merges", 0) + 1
+            memory["metadata"] = merged_metadata
+
+            self.store.update(memory)
+            self.index.update(position, memory)
+            # The persisted index is matched to memories by id only, so save the new vector now
+            self.index.save()
         
+    @traced("memory.summarize")
     def summarize_conversation(self, conversation_history: str) -> str:
         """
         Use LLM to summarize a conversation into a memory
@@ -73,18 +136,35 @@ class MemoryManager:
                                        character_name=self.character_name,
                                        conversation_history=conversation_history)
         
-        summary = manager.call_webui_api(prompt, max_tokens=100, temperature=0.7)
+        summary = manager.call_webui_api(prompt, max_tokens=100, temperature=0.7,
+                                          client=self.character_name, prompt_type="memory_summarization")
         return summary
-    
+
+    async def summarize_conversation_async(self, conversation_history: str) -> str:
+        """Async version of summarize_conversation"""
+        prompt = manager.generate_prompt("memory_summarization", 
+                                       character_name=self.character_name,
+                                       conversation_history=conversation_history)
+        
+        summary = await async_manager.call_webui_api(prompt, max_tokens=100, temperature=0.7,
+                                                     client=self.character_name,
+                                                     prompt_type="memory_summarization")
+        return summary
+
+    @traced("memory.retrieve")
     def retrieve_relevant_memories(self, user_input: str, current_conversation: str, 
-                                 character_traits: List[str]) -> List[str]:
+                                 character_traits: List[str], top_k: int = 3) -> List[str]:
         """
         Retrieve memories relevant to current conversation context
         
+        Memories are ranked locally by embedding similarity, weighted by their
+        importance and recency, so no LLM call is needed.
+        
         Args:
             user_input: The most recent user message
             current_conversation: The current conversation history
             character_traits: List of the character's traits
+            top_k: Maximum number of memories to return
             
         Returns:
             List of relevant memory contents
@@ -93,27 +173,19 @@ class MemoryManager:
             return []
             
         # If we have too few memories, just return all of them
-        if len(self.memories) <= 3:
+        if len(self.memories) <= top_k:
             return [memory["content"] for memory in self.memories]
         
-        # Format all memories for retrieval prompt
-        all_memories_text = "\n".join([
-            f"Memory {i+1} ({memory.get('timestamp', 'unknown date')}): {memory['content']}"
-            for i, memory in enumerate(self.memories)
-        ])
-        
-        # Request memory retrieval via LLM
-        prompt = manager.generate_prompt("memory_retrieval",
-                                      character_name=self.character_name,
-                                      traits=", ".join(character_traits),
-                                      current_conversation=current_conversation,
-                                      user_input=user_input,
-                                      all_memories=all_memories_text)
-        
-        relevant_memories = manager.call_webui_api(prompt, max_tokens=200, temperature=0.7)
-        
-        # Return the raw relevant memories text
-        return [relevant_memories]
+        # The latest message matters most, so it is repeated ahead of the context
+        query = f"{user_input}\n{user_input}\n{current_conversation}"
+        with MEMORY_RETRIEVAL_SECONDS.time(), self._lock:
+            results = self.index.search(query, self.memories, top_k=top_k)
+        return [memory["content"] for memory, _ in results]
+
+    async def retrieve_relevant_memories_async(self, user_input: str, current_conversation: str,
+                                             character_traits: List[str], top_k: int = 3) -> List[str]:
+        """Async version of retrieve_relevant_memories (retrieval is local and fast)"""
+        return self.retrieve_relevant_memories(user_input, current_conversation, character_traits, top_k)
     
     def get_all_memories(self) -> List[Dict[str, Any]]:
         """Get all memories"""
@@ -121,7 +193,4 @@ class MemoryManager:
     
     def get_memory_by_id(self, memory_id: int) -> Optional[Dict[str, Any]]:
         """Get memory by ID"""
-        for memory in self.memories:
-            if memory["id"] == memory_id:
-                return memory
-        return None 
\ No newline at end of file
+        return self.store.get(memory_id) 
\ No newline at end of file
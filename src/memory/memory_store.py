@@ -0,0 +1,129 @@
+import os
+import json
+from typing import Any, Dict, List, Optional
+
+
+class JSONMemoryStore:
+    """
+    Crash-safe memory storage with O(1) appends.
+
+    Memories live in a JSON snapshot (`<name>_memories.json`, the original
+    format) plus an append-only journal (`<name>_memories.jsonl`) holding
+    memories added since the last snapshot. Every `compact_every` appends the
+    journal is folded into a new snapshot, written to a temp file and renamed
+    into place so a crash never leaves a half-written snapshot.
+    """
+
+    def __init__(self, snapshot_path: str, compact_every: int = 50, fsync: bool = False):
+        self.snapshot_path = snapshot_path
+        self.journal_path = os.path.splitext(snapshot_path)[0] + ".jsonl"
+        self.compact_every = compact_every
+        self.fsync = fsync
+
+        self.memories: List[Dict[str, Any]] = []
+        self.by_id: Dict[int, Dict[str, Any]] = {}
+        # Highest integer id seen, so next_id doesn't scan every id per append
+        self._max_id = 0
+        self.journal_length = 0
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Load the snapshot and replay the journal on top of it"""
+        self.memories = []
+        self.by_id = {}
+        self._max_id = 0
+        self.journal_length = 0
+
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    for memory in json.load(f):
+                        self._index(memory)
+            except json.JSONDecodeError:
+                print(f"Error reading memory snapshot {self.snapshot_path}. Starting from the journal.")
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        memory = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Truncated line from an interrupted write
+                    self.journal_length += 1
+                    # A later version of a known memory: an update, or an entry already
+                    # folded into the snapshot (crash during compaction)
+                    existing = self.by_id.get(memory.get("id")) if memory.get("id") is not None else None
+                    if existing is None:
+                        self._index(memory)
+                    else:
+                        existing.clear()
+                        existing.update(memory)
+
+        return self.memories
+
+    def _index(self, memory: Dict[str, Any]) -> None:
+        self.memories.append(memory)
+        memory_id = memory.get("id")
+        self.by_id[memory_id] = memory
+        if isinstance(memory_id, int) and memory_id > self._max_id:
+            self._max_id = memory_id
+
+    def next_id(self) -> int:
+        """Id for the next memory"""
+        return self._max_id + 1
+
+    def append(self, memory: Dict[str, Any]) -> bool:
+        """
+        Append a memory to the journal, compacting when the journal is long enough.
+
+        Returns:
+            True if the append triggered a compaction
+        """
+        self._index(memory)
+        return self._journal(memory)
+
+    def update(self, memory: Dict[str, Any]) -> bool:
+        """
+        Persist a memory that was changed in place; the journal entry replaces
+        the older version on load.
+
+        Returns:
+            True if the update triggered a compaction
+        """
+        return self._journal(memory)
+
+    def _journal(self, memory: Dict[str, Any]) -> bool:
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(memory, ensure_ascii=False) + "\n")
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        self.journal_length += 1
+
+        if self.journal_length >= self.compact_every:
+            self.compact()
+            return True
+        return False
+
+    def get(self, memory_id: int) -> Optional[Dict[str, Any]]:
+        """Get memory by ID in O(1)"""
+        return self.by_id.get(memory_id)
+
+    def compact(self) -> None:
+        """Write a fresh snapshot atomically and clear the journal"""
+        write_json_atomic(self.snapshot_path, self.memories)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self.journal_length = 0
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """Write JSON to a temp file and rename it over `path`"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
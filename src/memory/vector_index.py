@@ -0,0 +1,224 @@
+import os
+import re
+import json
+import math
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingEmbedder:
+    """
+    Dependency-free embedder using the hashing trick.
+
+    Unigrams and bigrams are hashed into a fixed number of signed buckets with
+    sublinear term frequency and the result is L2-normalized. IDF weighting is
+    applied at query time by MemoryVectorIndex.
+    """
+
+    sparse = True
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def tokenize(self, text: str) -> List[str]:
+        words = TOKEN_PATTERN.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts: Dict[int, int] = {}
+            for token in self.tokenize(text):
+                h = zlib.crc32(token.encode("utf-8"))
+                bucket = h % self.dim
+                sign = 1 if (h >> 31) & 1 else -1
+                counts[bucket] = counts.get(bucket, 0) + sign
+            for bucket, count in counts.items():
+                if count:
+                    vectors[row, bucket] = math.copysign(1 + math.log(abs(count)), count)
+        return normalize(vectors)
+
+
+class SentenceTransformerEmbedder:
+    """
+    Embedder backed by a small local sentence-transformers model (optional dependency).
+    """
+
+    sparse = False
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"st-{model_name}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+        return vectors.astype(np.float32)
+
+
+def get_embedder(spec: Optional[str] = None):
+    """
+    Create the embedder named by `spec` or the VIBE_EMBEDDER environment variable.
+
+    Supported values: "hashing" (default) or "sentence-transformers[:model_name]".
+    Falls back to the hashing embedder if sentence-transformers is not installed.
+    """
+    spec = spec or os.environ.get("VIBE_EMBEDDER", "hashing")
+    if spec.startswith("sentence-transformers"):
+        _, _, model_name = spec.partition(":")
+        try:
+            return SentenceTransformerEmbedder(model_name or "all-MiniLM-L6-v2")
+        except ImportError:
+            print("sentence-transformers is not installed, falling back to hashing embedder.")
+    return HashingEmbedder()
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows, leaving all-zero rows untouched"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class MemoryVectorIndex:
+    """
+    Persisted cosine-similarity index over a character's memories.
+
+    Embeddings are stored as a float32 matrix in `<prefix>.index.npy`, with the
+    memory ids and embedder name in `<prefix>.index.json`.
+    """
+
+    def __init__(self, path_prefix: str, embedder=None,
+                 importance_weight: float = 0.2, recency_weight: float = 0.1,
+                 recency_half_life: float = 7 * 24 * 3600):
+        self.matrix_path = f"{path_prefix}.index.npy"
+        self.meta_path = f"{path_prefix}.index.json"
+        self.embedder = embedder or get_embedder()
+        self.importance_weight = importance_weight
+        self.recency_weight = recency_weight
+        self.recency_half_life = recency_half_life
+
+        self.ids: List[int] = []
+        self.matrix = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self.doc_freq = np.zeros(self.embedder.dim, dtype=np.float32)
+        self.importance = np.zeros(0, dtype=np.float32)
+        self.unix_time = np.zeros(0, dtype=np.float64)
+
+    def _load(self) -> bool:
+        if not (os.path.exists(self.matrix_path) and os.path.exists(self.meta_path)):
+            return False
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            matrix = np.load(self.matrix_path)
+        except (OSError, ValueError):
+            return False
+        if meta.get("embedder") != self.embedder.name or matrix.shape[0] != len(meta.get("ids", [])):
+            return False
+        self.ids = meta["ids"]
+        self.matrix = matrix.astype(np.float32, copy=False)
+        return True
+
+    def save(self) -> None:
+        """Persist the embedding matrix and id sidecar"""
+        np.save(self.matrix_path, self.matrix)
+        with open(self.meta_path, 'w', encoding='utf-8') as f:
+            json.dump({"embedder": self.embedder.name, "ids": self.ids}, f)
+
+    def sync(self, memories: List[Dict[str, Any]]) -> None:
+        """Load the persisted index and embed any memories it is missing"""
+        memory_ids = [memory["id"] for memory in memories]
+        self.importance = np.array([m.get("importance", 0.5) for m in memories], dtype=np.float32)
+        self.unix_time = np.array([m.get("unix_time", 0.0) for m in memories], dtype=np.float64)
+        if self._load() and self.ids == memory_ids:
+            self.doc_freq = (self.matrix != 0).sum(axis=0).astype(np.float32)
+            return
+
+        known = dict(zip(self.ids, self.matrix))
+        missing = [memory for memory in memories if memory["id"] not in known]
+        if missing:
+            for memory, vector in zip(missing, self.embedder.embed([m["content"] for m in missing])):
+                known[memory["id"]] = vector
+
+        self.ids = memory_ids
+        if memory_ids:
+            self.matrix = np.stack([known[memory_id] for memory_id in memory_ids]).astype(np.float32)
+        else:
+            self.matrix = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self.doc_freq = (self.matrix != 0).sum(axis=0).astype(np.float32)
+        self.save()
+
+    def add(self, memory: Dict[str, Any]) -> None:
+        """Embed and append a single memory (call save() to persist)"""
+        vector = self.embedder.embed([memory["content"]])
+        self.ids.append(memory["id"])
+        self.matrix = np.vstack([self.matrix, vector])
+        self.doc_freq += (vector[0] != 0)
+        self.importance = np.append(self.importance, np.float32(memory.get("importance", 0.5)))
+        self.unix_time = np.append(self.unix_time, memory.get("unix_time", time.time()))
+
+    def update(self, position: int, memory: Dict[str, Any]) -> None:
+        """Re-embed the memory at `position` after it changed in place (call save() to persist)"""
+        vector = self.embedder.embed([memory["content"]])[0]
+        self.doc_freq += (vector != 0).astype(np.float32) - (self.matrix[position] != 0)
+        self.matrix[position] = vector
+        self.importance[position] = memory.get("importance", 0.5)
+        self.unix_time[position] = memory.get("unix_time", time.time())
+
+    def most_similar(self, text: str, last_n: int = 5) -> Tuple[Optional[int], float]:
+        """
+        The most similar of the `last_n` most recent memories to `text`
+
+        Returns:
+            (index position of that memory or None if the index is empty, cosine similarity)
+        """
+        if not self.ids:
+            return None, 0.0
+        vector = self.embedder.embed([text])[0]
+        similarity = self.matrix[-last_n:] @ vector
+        best = int(similarity.argmax())
+        return len(self.ids) - len(similarity) + best, float(similarity[best])
+
+    def search(self, query: str, memories: List[Dict[str, Any]], top_k: int = 3,
+               now: Optional[float] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Rank memories by cosine similarity to `query`, boosted by importance and recency.
+
+        Args:
+            query: Text to match against memory contents
+            memories: Memories in index order (same ids as the index)
+            top_k: Number of results to return
+            now: Reference unix time for recency (defaults to current time)
+
+        Returns:
+            List of (memory, score) pairs, best first
+        """
+        if not self.ids or top_k <= 0:
+            return []
+
+        query_vector = self.embedder.embed([query])[0]
+        if self.embedder.sparse:
+            idf = np.log((1 + len(self.ids)) / (1 + self.doc_freq)) + 1
+            query_vector = normalize((query_vector * idf)[None, :])[0]
+
+        similarity = self.matrix @ query_vector
+
+        now = now if now is not None else time.time()
+        age = np.maximum(now - self.unix_time, 0)
+        recency = np.exp2(-age / self.recency_half_life).astype(np.float32)
+
+        scores = similarity + self.importance_weight * self.importance + self.recency_weight * recency
+
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(memories[i], float(scores[i])) for i in top]
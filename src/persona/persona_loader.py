@@ -1,18 +1,13 @@
-import json
-import os
+from src.storage.storage_loader import get_storage
 
 
 def load_persona(character_name: str) -> dict:
     """
-    Load character persona JSON file.
+    Load character persona from the configured storage backend.
     """
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    persona_path = os.path.normpath(os.path.join(base_path, "..", "..", "data", "characters", f"{character_name.lower()}.json"))
+    persona = get_storage().load_character(character_name.lower())
 
-    if not os.path.exists(persona_path):
-        raise FileNotFoundError(f"Persona file not found for {character_name} at {persona_path}")
-
-    with open(persona_path, 'r', encoding='utf-8') as f:
-        persona = json.load(f)
+    if persona is None:
+        raise FileNotFoundError(f"Persona not found for {character_name}")
 
     return persona
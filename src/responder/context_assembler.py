@@ -0,0 +1,155 @@
+import os
+from typing import Dict, List, Optional, Tuple
+
+from src.memory.consolidation import approximate_tokens
+from src.responder.prompt_builder import PromptBuilder, prompt_builder
+
+
+class ApproximateTokenCounter:
+    """~4 characters per token; no dependencies and no tokenizer load"""
+    name = "approx"
+
+    def count(self, text: str) -> int:
+        return approximate_tokens(text)
+
+
+class TiktokenCounter:
+    """Exact counts for OpenAI-style BPE encodings (tiktoken imported on first use)"""
+    name = "tiktoken"
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        import tiktoken
+        self.encoding = tiktoken.get_encoding(encoding)
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+
+class HFTokenCounter:
+    """Exact counts with a Hugging Face tokenizer (transformers imported on first use)"""
+    name = "hf"
+
+    def __init__(self, model: str):
+        from transformers import AutoTokenizer
+        self.tokenizer = AutoTokenizer.from_pretrained(model)
+
+    def count(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+
+def get_token_counter(spec: Optional[str] = None):
+    """
+    Create a token counter from a spec such as "approx", "tiktoken[:encoding]" or "hf:<model>".
+
+    Defaults to the VIBE_TOKENIZER environment variable, then "approx".
+    """
+    spec = spec or os.environ.get("VIBE_TOKENIZER", "approx")
+    name, _, arg = spec.partition(":")
+    if name == "approx":
+        return ApproximateTokenCounter()
+    if name == "tiktoken":
+        return TiktokenCounter(arg or "cl100k_base")
+    if name == "hf" and arg:
+        return HFTokenCounter(arg)
+    raise ValueError(f"Unknown tokenizer '{spec}'. Use approx, tiktoken[:encoding] or hf:<model>.")
+
+
+_token_counter = None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with the process-wide counter configured by VIBE_TOKENIZER"""
+    global _token_counter
+    if _token_counter is None:
+        _token_counter = get_token_counter()
+    return _token_counter.count(text)
+
+
+class AssembledContext:
+    """A prompt together with the tokens each of its sections used"""
+
+    def __init__(self, prompt: str, tokens: Dict[str, int], memories: List[str]):
+        self.prompt = prompt
+        self.tokens = tokens
+        self.memories = memories
+
+
+class ContextAssembler:
+    """
+    Fits persona, memories and history into a token budget.
+
+    The persona prefix and the current message are always included. Memories
+    (in relevance order) get up to `memory_share` of the budget and history
+    the rest, less `completion_tokens` reserved for the reply. History comes
+    from ChatSession.get_prompt_history, which keeps the prompt append-only
+    between turns.
+    """
+
+    def __init__(self, max_context_tokens: Optional[int] = None, completion_tokens: int = 150,
+                 memory_share: float = 0.25, builder: PromptBuilder = prompt_builder):
+        self.max_context_tokens = max_context_tokens or int(os.environ.get("VIBE_CONTEXT_TOKENS", 2048))
+        self.completion_tokens = completion_tokens
+        self.memory_share = memory_share
+        self.builder = builder
+        self._prefix_tokens: Dict[str, int] = {}
+
+    def _count_prefix(self, prefix: str) -> int:
+        tokens = self._prefix_tokens.get(prefix)
+        if tokens is None:
+            if len(self._prefix_tokens) > 1024:
+                self._prefix_tokens.clear()
+            tokens = self._prefix_tokens[prefix] = count_tokens(prefix)
+        return tokens
+
+    def fit_memories(self, memories: List[str], budget: int) -> Tuple[List[str], int]:
+        """
+        Keep memories in relevance order while they fit in `budget` tokens
+
+        Returns:
+            (fitted memories, tokens used)
+        """
+        fitted = []
+        used = 0
+        for memory in memories:
+            tokens = count_tokens(memory) + 1
+            if used + tokens <= budget:
+                fitted.append(memory)
+                used += tokens
+        return fitted, used
+
+    def assemble(self, user_input: str, persona: Dict, chat_session, memories: List[str]) -> AssembledContext:
+        """
+        Build the character_response prompt for this turn within the token budget.
+
+        Args:
+            user_input: The user's message for this turn
+            persona: Character persona data
+            chat_session: ChatSession holding the conversation (current message already added)
+            memories: Retrieved memories, most relevant first
+        """
+        available = self.max_context_tokens - self.completion_tokens
+
+        prefix = self.builder.prefix(persona)
+        prefix_tokens = self._count_prefix(prefix)
+
+        memory_budget = max(0, min(int(self.max_context_tokens * self.memory_share), available - prefix_tokens))
+        fitted, memory_tokens = self.fit_memories(memories, memory_budget)
+        turn = self.builder.turn(user_input, persona, fitted)
+        turn_tokens = count_tokens(turn)
+
+        history_budget = max(0, available - prefix_tokens - turn_tokens)
+        history, history_tokens = chat_session.get_prompt_history(history_budget)
+
+        prompt = self.builder.join(prefix, history, turn, previous_prompt=chat_session.last_prompt)
+        tokens = {
+            "persona": prefix_tokens,
+            "history": history_tokens,
+            "memories": memory_tokens,
+            "message": turn_tokens - memory_tokens,
+            "budget": self.max_context_tokens,
+        }
+        tokens["total"] = prefix_tokens + history_tokens + turn_tokens
+        return AssembledContext(prompt, tokens, fitted)
+
+
+context_assembler = ContextAssembler()
@@ -0,0 +1,122 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from src.generator.llm_loader import manager
+
+
+class PromptBuilder:
+    """
+    Builds character_response prompts as a stable persona prefix followed by
+    an append-only conversation tail.
+
+    The prefix (instructions and persona fields) never changes for a
+    character, and each turn only appends to the history after it; the
+    memories retrieved for the current turn come last. Consecutive prompts
+    of a session therefore share everything up to the latest turn, which
+    lets the LLM server reuse its prompt (KV) cache instead of reprocessing
+    the whole prompt.
+
+    Rendered prefixes are cached per persona. `stats()` reports how often the
+    cached prefix was reused and what fraction of each prompt repeated the
+    session's previous prompt.
+    """
+
+    def __init__(self, max_cached: int = 256):
+        self.max_cached = max_cached
+        self._prefixes: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"builds": 0, "prefix_hits": 0, "prefix_misses": 0, "reused_chars": 0, "prompt_chars": 0}
+
+    def _persona_key(self, persona: Dict) -> str:
+        return json.dumps([
+            persona.get('name'), persona.get('traits', []), persona.get('style', ''), persona.get('background', '')
+        ], ensure_ascii=False)
+
+    def prefix(self, persona: Dict) -> str:
+        """Rendered, cached persona prefix for `persona`"""
+        key = self._persona_key(persona)
+        with self._lock:
+            cached = self._prefixes.get(key)
+            if cached is not None:
+                self._prefixes.move_to_end(key)
+                self.counters["prefix_hits"] += 1
+                return cached
+            self.counters["prefix_misses"] += 1
+
+        rendered = manager.generate_prompt(
+            "character_response_prefix",
+            character_name=persona['name'],
+            traits=", ".join(persona.get('traits', [])),
+            style=persona.get('style', ''),
+            background=persona.get('background', '')
+        )
+        with self._lock:
+            self._prefixes[key] = rendered
+            while len(self._prefixes) > self.max_cached:
+                self._prefixes.popitem(last=False)
+        return rendered
+
+    def turn(self, user_input: str, persona: Dict, memories: List[str]) -> str:
+        """Render the part of the prompt after the history: this turn's memories and message"""
+        return manager.generate_prompt(
+            "character_response_turn",
+            character_name=persona['name'],
+            memory="\n".join(memories) if memories else "No relevant memories.",
+            user_input=user_input
+        )
+
+    def join(self, prefix: str, history: str, turn: str, previous_prompt: Optional[str] = None) -> str:
+        """
+        Concatenate prefix, history and turn, recording how much of the
+        session's previous prompt the result repeats.
+        """
+        prompt = prefix + history + turn
+
+        reused = shared_prefix_length(prompt, previous_prompt) if previous_prompt else 0
+        with self._lock:
+            self.counters["builds"] += 1
+            self.counters["reused_chars"] += reused
+            self.counters["prompt_chars"] += len(prompt)
+        return prompt
+
+    def build(self, user_input: str, persona: Dict, history: str, memories: List[str],
+              previous_prompt: Optional[str] = None) -> str:
+        """
+        Assemble a prompt from the persona prefix, the conversation so far and this turn.
+
+        Args:
+            user_input: The user's message for this turn
+            persona: Character persona data
+            history: Formatted conversation before this turn (append-only between turns)
+            memories: Memories retrieved for this turn
+            previous_prompt: The session's previous prompt, to measure prefix reuse
+        """
+        return self.join(self.prefix(persona), history, self.turn(user_input, persona, memories), previous_prompt)
+
+    def stats(self) -> Dict[str, float]:
+        """Counters plus the prefix cache hit ratio and the share of prompt text repeated from the previous turn"""
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters["prefix_hits"] + counters["prefix_misses"]
+        counters["prefix_hit_ratio"] = counters["prefix_hits"] / lookups if lookups else 0.0
+        counters["prompt_reuse_ratio"] = (
+            counters["reused_chars"] / counters["prompt_chars"] if counters["prompt_chars"] else 0.0
+        )
+        return counters
+
+
+def shared_prefix_length(a: str, b: str) -> int:
+    """Length of the common prefix of two strings (binary search over C-level slice comparisons)"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[:mid] == b[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+prompt_builder = PromptBuilder()
@@ -1,70 +1,251 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+from bisect import bisect_left
+from concurrent.futures import Future
 import json
 import os
+import threading
+import time
 from src.generator.llm_loader import manager
+from src.generator.async_llm_loader import async_manager
 from src.memory.memory_manager import MemoryManager
+from src.responder.context_assembler import AssembledContext, context_assembler, count_tokens
+from src.memory.consolidation import ConsolidationPolicy, consolidation_executor
+from src.storage.storage_loader import get_storage
+from src.utils.tracing import bind_context, current_span, keep_context, span, traced
 
 
 class ChatSession:
     """
     Maintains the state of a conversation with memory and seed tracking
+    
+    Recent messages are summarized into memory according to a ConsolidationPolicy
+    (every N turns, over a token budget, when idle or at session end) on a
+    background worker, instead of after every reply.
     """
     
-    def __init__(self, character: Dict):
+    def __init__(self, character: Dict, policy: Optional[ConsolidationPolicy] = None,
+                 memory_manager: Optional[MemoryManager] = None):
         self.character = character
         self.conversation_history = []
-        self.memory_manager = MemoryManager(character['name'])
+        # Sessions of one character can share a manager (see src/api/sessions.py)
+        self.memory_manager = memory_manager or MemoryManager(character['name'])
         self.current_seed = character.get('core_seed', 12345)
+        self.policy = policy or ConsolidationPolicy()
+        # Messages before this index have already been summarized into memory
+        self.consolidated_upto = 0
+        self.stats = {"turns": 0, "consolidations": 0, "llm_calls_saved": 0, "memories_merged": 0}
+        self._consolidation_lock = threading.Lock()
+        self._pending_consolidation: Optional[Future] = None
+        self._idle_timer: Optional[threading.Timer] = None
+        self._added_memories: List[str] = []
+        # ResponseResult of the most recent turn
+        self.last_result = None
+        # First message of the prompt history window, and the last prompt sent (for prefix reuse)
+        self.history_start = 0
+        self.last_prompt: Optional[str] = None
+        # Messages rendered once as prompt lines, with running token totals (offsets[i] = tokens before message i)
+        self._rendered: List[str] = []
+        self._token_offsets: List[int] = [0]
+        self._window = (0, 0, "")
         
+    @traced("chat.add_message")
     def add_message(self, speaker: str, message: str) -> None:
         """Add a message to the conversation history"""
         self.conversation_history.append({
             "speaker": speaker,
             "message": message
         })
+        line = self._render({"speaker": speaker, "message": message})
+        self._rendered.append(line)
+        self._token_offsets.append(self._token_offsets[-1] + count_tokens(line))
         
     def get_formatted_history(self, max_messages: int = 10) -> str:
         """Get formatted conversation history for prompt context"""
         # Get the last N messages
-        recent_messages = self.conversation_history[-max_messages:] if max_messages > 0 else self.conversation_history
+        recent_lines = self._rendered[-max_messages:] if max_messages > 0 else self._rendered
+        return "".join(recent_lines)
+
+    def get_prompt_history(self, max_tokens: int) -> Tuple[str, int]:
+        """
+        Conversation before the latest message that fits in `max_tokens`, as an append-only window.
+
+        The window start only jumps forward once the window outgrows the
+        budget (to half the budget, leaving room to grow), so between jumps
+        each prompt extends the previous one and the LLM server can reuse its
+        cached prefix. The window text is extended incrementally.
+
+        Returns:
+            (history text, tokens used)
+        """
+        end = max(0, len(self._rendered) - 1)
+        offsets = self._token_offsets
+        start = min(self.history_start, end)
+        if offsets[end] - offsets[start] > max_tokens:
+            start = bisect_left(offsets, offsets[end] - max_tokens // 2, start, end + 1)
+        self.history_start = start
+
+        window_start, window_end, text = self._window
+        if window_start == start and window_end <= end:
+            text += "".join(self._rendered[window_end:end])
+        else:
+            text = "".join(self._rendered[start:end])
+        self._window = (start, end, text)
+        return text, offsets[end] - offsets[start]
+
+    def _render(self, msg: Dict) -> str:
+        if msg["speaker"] == "User":
+            return f"User: {msg['message']}\n"
+        return f"{self.character['name']}: {msg['message']}\n"
+
+    def record_turn(self) -> None:
+        """Register a completed turn and schedule consolidation if the policy says so"""
+        self.stats["turns"] += 1
         
-        formatted = ""
-        for msg in recent_messages:
-            if msg["speaker"] == "User":
-                formatted += f"User: {msg['message']}\n"
-            else:
-                formatted += f"{self.character['name']}: {msg['message']}\n"
-                
-        return formatted
-    
-    def update_memory(self) -> None:
-        """Update memory with a summary of the recent conversation"""
-        if len(self.conversation_history) < 2:
-            return  # Not enough conversation to summarize
-            
-        # Format last 10 messages for summarization
-        conversation_text = self.get_formatted_history(10)
+        pending = self.conversation_history[self.consolidated_upto:]
+        pending_turns = sum(1 for msg in pending if msg["speaker"] == "User")
+        pending_tokens = self._token_offsets[-1] - self._token_offsets[self.consolidated_upto]
         
-        # Get memory summary
-        memory_summary = self.memory_manager.summarize_conversation(conversation_text)
+        if self.policy.should_consolidate(pending_turns, pending_tokens):
+            # Skipped if one is already running; its messages stay pending for the next
+            self.consolidate_in_background(on_turn=True)
+        else:
+            # Summarizing after every turn would have cost an LLM call here
+            self.stats["llm_calls_saved"] += 1
         
-        # Calculate importance based on conversation length and seed
-        importance = min(0.9, 0.3 + (len(self.conversation_history) * 0.05))
+        self._reset_idle_timer()
+
+    def consolidate_in_background(self, on_turn: bool = False) -> bool:
+        """
+        Summarize pending messages on the consolidation worker (at most one job at a time)
         
-        # Add to memory
-        self.memory_manager.add_memory(
-            content=memory_summary,
-            importance=importance,
-            metadata={"seed": self.current_seed}
-        )
+        Args:
+            on_turn: Scheduled for a completed turn, where summarizing every turn would
+                have made the call anyway (idle consolidations are extra calls)
+        
+        Returns:
+            False if a consolidation was already running
+        """
+        if self._pending_consolidation is not None and not self._pending_consolidation.done():
+            return False
+        self._pending_consolidation = consolidation_executor.submit(bind_context(self.update_memory), on_turn)
+        return True
+
+    def _reset_idle_timer(self) -> None:
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+        if self.policy.idle_seconds:
+            self._idle_timer = threading.Timer(self.policy.idle_seconds, self.consolidate_in_background)
+            self._idle_timer.daemon = True
+            self._idle_timer.start()
+
+    def end_session(self) -> None:
+        """Stop the idle timer, wait for background work and consolidate what is left"""
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+        if self._pending_consolidation is not None:
+            try:
+                self._pending_consolidation.result()
+            except Exception as e:
+                # Its messages are still pending, so the final consolidation retries them
+                print(f"❌ Background memory consolidation failed: {e}")
+        if self.policy.on_session_end:
+            self.update_memory()
+    
+    @traced("chat.update_memory")
+    def update_memory(self, on_turn: bool = False) -> None:
+        """
+        Update memory with a summary of the messages not yet consolidated
+
+        Args:
+            on_turn: Run for a completed turn; otherwise (idle, session end) the call
+                is counted against llm_calls_saved
+        """
+        with self._consolidation_lock:
+            upto = len(self.conversation_history)
+            pending = self.conversation_history[self.consolidated_upto:upto]
+            if len(pending) < 2:
+                return  # Not enough conversation to summarize
+            
+            # Get memory summary
+            memory_summary = self.memory_manager.summarize_conversation("".join(self._rendered[self.consolidated_upto:upto]))
+            if memory_summary == "[ERROR]":
+                return  # Keep the messages pending and retry at the next consolidation
+            
+            self.consolidated_upto = upto
+            self.stats["consolidations"] += 1
+            if not on_turn:
+                self.stats["llm_calls_saved"] -= 1
+            
+            # Calculate importance based on conversation length and seed
+            importance = min(0.9, 0.3 + (len(self.conversation_history) * 0.05))
+            
+            # Windows don't overlap, but consecutive summaries of one topic can (also across
+            # sessions sharing the memory manager); those are merged into one memory
+            added = self.memory_manager.add_or_merge_memory(
+                content=memory_summary,
+                importance=importance,
+                metadata={"seed": self.current_seed},
+                threshold=self.policy.duplicate_threshold
+            )
+            if not added:
+                self.stats["memories_merged"] += 1
+                return
+            self._added_memories.append(memory_summary)
+
+    def pop_added_memories(self) -> Optional[str]:
+        """Memories added by consolidation since the last call, joined, or None"""
+        added = []
+        # pop() is atomic, so memories added concurrently by the worker are never lost
+        while self._added_memories:
+            added.append(self._added_memories.pop(0))
+        return "\n".join(added) if added else None
+
 
+class ResponseResult:
+    """
+    Outcome of a chat turn: the reply plus what went into it.
+    
+    Unpacks as (response, seed) for callers of the old tuple return value.
+    """
+    
+    def __init__(self, response: str, seed: int, memories_used: List[str],
+                 memory_added: Optional[str] = None, timings: Optional[Dict[str, float]] = None,
+                 prompt_tokens: int = 0, completion_tokens: int = 0,
+                 context_tokens: Optional[Dict[str, int]] = None):
+        self.response = response
+        self.seed = seed
+        self.memories_used = memories_used
+        self.memory_added = memory_added
+        self.timings = timings or {}
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        # Tokens per prompt section (persona, history, memories, message) and the budget
+        self.context_tokens = context_tokens or {}
+    
+    def __iter__(self):
+        return iter((self.response, self.seed))
+    
+    def to_dict(self) -> Dict:
+        return {
+            "response": self.response,
+            "seed": self.seed,
+            "memories_used": self.memories_used,
+            "memory_added": self.memory_added,
+            "timings": self.timings,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "context_tokens": self.context_tokens
+        }
 
+
+@traced("chat.turn")
 def generate_response(
     user_input: str, 
     persona: Dict, 
     chat_session: Optional[ChatSession] = None,
     seed: Optional[int] = None
-) -> Tuple[str, int]:
+) -> ResponseResult:
     """
     Generate a response from LLM with memory and dynamic seeding.
     
@@ -75,10 +256,13 @@ def generate_response(
         seed: Optional seed to force (uses character seed or dynamic if None)
         
     Returns:
-        Tuple of (response text, seed used)
+        ResponseResult with the response text, seed used, memories used and timings
     """
+    started = time.perf_counter()
+    
     # Initialize or use existing chat session
-    if chat_session is None:
+    owns_session = chat_session is None
+    if owns_session:
         chat_session = ChatSession(persona)
     
     # Set the seed value
@@ -88,30 +272,17 @@ def generate_response(
     # Add user message to history
     chat_session.add_message("User", user_input)
     
-    # Format character traits
-    traits_text = ", ".join(persona.get('traits', []))
-    
     # Get relevant memories
     memories = chat_session.memory_manager.retrieve_relevant_memories(
         user_input, 
         chat_session.get_formatted_history(), 
         persona.get('traits', [])
     )
-    
-    # Format memories for prompt
-    memory_text = "\n".join(memories) if memories else "No relevant memories."
+    retrieved = time.perf_counter()
     
     # Generate response with memories and conversation context
-    prompt = manager.generate_prompt(
-        "character_response",
-        character_name=persona['name'],
-        traits=traits_text,
-        style=persona.get('style', ''),
-        background=persona.get('background', ''),
-        memory=memory_text,
-        conversation_history=chat_session.get_formatted_history(),
-        user_input=user_input
-    )
+    context = assemble_context(user_input, persona, chat_session, memories)
+    prompt = context.prompt
     
     # Call the LLM with the character's seed
     response = manager.call_webui_api(
@@ -119,23 +290,172 @@ def generate_response(
         max_tokens=150,
         temperature=0.8,
         top_p=0.9,
-        seed=seed
+        seed=seed,
+        client=persona['name'],
+        prompt_type="character_response"
     )
+    generated = time.perf_counter()
     
     # Add response to chat history
     chat_session.add_message(persona['name'], response)
     
-    # Update memory with conversation summary
-    chat_session.update_memory()
+    return finish_turn(chat_session, owns_session, context, response, seed,
+                       started, retrieved, generated)
+
+
+@keep_context
+def generate_response_stream(
+    user_input: str, 
+    persona: Dict, 
+    chat_session: Optional[ChatSession] = None,
+    seed: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Streaming version of generate_response that yields response chunks as the LLM produces them.
+    
+    The full response is added to the chat history and memory is updated once the
+    stream is exhausted; the ResponseResult is then available as chat_session.last_result.
+    """
+    with span("chat.turn"):
+        started = time.perf_counter()
+    
+        owns_session = chat_session is None
+        if owns_session:
+            chat_session = ChatSession(persona)
+    
+        if seed is None:
+            seed = persona.get('core_seed', 12345)
+    
+        chat_session.add_message("User", user_input)
+    
+        memories = chat_session.memory_manager.retrieve_relevant_memories(
+            user_input, 
+            chat_session.get_formatted_history(), 
+            persona.get('traits', [])
+        )
+        retrieved = time.perf_counter()
+    
+        context = assemble_context(user_input, persona, chat_session, memories)
+        prompt = context.prompt
+    
+        chunks = []
+        first_token = None
+        for chunk in manager.stream_webui_api(
+            prompt,
+            max_tokens=150,
+            temperature=0.8,
+            top_p=0.9,
+            seed=seed,
+            client=persona['name'],
+            prompt_type="character_response"
+        ):
+            # Drop leading whitespace so the streamed text matches the stripped blocking response
+            if not chunks:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                first_token = time.perf_counter()
+            chunks.append(chunk)
+            yield chunk
+        generated = time.perf_counter()
+    
+        response = "".join(chunks).strip()
+        chat_session.add_message(persona['name'], response)
+        result = finish_turn(chat_session, owns_session, context, response, seed,
+                             started, retrieved, generated)
+        if first_token is not None:
+            result.timings["first_token"] = first_token - retrieved
+
+
+async def generate_response_async(
+    user_input: str, 
+    persona: Dict, 
+    chat_session: Optional[ChatSession] = None,
+    seed: Optional[int] = None
+) -> ResponseResult:
+    """
+    Async version of generate_response; awaits every LLM call on the event loop.
+    """
+    started = time.perf_counter()
+    
+    owns_session = chat_session is None
+    if owns_session:
+        chat_session = ChatSession(persona)
+    
+    if seed is None:
+        seed = persona.get('core_seed', 12345)
+    
+    chat_session.add_message("User", user_input)
+    
+    memories = await chat_session.memory_manager.retrieve_relevant_memories_async(
+        user_input, 
+        chat_session.get_formatted_history(), 
+        persona.get('traits', [])
+    )
+    retrieved = time.perf_counter()
+    
+    context = assemble_context(user_input, persona, chat_session, memories)
+    prompt = context.prompt
+    
+    response = await async_manager.call_webui_api(
+        prompt,
+        max_tokens=150,
+        temperature=0.8,
+        top_p=0.9,
+        seed=seed,
+        client=persona['name'],
+        prompt_type="character_response"
+    )
+    generated = time.perf_counter()
+    
+    chat_session.add_message(persona['name'], response)
+    
+    return finish_turn(chat_session, owns_session, context, response, seed,
+                       started, retrieved, generated)
+
+
+def finish_turn(chat_session: ChatSession, owns_session: bool, context: AssembledContext, response: str,
+                seed: int, started: float, retrieved: float, generated: float) -> ResponseResult:
+    """Hand a completed turn to memory consolidation and build its ResponseResult"""
+    if owns_session:
+        # A throwaway session has no later turns to batch with
+        chat_session.consolidate_in_background(on_turn=True)
+    else:
+        chat_session.record_turn()
     
-    return response, seed
+    result = ResponseResult(
+        response=response,
+        seed=seed,
+        memories_used=context.memories,
+        memory_added=chat_session.pop_added_memories(),
+        timings={
+            "retrieval": retrieved - started,
+            "generation": generated - retrieved,
+            "total": time.perf_counter() - started
+        },
+        prompt_tokens=context.tokens["total"],
+        completion_tokens=count_tokens(response),
+        context_tokens=context.tokens
+    )
+    chat_session.last_result = result
+    return result
+
+
+@traced("chat.assemble_context")
+def assemble_context(user_input: str, persona: Dict, chat_session: ChatSession,
+                     memories: List[str]) -> AssembledContext:
+    """Build this turn's prompt within the context token budget (persona prefix, history, memories, message)"""
+    context = context_assembler.assemble(user_input, persona, chat_session, memories)
+    chat_session.last_prompt = context.prompt
+    return context
 
 
 def load_character(character_path: str) -> Dict:
-    """Load a character from a JSON file"""
+    """Load a character from a JSON file (or its stem key in the configured storage backend)"""
     try:
-        with open(character_path, 'r', encoding='utf-8') as f:
-            character = json.load(f)
+        character = get_storage().load_character_path(character_path)
+        if character is None:
+            raise FileNotFoundError(f"Character not found: {character_path}")
         return character
     except (FileNotFoundError, json.JSONDecodeError) as e:
         print(f"Error loading character: {e}")
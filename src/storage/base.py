@@ -0,0 +1,59 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def slugify(name: str) -> str:
+    """Turn a character name into the slug used for file names and keys"""
+    return name.lower().replace(" ", "_")
+
+
+class StorageBackend:
+    """
+    Interface for persisting characters, memories and logs.
+
+    Character and memory keys are slugs (see `slugify`). Log streams are
+    identified by the log path used by src.utils.logger (for example
+    `logs/luna/interaction_log.jsonl`), so backends can map them as they like.
+    """
+    name = "base"
+
+    def load_character(self, slug: str) -> Optional[Dict[str, Any]]:
+        """Load a character by slug, or None if it doesn't exist"""
+        raise NotImplementedError
+
+    def load_character_path(self, character_path: str) -> Optional[Dict[str, Any]]:
+        """Load a character given its JSON file path (keyed by the file stem)"""
+        return self.load_character(os.path.splitext(os.path.basename(character_path))[0])
+
+    def save_character(self, slug: str, character: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def list_characters(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """List (slug, character) pairs"""
+        raise NotImplementedError
+
+    def memory_store(self, slug: str):
+        """
+        Create the memory store for a character.
+
+        Stores provide load(), append(memory) -> bool, update(memory) -> bool,
+        get(memory_id), next_id() and compact(), like JSONMemoryStore.
+        """
+        raise NotImplementedError
+
+    def list_memory_slugs(self) -> List[str]:
+        """Slugs of characters that have stored memories"""
+        raise NotImplementedError
+
+    def append_logs(self, log_path: str, entries: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def read_log(self, log_path: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def list_logs(self) -> List[str]:
+        """Log paths that have entries"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,80 @@
+import os
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.memory.memory_store import JSONMemoryStore
+from src.storage.base import StorageBackend
+
+
+class JSONStorage(StorageBackend):
+    """
+    File-based storage: data/characters/<slug>.json, data/memories/<slug>_memories.json
+    and JSON Lines logs under logs/.
+    """
+    name = "json"
+
+    def __init__(self, data_dir: str = "data", log_dir: str = "logs"):
+        self.characters_dir = os.path.join(data_dir, "characters")
+        self.memory_dir = os.path.join(data_dir, "memories")
+        self.log_dir = log_dir
+
+    def _character_path(self, slug: str) -> str:
+        return os.path.join(self.characters_dir, f"{slug}.json")
+
+    def load_character(self, slug: str) -> Optional[Dict[str, Any]]:
+        return self.load_character_path(self._character_path(slug))
+
+    def load_character_path(self, character_path: str) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(character_path):
+            return None
+        with open(character_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_character(self, slug: str, character: Dict[str, Any]) -> None:
+        os.makedirs(self.characters_dir, exist_ok=True)
+        with open(self._character_path(slug), 'w', encoding='utf-8') as f:
+            json.dump(character, f, indent=2, ensure_ascii=False)
+
+    def list_characters(self) -> List[Tuple[str, Dict[str, Any]]]:
+        characters = []
+        if not os.path.isdir(self.characters_dir):
+            return characters
+        for file_name in sorted(os.listdir(self.characters_dir)):
+            if not file_name.endswith(".json"):
+                continue
+            try:
+                character = self.load_character_path(os.path.join(self.characters_dir, file_name))
+            except json.JSONDecodeError:
+                continue
+            characters.append((file_name[:-len(".json")], character))
+        return characters
+
+    def memory_store(self, slug: str) -> JSONMemoryStore:
+        os.makedirs(self.memory_dir, exist_ok=True)
+        return JSONMemoryStore(os.path.join(self.memory_dir, f"{slug}_memories.json"))
+
+    def list_memory_slugs(self) -> List[str]:
+        if not os.path.isdir(self.memory_dir):
+            return []
+        slugs = set()
+        for file_name in os.listdir(self.memory_dir):
+            for suffix in ("_memories.json", "_memories.jsonl"):
+                if file_name.endswith(suffix):
+                    slugs.add(file_name[:-len(suffix)])
+        return sorted(slugs)
+
+    def append_logs(self, log_path: str, entries: List[Dict[str, Any]]) -> None:
+        from src.utils.logger import append_log_entries
+        append_log_entries(log_path, entries)
+
+    def read_log(self, log_path: str) -> List[Dict[str, Any]]:
+        from src.utils.logger import read_jsonl_log
+        return read_jsonl_log(log_path)
+
+    def list_logs(self) -> List[str]:
+        log_paths = set()
+        for root, _, files in os.walk(self.log_dir):
+            for file_name in files:
+                if file_name.endswith(".jsonl") or file_name.endswith(".json"):
+                    log_paths.add(os.path.splitext(os.path.join(root, file_name))[0] + ".jsonl")
+        return sorted(log_paths)
@@ -0,0 +1,199 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.storage.base import StorageBackend
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS characters (
+    slug TEXT PRIMARY KEY,
+    name TEXT,
+    data TEXT NOT NULL,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS memories (
+    character TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    unix_time REAL,
+    importance REAL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (character, id)
+);
+CREATE INDEX IF NOT EXISTS idx_memories_time ON memories (character, unix_time);
+CREATE TABLE IF NOT EXISTS logs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    stream TEXT NOT NULL,
+    character TEXT,
+    timestamp TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_logs_stream ON logs (stream, seq);
+CREATE INDEX IF NOT EXISTS idx_logs_character ON logs (character, timestamp);
+"""
+
+# Statements are constant and parameterized so sqlite3 reuses the prepared statements
+SELECT_CHARACTER = "SELECT data FROM characters WHERE slug = ?"
+UPSERT_CHARACTER = (
+    "INSERT INTO characters (slug, name, data, updated_at) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(slug) DO UPDATE SET name = excluded.name, data = excluded.data, "
+    "updated_at = excluded.updated_at"
+)
+SELECT_CHARACTERS = "SELECT slug, data FROM characters ORDER BY slug"
+SELECT_MEMORIES = "SELECT data FROM memories WHERE character = ? ORDER BY id"
+SELECT_MEMORY = "SELECT data FROM memories WHERE character = ? AND id = ?"
+INSERT_MEMORY = (
+    "INSERT OR REPLACE INTO memories (character, id, unix_time, importance, data) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+SELECT_MEMORY_SLUGS = "SELECT DISTINCT character FROM memories ORDER BY character"
+INSERT_LOG = "INSERT INTO logs (stream, character, timestamp, data) VALUES (?, ?, ?, ?)"
+SELECT_LOG = "SELECT data FROM logs WHERE stream = ? ORDER BY seq"
+SELECT_LOG_STREAMS = "SELECT DISTINCT stream FROM logs ORDER BY stream"
+
+
+class SQLiteMemoryStore:
+    """
+    Memory store backed by the `memories` table; same interface as JSONMemoryStore.
+    """
+
+    def __init__(self, storage: "SQLiteStorage", slug: str):
+        self.storage = storage
+        self.slug = slug
+        self.memories: List[Dict[str, Any]] = []
+        self.by_id: Dict[int, Dict[str, Any]] = {}
+        self._max_id = 0
+
+    def load(self) -> List[Dict[str, Any]]:
+        rows = self.storage.connection().execute(SELECT_MEMORIES, (self.slug,)).fetchall()
+        self.memories = [json.loads(row[0]) for row in rows]
+        self.by_id = {}
+        self._max_id = 0
+        for memory in self.memories:
+            self._index_id(memory)
+        return self.memories
+
+    def _index_id(self, memory: Dict[str, Any]) -> None:
+        memory_id = memory.get("id")
+        self.by_id[memory_id] = memory
+        if isinstance(memory_id, int) and memory_id > self._max_id:
+            self._max_id = memory_id
+
+    def next_id(self) -> int:
+        return self._max_id + 1
+
+    def append(self, memory: Dict[str, Any]) -> bool:
+        self.memories.append(memory)
+        self._index_id(memory)
+        self.storage.insert_memories(self.slug, [memory])
+        return False
+
+    def update(self, memory: Dict[str, Any]) -> bool:
+        # insert_memories upserts by (character, id)
+        self.storage.insert_memories(self.slug, [memory])
+        return False
+
+    def get(self, memory_id: int) -> Optional[Dict[str, Any]]:
+        if memory_id in self.by_id:
+            return self.by_id[memory_id]
+        row = self.storage.connection().execute(SELECT_MEMORY, (self.slug, memory_id)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def compact(self) -> None:
+        """Nothing to compact: every append is already durable in the WAL"""
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    SQLite storage for hosting many characters on one node.
+
+    Uses WAL mode so readers don't block the writer, and one connection per
+    thread (the log writer and web threadpool both touch the database).
+    """
+    name = "sqlite"
+
+    def __init__(self, db_path: str = os.path.join("data", "vibe.db"), log_dir: str = "logs"):
+        self.db_path = db_path
+        self.log_dir = log_dir
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.connection().executescript(SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        """Connection for the current thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _stream(self, log_path: str) -> str:
+        """Map a log path like logs/luna/interaction_log.jsonl to the stream luna/interaction_log"""
+        relative = os.path.relpath(log_path, self.log_dir)
+        return os.path.splitext(relative)[0].replace(os.sep, "/")
+
+    def load_character(self, slug: str) -> Optional[Dict[str, Any]]:
+        row = self.connection().execute(SELECT_CHARACTER, (slug,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_character(self, slug: str, character: Dict[str, Any]) -> None:
+        self.save_characters([(slug, character)])
+
+    def save_characters(self, characters: List[Tuple[str, Dict[str, Any]]]) -> None:
+        conn = self.connection()
+        now = time.time()
+        with conn:
+            conn.executemany(UPSERT_CHARACTER, [
+                (slug, character.get("name"), json.dumps(character, ensure_ascii=False), now)
+                for slug, character in characters
+            ])
+
+    def list_characters(self) -> List[Tuple[str, Dict[str, Any]]]:
+        rows = self.connection().execute(SELECT_CHARACTERS).fetchall()
+        return [(slug, json.loads(data)) for slug, data in rows]
+
+    def memory_store(self, slug: str) -> SQLiteMemoryStore:
+        return SQLiteMemoryStore(self, slug)
+
+    def insert_memories(self, slug: str, memories: List[Dict[str, Any]]) -> None:
+        conn = self.connection()
+        with conn:
+            conn.executemany(INSERT_MEMORY, [
+                (slug, memory.get("id"), memory.get("unix_time"), memory.get("importance"),
+                 json.dumps(memory, ensure_ascii=False))
+                for memory in memories
+            ])
+
+    def list_memory_slugs(self) -> List[str]:
+        return [row[0] for row in self.connection().execute(SELECT_MEMORY_SLUGS)]
+
+    def append_logs(self, log_path: str, entries: List[Dict[str, Any]]) -> None:
+        stream = self._stream(log_path)
+        conn = self.connection()
+        with conn:
+            conn.executemany(INSERT_LOG, [
+                (stream, entry.get("character"), entry.get("timestamp"),
+                 json.dumps(entry, ensure_ascii=False))
+                for entry in entries
+            ])
+
+    def read_log(self, log_path: str) -> List[Dict[str, Any]]:
+        rows = self.connection().execute(SELECT_LOG, (self._stream(log_path),)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def list_logs(self) -> List[str]:
+        return [
+            os.path.join(self.log_dir, *stream.split("/")) + ".jsonl"
+            for (stream,) in self.connection().execute(SELECT_LOG_STREAMS)
+        ]
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,116 @@
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from src.storage.base import StorageBackend
+
+
+# Directory the web catalog serves characters and cards from
+CATALOG_DIR = os.path.join("data", "characters")
+
+_storage: Optional[StorageBackend] = None
+_storage_lock = threading.Lock()
+
+
+def create_storage(backend: Optional[str] = None, db_path: Optional[str] = None) -> StorageBackend:
+    """
+    Create a storage backend.
+
+    Args:
+        backend: "json" or "sqlite" (defaults to the VIBE_STORAGE environment variable, then "json")
+        db_path: SQLite database path (defaults to VIBE_SQLITE_PATH, then data/vibe.db)
+    """
+    backend = backend or os.environ.get("VIBE_STORAGE", "json")
+    if backend == "json":
+        from src.storage.json_storage import JSONStorage
+        return JSONStorage()
+    if backend == "sqlite":
+        from src.storage.sqlite_storage import SQLiteStorage
+        return SQLiteStorage(db_path or os.environ.get("VIBE_SQLITE_PATH", os.path.join("data", "vibe.db")))
+    raise ValueError(f"Unknown storage backend '{backend}'.")
+
+
+def get_storage() -> StorageBackend:
+    """Get the process-wide storage backend, creating it on first use"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage()
+    return _storage
+
+
+def is_catalog_dir(characters_dir: str) -> bool:
+    """Whether `characters_dir` is the web catalog's directory (data/characters)"""
+    return os.path.abspath(characters_dir) == os.path.abspath(CATALOG_DIR)
+
+
+def save_character(character: Dict[str, Any], characters_dir: str = CATALOG_DIR,
+                   slug: Optional[str] = None) -> str:
+    """
+    Save a character as `<characters_dir>/<slug>.json`.
+
+    The web catalog (listings, character pages, cards, downloads) reads the
+    JSON files in data/characters with any backend, so those stay the
+    source of truth there. Characters saved to the catalog directory also
+    go to the configured storage backend, which chat sessions load them
+    from; other directories are left alone as isolated output targets.
+
+    Args:
+        character: Character data (needs "name" unless `slug` is given)
+        characters_dir: Directory to write the JSON file to
+        slug: Key to save under (defaults to the slugified name)
+
+    Returns:
+        Path of the character's JSON file
+    """
+    from src.storage.base import slugify
+    from src.storage.json_storage import JSONStorage
+    from src.memory.memory_store import write_json_atomic
+
+    slug = slug or slugify(character["name"])
+    output_path = os.path.join(characters_dir, f"{slug}.json")
+    if is_catalog_dir(characters_dir):
+        storage = get_storage()
+        storage.save_character(slug, character)
+        if isinstance(storage, JSONStorage) and is_catalog_dir(storage.characters_dir):
+            return output_path
+    os.makedirs(characters_dir, exist_ok=True)
+    write_json_atomic(output_path, character)
+    return output_path
+
+
+def migrate_to_sqlite(db_path: Optional[str] = None) -> Dict[str, int]:
+    """
+    Copy characters, memories and logs from the JSON files into SQLite.
+
+    Safe to re-run for characters and memories (upserts by key); logs are
+    appended, so run it once per log set.
+
+    Returns:
+        Counts of migrated characters, memories and log entries
+    """
+    from src.storage.json_storage import JSONStorage
+    from src.storage.sqlite_storage import SQLiteStorage
+
+    source = JSONStorage()
+    target = SQLiteStorage(db_path or os.environ.get("VIBE_SQLITE_PATH", os.path.join("data", "vibe.db")))
+    counts = {"characters": 0, "memories": 0, "log_entries": 0}
+
+    characters = source.list_characters()
+    target.save_characters(characters)
+    counts["characters"] = len(characters)
+
+    for slug in source.list_memory_slugs():
+        memories = source.memory_store(slug).load()
+        target.insert_memories(slug, memories)
+        counts["memories"] += len(memories)
+
+    for log_path in source.list_logs():
+        entries = source.read_log(log_path)
+        if entries:
+            target.append_logs(log_path, entries)
+            counts["log_entries"] += len(entries)
+
+    target.close()
+    return counts
@@ -0,0 +1,354 @@
+#!/usr/bin/env python
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# Everything under src is imported inside the benchmarks: the LLM backend and
+# storage are configured from the environment at import time, which main()
+# sets up first (fake server address, scratch working directory).
+
+REPORT_VERSION = 1
+
+CHARACTER = {
+    "name": "Bench Marker",
+    "traits": ["curious", "patient", "dry-humoured"],
+    "style": "Short, precise sentences with the occasional understated joke.",
+    "background": "A lighthouse keeper who measures everything, including the tides of conversation.",
+    "vibe_keywords": ["fog", "brass", "tea"],
+    "core_seed": 4242
+}
+
+MESSAGES = [
+    "How was the storm last night?",
+    "Do you remember the ship with the red sails?",
+    "What do you measure first in the morning?",
+    "Tell me about your favourite tea.",
+    "Have you ever been afraid of the dark sea?",
+    "What would you do if the light went out?",
+]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """Mean and percentiles of timings in milliseconds"""
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {"n": 0}
+
+    def percentile(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3)
+
+    return {
+        "n": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "max_ms": round(ordered[-1], 3)
+    }
+
+
+def time_calls(fn: Callable[[], object], repeat: int) -> List[float]:
+    """Call `fn` `repeat` times; returns each call's duration in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def bench_chat_turns(turns: int) -> Dict:
+    """Per-turn latency of generate_response in one session, against the fake LLM server"""
+    from src.memory.consolidation import ConsolidationPolicy
+    from src.responder.responder import ChatSession, generate_response
+
+    session = ChatSession(CHARACTER, policy=ConsolidationPolicy(idle_seconds=0))
+    totals, retrieval, generation, local = [], [], [], []
+    for turn in range(turns):
+        result = generate_response(MESSAGES[turn % len(MESSAGES)], CHARACTER, session, seed=turn)
+        totals.append(result.timings["total"] * 1000)
+        retrieval.append(result.timings["retrieval"] * 1000)
+        generation.append(result.timings["generation"] * 1000)
+        local.append((result.timings["total"] - result.timings["generation"]) * 1000)
+    session.end_session()
+
+    # Later turns carry more history; the first and last quarter show whether cost grows with it
+    quarter = max(1, turns // 4)
+    return {
+        "turns": turns,
+        "total": summarize(totals),
+        "retrieval": summarize(retrieval),
+        "generation": summarize(generation),
+        "local_overhead": summarize(local),
+        "first_quarter_mean_ms": summarize(totals[:quarter]).get("mean_ms"),
+        "last_quarter_mean_ms": summarize(totals[-quarter:]).get("mean_ms")
+    }
+
+
+def bench_memory_retrieval(sizes: List[int], queries: int) -> Dict:
+    """retrieve_relevant_memories latency against the number of stored memories"""
+    from src.memory.memory_manager import MemoryManager
+
+    rng = random.Random(7)
+    words = " ".join(MESSAGES + [CHARACTER["background"], CHARACTER["style"]]).lower().split()
+    results = {}
+    for size in sizes:
+        manager = MemoryManager(f"Memory Bench {size}")
+        started = time.perf_counter()
+        for i in range(size):
+            manager.add_memory(f"Memory {i}: " + " ".join(rng.choices(words, k=12)), importance=rng.random())
+        add_ms = (time.perf_counter() - started) * 1000
+
+        history = "\n".join(f"User: {message}" for message in MESSAGES)
+        samples = time_calls(
+            lambda: manager.retrieve_relevant_memories(rng.choice(MESSAGES), history, CHARACTER["traits"]),
+            queries
+        )
+        results[str(size)] = {"retrieve": summarize(samples), "add_mean_ms": round(add_ms / size, 3)}
+    return results
+
+
+def bench_logger(sizes: List[int], entries: int) -> Dict:
+    """log_interaction throughput against the size of the existing log"""
+    from src.utils.logger import LOG_DIR, append_log_entries, log_interaction, log_writer
+
+    results = {}
+    for size in sizes:
+        name = f"Log Bench {size}"
+        log_path = os.path.join(LOG_DIR, name.lower().replace(" ", "_"), "interaction_log.jsonl")
+        entry = {"character": name, "user_input": MESSAGES[0], "response": CHARACTER["background"]}
+        for start in range(0, size, 1000):
+            append_log_entries(log_path, [entry] * min(1000, size - start))
+
+        started = time.perf_counter()
+        for i in range(entries):
+            log_interaction(name, MESSAGES[i % len(MESSAGES)], CHARACTER["background"], i,
+                            memories_used=[CHARACTER["style"]])
+        submitted = time.perf_counter()
+        log_writer.flush()
+        flushed = time.perf_counter()
+
+        results[str(size)] = {
+            "entries": entries,
+            "submit_us_per_entry": round((submitted - started) / entries * 1e6, 2),
+            "entries_per_second": round(entries / (flushed - started), 1)
+        }
+    return results
+
+
+def bench_clean_output(samples: int) -> Dict:
+    """clean_output parse time on character sheets in the generator's output format"""
+    from src.generator.backends import FakeBackend
+    from src.tools.create_character import clean_output
+
+    backend = FakeBackend(latency=0)
+    prompt = "OCEAN: openness 0.5\nVibe Keywords:"
+    sheets = [backend.completion_text(prompt, 300, seed) for seed in range(samples)]
+    started = time.perf_counter()
+    parsed = [clean_output(sheet) for sheet in sheets]
+    elapsed = time.perf_counter() - started
+    return {
+        "samples": samples,
+        "us_per_parse": round(elapsed / samples * 1e6, 2),
+        "named": sum(1 for character in parsed if character["name"])
+    }
+
+
+def bench_card_render(cards: int) -> Dict:
+    """Card render time (fresh renders, then re-renders skipped by the render cache)"""
+    from src.tools.character_card import CardRenderer
+
+    renderer = CardRenderer()
+    output_dir = os.path.join("data", "bench_cards")
+    characters = [{**CHARACTER, "name": f"Card Bench {i}", "core_seed": 1000 + i} for i in range(cards)]
+    # Font loading is a one-off cost, kept out of the per-card numbers
+    started = time.perf_counter()
+    renderer.font(60)
+    font_ms = (time.perf_counter() - started) * 1000
+
+    fresh = [time_calls(lambda: renderer.render(character, os.path.join(output_dir, f"{i}_card.png")), 1)[0]
+             for i, character in enumerate(characters)]
+    cached = [time_calls(lambda: renderer.render(character, os.path.join(output_dir, f"{i}_card.png")), 1)[0]
+              for i, character in enumerate(characters)]
+    sizes = [os.path.getsize(os.path.join(output_dir, f"{i}_card.png")) for i in range(cards)]
+    return {
+        "font_load_ms": round(font_ms, 3),
+        "render": summarize(fresh),
+        "cached": summarize(cached),
+        "mean_bytes": round(sum(sizes) / len(sizes))
+    }
+
+
+def bench_api_listing(sizes: List[int], requests: int) -> Dict:
+    """GET /api/characters latency against catalog size (first request after growth, then warm)"""
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError as e:
+        return {"skipped": f"web API test client unavailable ({e})"}
+    from src.api.main import app, characters_dir
+
+    results = {}
+    written = 0
+    with TestClient(app) as client:
+        for size in sizes:
+            for i in range(written, size):
+                character = {**CHARACTER, "name": f"Catalog {i}", "traits": [random.choice(CHARACTER["traits"])]}
+                with open(characters_dir / f"catalog_{i:06d}.json", "w", encoding="utf-8") as f:
+                    json.dump(character, f)
+            written = max(written, size)
+
+            first = time_calls(lambda: client.get("/api/characters"), 1)[0]
+            warm = time_calls(lambda: client.get("/api/characters?per_page=50"), requests)
+            filtered = time_calls(lambda: client.get("/api/characters?trait=curious"), requests)
+            etag = client.get("/api/characters").headers.get("etag", "")
+            revalidate = time_calls(lambda: client.get("/api/characters", headers={"If-None-Match": etag}), requests)
+            results[str(size)] = {
+                "first_ms": round(first, 3),
+                "page": summarize(warm),
+                "filtered": summarize(filtered),
+                "not_modified": summarize(revalidate)
+            }
+    return results
+
+
+def git_revision() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def flatten(report: Dict, prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves of a report as dotted keys"""
+    flat = {}
+    for key, value in report.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(report: Dict, baseline: Dict) -> List[str]:
+    """Lines describing how timings changed against a previous report"""
+    current, previous = flatten(report["results"]), flatten(baseline.get("results", {}))
+    lines = []
+    for key in sorted(current):
+        if key in previous and key.endswith(("_ms", "_us_per_entry", "us_per_parse")) and previous[key]:
+            change = (current[key] - previous[key]) / previous[key] * 100
+            lines.append(f"{key}: {previous[key]} -> {current[key]} ({change:+.1f}%)")
+    return lines
+
+
+BENCHMARKS = ("chat", "memory", "logger", "parse", "cards", "api")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the end-to-end benchmark suite against a fake LLM server")
+    parser.add_argument("--only", help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes, for a fast smoke run")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Fake server latency per request (seconds)")
+    parser.add_argument("--llm-tps", type=float, help="Fake server tokens per second")
+    parser.add_argument("--output", "-o", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Previous JSON report to compare timings against")
+    parser.add_argument("--workdir", help="Scratch directory for data and logs (default: a temporary directory)")
+    args = parser.parse_args()
+
+    selected = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    sizes = {
+        "turns": 20 if args.quick else 100,
+        "memories": [100, 1000] if args.quick else [100, 1000, 5000],
+        "queries": 20 if args.quick else 100,
+        "log_sizes": [0, 10000] if args.quick else [0, 10000, 100000],
+        "log_entries": 500 if args.quick else 2000,
+        "parses": 500 if args.quick else 5000,
+        "cards": 5 if args.quick else 20,
+        "catalog": [100, 1000] if args.quick else [100, 1000, 5000],
+        "requests": 20 if args.quick else 100,
+    }
+
+    from src.tools.fake_llm_server import FakeLLMServer
+    server = FakeLLMServer(port=0, latency=args.llm_latency, tokens_per_second=args.llm_tps).start()
+
+    # Point the app at the fake server and a scratch data directory before anything imports it
+    os.environ.update({
+        "VIBE_LLM_BACKEND": "openai",
+        "VIBE_LLM_HOST": "127.0.0.1",
+        "VIBE_LLM_PORT": str(server.port),
+        "VIBE_CACHE": "off",
+    })
+    repo_root = os.getcwd()
+    workdir = args.workdir or tempfile.mkdtemp(prefix="vibe-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    sys.path.insert(0, os.path.abspath(repo_root))
+    os.chdir(workdir)
+
+    benchmarks = {
+        "chat": lambda: bench_chat_turns(sizes["turns"]),
+        "memory": lambda: bench_memory_retrieval(sizes["memories"], sizes["queries"]),
+        "logger": lambda: bench_logger(sizes["log_sizes"], sizes["log_entries"]),
+        "parse": lambda: bench_clean_output(sizes["parses"]),
+        "cards": lambda: bench_card_render(sizes["cards"]),
+        "api": lambda: bench_api_listing(sizes["catalog"], sizes["requests"]),
+    }
+    results = {}
+    try:
+        for name in selected:
+            print(f"Running {name}...", file=sys.stderr)
+            started = time.perf_counter()
+            results[name] = benchmarks[name]()
+            results[name]["seconds"] = round(time.perf_counter() - started, 2)
+    finally:
+        server.stop()
+        os.chdir(repo_root)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "report_version": REPORT_VERSION,
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "quick": args.quick,
+            "llm_latency": args.llm_latency,
+            "llm_tps": args.llm_tps,
+            "llm_requests": server.stats
+        },
+        "results": results
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare} ({baseline.get('meta', {}).get('revision')}):", file=sys.stderr)
+        for line in compare(report, baseline):
+            print(f"  {line}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, Optional, Set, Tuple
+
+from tqdm import tqdm
+
+from src.tools.create_character import clean_output
+from src.generator.character_generator import generate_character
+from src.tools.character_card import create_character_card_timed
+from src.storage.base import slugify
+from src.storage.storage_loader import get_storage, is_catalog_dir, save_character
+
+
+# Large prime so retries of item i never reuse the seed of another item
+RETRY_SEED_STRIDE = 1_000_003
+
+
+def ocean_for(index: int, base_seed: Optional[int]) -> Dict[str, float]:
+    """OCEAN profile for item `index`; reproducible when a base seed is given"""
+    rng = random.Random(base_seed + index) if base_seed is not None else random
+    return {
+        "openness": rng.uniform(0, 1),
+        "conscientiousness": rng.uniform(0, 1),
+        "extraversion": rng.uniform(0, 1),
+        "agreeableness": rng.uniform(0, 1),
+        "neuroticism": rng.uniform(0, 1),
+    }
+
+
+def load_manifest(manifest_path: str) -> Dict[int, Dict]:
+    """
+    Progress of previous runs, by index: the "done" entry of completed items,
+    otherwise the latest entry ("llm" once the character is saved, or "failed").
+    """
+    progress = {}
+    if not os.path.exists(manifest_path):
+        return progress
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn last line of an interrupted run
+            if progress.get(entry["index"], {}).get("status") != "done":
+                progress[entry["index"]] = entry
+    return progress
+
+
+class BulkGenerator:
+    """
+    Generates characters concurrently: LLM calls on a thread pool, card
+    rendering on a process pool, so neither waits for the other.
+
+    Progress is appended to a JSON Lines manifest: an "llm" entry once the
+    character is saved, "done" once its card is rendered. Running the same
+    command again skips done items and only re-renders saved ones, so an
+    interrupted run resumes without generating duplicates.
+    """
+
+    def __init__(self, output_dir: str, workers: int, render_workers: int, retries: int,
+                 base_seed: Optional[int], cards: bool, manifest_path: str):
+        self.output_dir = output_dir
+        self.workers = workers
+        self.render_workers = render_workers
+        self.retries = retries
+        self.base_seed = base_seed
+        self.cards = cards
+        self.manifest_path = manifest_path
+        self._slugs: Set[str] = set()
+        self._slug_lock = threading.Lock()
+        self._manifest = None
+        # Only the catalog directory is mirrored to the storage backend (see save_character)
+        self._in_catalog = is_catalog_dir(output_dir)
+        self._manifest_lock = threading.Lock()
+        # "generated" counts LLM completions of this run; "done" also includes items resumed from a saved character
+        self.stats = {"done": 0, "failed": 0, "generated": 0, "rendered": 0, "retries": 0,
+                      "llm_seconds": 0.0, "render_seconds": 0.0}
+
+    def _reserve_slug(self, name: str) -> str:
+        """Unique file slug for `name` (generated names can repeat)"""
+        base = slugify(name) or "character"
+        with self._slug_lock:
+            slug, n = base, 1
+            while (slug in self._slugs or os.path.exists(os.path.join(self.output_dir, f"{slug}.json"))
+                   or (self._in_catalog and get_storage().load_character(slug) is not None)):
+                n += 1
+                slug = f"{base}_{n}"
+            self._slugs.add(slug)
+        return slug
+
+    def _load_saved(self, slug: str) -> Optional[Dict]:
+        """Character saved under `slug` by a previous run, if it is still there"""
+        path = os.path.join(self.output_dir, f"{slug}.json")
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def generate_one(self, index: int) -> Tuple[int, Dict, str, int, float]:
+        """
+        Generate and save character `index`, retrying on [ERROR] or unparseable output.
+
+        Returns:
+            (index, character, slug, attempts, LLM seconds)
+        """
+        ocean = ocean_for(index, self.base_seed)
+        started = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            seed = -1
+            if self.base_seed is not None:
+                seed = self.base_seed + index + attempt * RETRY_SEED_STRIDE
+            raw_result = generate_character(ocean, seed=seed)
+            character = clean_output(raw_result) if raw_result != "[ERROR]" else None
+            if character and character["name"]:
+                break
+            if attempt < self.retries:
+                time.sleep(min(8.0, 0.5 * 2 ** attempt))
+        else:
+            raise RuntimeError(f"no usable character after {self.retries + 1} attempts")
+
+        character["ocean"] = ocean
+        slug = self._reserve_slug(character["name"])
+        save_character(character, self.output_dir, slug)
+        # Recorded here rather than by run(), so a crash right after the save can't orphan the file
+        self._record({"index": index, "slug": slug, "name": character["name"], "attempts": attempt + 1, "status": "llm"})
+        return index, character, slug, attempt + 1, time.perf_counter() - started
+
+    def run(self, count: int) -> Dict:
+        os.makedirs(self.output_dir, exist_ok=True)
+        previous = load_manifest(self.manifest_path)
+        pending, saved = [], {}
+        for index in range(count):
+            entry = previous.get(index, {})
+            if entry.get("status") == "done":
+                continue
+            character = self._load_saved(entry["slug"]) if entry.get("slug") else None
+            if character is not None:
+                saved[index] = (character, {key: entry[key] for key in ("index", "slug", "name", "attempts")})
+                self._slugs.add(entry["slug"])
+            else:
+                pending.append(index)
+        skipped = count - len(pending) - len(saved)
+        started = time.perf_counter()
+
+        # Spawned (not forked) render workers: this process already runs LLM and pool threads
+        render_pool = ProcessPoolExecutor(
+            max_workers=self.render_workers, mp_context=multiprocessing.get_context("spawn")
+        ) if self.cards else None
+        llm_pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-llm")
+
+        progress = tqdm(total=count, initial=skipped, unit="char", desc="Generating")
+        in_flight: Dict[Future, Tuple[str, Dict]] = {}
+        try:
+            with open(self.manifest_path, 'a', encoding='utf-8') as self._manifest:
+                for index in pending:
+                    in_flight[llm_pool.submit(self.generate_one, index)] = ("llm", {"index": index})
+                # Saved by a previous run but not rendered: only the card is redone
+                for character, info in saved.values():
+                    if render_pool is None:
+                        self._record({**info, "status": "done"})
+                        progress.update(1)
+                        continue
+                    card_path = os.path.join(self.output_dir, f"{info['slug']}_card.png")
+                    in_flight[render_pool.submit(create_character_card_timed, character, card_path)] = ("render", info)
+
+                while in_flight:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        stage, info = in_flight.pop(future)
+                        error = future.exception()
+                        if error is not None:
+                            self._record({**info, "status": "failed", "stage": stage, "error": str(error)})
+                            progress.update(1)
+                            continue
+
+                        if stage == "llm":
+                            index, character, slug, attempts, llm_seconds = future.result()
+                            self.stats["generated"] += 1
+                            self.stats["retries"] += attempts - 1
+                            self.stats["llm_seconds"] += llm_seconds
+                            info = {"index": index, "slug": slug, "name": character["name"], "attempts": attempts}
+                            if render_pool is None:
+                                self._record({**info, "status": "done"})
+                                progress.update(1)
+                                continue
+                            card_path = os.path.join(self.output_dir, f"{slug}_card.png")
+                            in_flight[render_pool.submit(create_character_card_timed, character, card_path)] = ("render", info)
+                        else:
+                            self.stats["rendered"] += 1
+                            self.stats["render_seconds"] += future.result()
+                            self._record({**info, "status": "done"})
+                            progress.update(1)
+                    progress.set_postfix(failed=self.stats["failed"], retries=self.stats["retries"])
+        finally:
+            progress.close()
+            llm_pool.shutdown(wait=False, cancel_futures=True)
+            if render_pool is not None:
+                render_pool.shutdown(wait=False, cancel_futures=True)
+
+        elapsed = time.perf_counter() - started
+        generated = self.stats["generated"]
+        rendered = self.stats["rendered"]
+        return {
+            "requested": count,
+            "skipped": skipped,
+            "resumed": len(saved),
+            "generated": generated,
+            "failed": self.stats["failed"],
+            "retries": self.stats["retries"],
+            "seconds": round(elapsed, 2),
+            "characters_per_minute": round(generated / elapsed * 60, 1) if elapsed > 0 else 0.0,
+            "avg_llm_seconds": round(self.stats["llm_seconds"] / generated, 2) if generated else 0.0,
+            "avg_render_seconds": round(self.stats["render_seconds"] / rendered, 3) if rendered else 0.0,
+        }
+
+    def _record(self, entry: Dict) -> None:
+        """Append `entry` to the manifest (called from the LLM threads too)"""
+        entry["timestamp"] = time.time()
+        with self._manifest_lock:
+            if self._manifest is None or self._manifest.closed:
+                return  # LLM thread still finishing after an interrupted run
+            if entry["status"] in ("done", "failed"):
+                self.stats[entry["status"]] += 1
+            self._manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._manifest.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate many characters (and cards) concurrently")
+    parser.add_argument("count", type=int, help="Number of characters in the catalog")
+    parser.add_argument("--output-dir", default="data/characters", help="Directory to save character files")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("VIBE_LLM_MAX_CONCURRENCY", 4)) or 4,
+                        help="Concurrent LLM generations")
+    parser.add_argument("--render-workers", type=int, default=os.cpu_count() or 2,
+                        help="Processes rendering character cards")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per character on [ERROR] or unparseable output")
+    parser.add_argument("--seed", type=int, help="Base seed: makes OCEAN profiles and LLM sampling reproducible")
+    parser.add_argument("--no-cards", action="store_true", help="Skip card rendering")
+    parser.add_argument("--manifest", help="Progress manifest (default: <output-dir>/bulk_manifest.jsonl)")
+    args = parser.parse_args()
+
+    generator = BulkGenerator(
+        output_dir=args.output_dir,
+        workers=args.workers,
+        render_workers=args.render_workers,
+        retries=args.retries,
+        base_seed=args.seed,
+        cards=not args.no_cards,
+        manifest_path=args.manifest or os.path.join(args.output_dir, "bulk_manifest.jsonl")
+    )
+    summary = generator.run(args.count)
+
+    print(f"\nGenerated {summary['generated']} characters in {summary['seconds']} s "
+          f"({summary['characters_per_minute']} per minute)")
+    if summary["skipped"]:
+        print(f"Skipped {summary['skipped']} already generated in a previous run")
+    if summary["resumed"]:
+        print(f"Reused {summary['resumed']} characters saved by a previous run instead of regenerating them")
+    print(f"LLM: {summary['avg_llm_seconds']} s per character, {summary['retries']} retries; "
+          f"cards: {summary['avg_render_seconds']} s each")
+    if summary["failed"]:
+        print(f"{summary['failed']} characters failed; run the same command again to retry them")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
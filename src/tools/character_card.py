@@ -5,7 +5,15 @@ from PIL import Image, ImageDraw, ImageFont
 import colorsys
 import hashlib
 import random
-from typing import Dict, Any, Tuple
+import io
+import glob
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.utils.metrics import registry
 
 def load_character(character_path: str) -> Dict[str, Any]:
     """Load character data from JSON file"""
@@ -38,119 +46,339 @@ def get_contrasting_text_color(bg_color: Tuple[int, int, int]) -> Tuple[int, int
     luminance = (0.299 * bg_color[0] + 0.587 * bg_color[1] + 0.114 * bg_color[2]) / 255
     return (0, 0, 0) if luminance > 0.5 else (255, 255, 255)
 
-def create_character_card(character: Dict[str, Any], output_path: str) -> None:
-    """Generate a character card image from character data"""
-    # Card dimensions
-    width, height = 800, 1000
+# Tried in order; Pillow also searches the system font directories
+FONT_CANDIDATES = ("arial.ttf", "Arial.ttf", "DejaVuSans.ttf", "LiberationSans-Regular.ttf")
+
+# EXIF ImageDescription tag, where rendered cards record their content key
+CARD_KEY_TAG = 0x010E
+
+CARD_RENDER_SECONDS = registry.histogram("vibe_card_render_seconds", "Card render time, including encoding and thumbnails")
+CARD_RENDERS = registry.counter("vibe_card_renders_total", "Card render requests by result (rendered or skipped as current)", ["result"])
+
+# Gallery thumbnail widths; thumbnails keep the card's 4:5 aspect ratio
+THUMBNAIL_WIDTHS = {"small": 320, "medium": 480}
+
+
+def content_hash(data: bytes) -> str:
+    """Hash identifying a card file's content (also its ETag in the web API)"""
+    return hashlib.sha1(data).hexdigest()
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write then rename, so readers (e.g. the web API) never see a partial file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def thumbnail_path(card_path: str, size: str, card_hash: str) -> str:
+    """Where the `size` thumbnail of the card with content hash `card_hash` is stored, next to the card"""
+    return f"{os.path.splitext(card_path)[0]}_{size}.{card_hash[:12]}.png"
+
+
+def write_thumbnails(card: Image.Image, card_path: str, card_hash: str,
+                     sizes: Optional[List[str]] = None, palette_colors: int = 64) -> Dict[str, str]:
+    """
+    Write downscaled copies of `card` next to it, removing thumbnails of
+    earlier versions of the card.
+    
+    Returns:
+        Thumbnail paths by size name
+    """
+    paths = {}
+    source = card.convert("RGB")
+    # Largest first, each downscaled from the previous one rather than the full card
+    for size in sorted(sizes or THUMBNAIL_WIDTHS, key=THUMBNAIL_WIDTHS.get, reverse=True):
+        width = THUMBNAIL_WIDTHS[size]
+        height = round(width * source.height / source.width)
+        source = source.resize((width, height), Image.Resampling.BICUBIC, reducing_gap=2.0)
+        thumbnail = source.quantize(colors=palette_colors, method=Image.Quantize.FASTOCTREE) if palette_colors else source
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, format="PNG", compress_level=6)
+        path = paths[size] = thumbnail_path(card_path, size, card_hash)
+        write_atomic(path, buffer.getvalue())
+        for stale in glob.glob(glob.escape(f"{os.path.splitext(card_path)[0]}_{size}.") + "*.png"):
+            if stale != path:
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+    return paths
+
+
+class CardRenderer:
+    """
+    Renders character cards, reusing work wherever it can.
     
-    # Generate a background color based on the character's seed
-    bg_color = seed_to_color(character.get('core_seed', random.randint(10000, 99999999)))
-    text_color = get_contrasting_text_color(bg_color)
+    - Fonts are resolved and loaded once per size and kept.
+    - Text is wrapped by measured glyph widths in a single pass.
+    - Each card records a key (hash of the character JSON and render
+      settings) in its EXIF data; rendering is skipped when the file at the
+      output path already has the same key.
+    - Gallery thumbnails (THUMBNAIL_WIDTHS) are written next to each card,
+      named by the card's content hash.
+    - The encoder follows the output extension. PNGs are reduced to a
+      `palette_colors` palette (cards are flat backgrounds with antialiased
+      text, so this is visually lossless, ~3x smaller and faster to
+      compress) at `png_compress_level` (1 fastest, 9 smallest); WebP is
+      lossless at the fastest method.
+    """
     
-    # Create a new image with the background color
-    img = Image.new('RGB', (width, height), bg_color)
-    draw = ImageDraw.Draw(img)
+    WIDTH, HEIGHT = 800, 1000
+    # Bump when the layout changes so existing cards are re-rendered
+    LAYOUT_VERSION = 2
     
-    # Try to load fonts, fall back to default if not available
-    try:
-        title_font = ImageFont.truetype("arial.ttf", 60)
-        subtitle_font = ImageFont.truetype("arial.ttf", 40)
-        regular_font = ImageFont.truetype("arial.ttf", 30)
-        small_font = ImageFont.truetype("arial.ttf", 24)
-    except IOError:
-        # Fall back to default font
-        title_font = ImageFont.load_default()
-        subtitle_font = ImageFont.load_default()
-        regular_font = ImageFont.load_default()
-        small_font = ImageFont.load_default()
-    
-    # Draw name
-    name = character.get('name', 'Unknown Character')
-    draw.text((width // 2, 80), name, fill=text_color, font=title_font, anchor="mm")
-    
-    # Draw traits
-    traits = character.get('traits', [])
-    traits_y = 160
-    draw.text((50, traits_y), "Traits:", fill=text_color, font=subtitle_font)
-    traits_y += 60
-    for trait in traits:
-        draw.text((70, traits_y), f"• {trait}", fill=text_color, font=regular_font)
-        traits_y += 40
-    
-    # Draw speaking style
-    style_y = traits_y + 30
-    draw.text((50, style_y), "Speaking Style:", fill=text_color, font=subtitle_font)
-    style_y += 60
-    style_text = character.get('style', 'No defined speaking style.')
-    
-    # Word wrap for style text
-    words = style_text.split()
-    lines = []
-    line = []
-    for word in words:
-        if len(' '.join(line + [word])) <= 70:  # Adjust based on font and image width
-            line.append(word)
-        else:
-            lines.append(' '.join(line))
-            line = [word]
-    if line:
-        lines.append(' '.join(line))
-    
-    for line in lines:
-        draw.text((70, style_y), line, fill=text_color, font=regular_font)
-        style_y += 40
-    
-    # Draw vibe keywords
-    keywords_y = style_y + 30
-    draw.text((50, keywords_y), "Vibe Keywords:", fill=text_color, font=subtitle_font)
-    keywords_y += 60
-    keywords = character.get('vibe_keywords', [])
-    keyword_text = ', '.join(keywords)
-    
-    # Word wrap for keywords
-    words = keyword_text.split()
-    lines = []
-    line = []
-    for word in words:
-        if len(' '.join(line + [word])) <= 70:
-            line.append(word)
-        else:
-            lines.append(' '.join(line))
-            line = [word]
-    if line:
-        lines.append(' '.join(line))
+    def __init__(self, font_path: Optional[str] = None, png_compress_level: int = 3, palette_colors: int = 64):
+        self.font_path = font_path or os.environ.get("VIBE_CARD_FONT")
+        self.png_compress_level = png_compress_level
+        self.palette_colors = palette_colors
+        self._fonts: Dict[int, ImageFont.ImageFont] = {}
+        self._font_source: Optional[str] = None
+        # output path -> (key, mtime_ns) of cards this renderer wrote or verified
+        self._rendered: Dict[str, Tuple[str, int]] = {}
+        self.stats = {"rendered": 0, "skipped": 0}
+    
+    @property
+    def settings(self) -> Tuple:
+        """Constructor arguments, to rebuild an equivalent renderer in a worker process"""
+        return (self.font_path, self.png_compress_level, self.palette_colors)
     
-    for line in lines:
-        draw.text((70, keywords_y), line, fill=text_color, font=regular_font)
-        keywords_y += 40
+    def _resolve_font(self) -> str:
+        """First loadable font file, or "" for Pillow's built-in font"""
+        for candidate in ((self.font_path,) if self.font_path else ()) + FONT_CANDIDATES:
+            try:
+                ImageFont.truetype(candidate, 12)
+                return candidate
+            except OSError:
+                continue
+        return ""
     
-    # Draw seed at bottom
-    seed = character.get('core_seed', 'N/A')
-    draw.text((width // 2, height - 50), f"Seed: {seed}", fill=text_color, font=small_font, anchor="mm")
+    def font(self, size: int) -> ImageFont.ImageFont:
+        """The card font at `size`, loaded on first use"""
+        font = self._fonts.get(size)
+        if font is None:
+            if self._font_source is None:
+                self._font_source = self._resolve_font()
+            if self._font_source:
+                font = ImageFont.truetype(self._font_source, size)
+            else:
+                try:
+                    font = ImageFont.load_default(size=size)
+                except TypeError:
+                    # Pillow < 10.1: the built-in font has a single size
+                    font = ImageFont.load_default()
+            self._fonts[size] = font
+        return font
     
-    # Save the image
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    img.save(output_path)
-    print(f"Character card saved to {output_path}")
+    @staticmethod
+    def wrap(text: str, font: ImageFont.ImageFont, max_width: float) -> List[str]:
+        """Greedily wrap `text` into lines at most `max_width` pixels wide"""
+        space = font.getlength(" ")
+        lines, line, width = [], [], 0.0
+        for word in text.split():
+            word_width = font.getlength(word)
+            if line and width + space + word_width > max_width:
+                lines.append(" ".join(line))
+                line, width = [word], word_width
+            else:
+                width += (space if line else 0.0) + word_width
+                line.append(word)
+        if line:
+            lines.append(" ".join(line))
+        return lines
+    
+    def card_key(self, character: Dict[str, Any], output_path: str) -> str:
+        """Hash of everything that affects the rendered file"""
+        encoder = ("webp",) if output_path.lower().endswith(".webp") else ("png", self.png_compress_level, self.palette_colors)
+        content = json.dumps([self.LAYOUT_VERSION, encoder, self.font_path, character], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+    
+    def is_current(self, output_path: str, key: str) -> bool:
+        """Whether the card at `output_path` was rendered with `key`"""
+        try:
+            mtime_ns = os.stat(output_path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if self._rendered.get(output_path) == (key, mtime_ns):
+            return True
+        try:
+            # Opening reads the headers only, not the pixel data
+            with Image.open(output_path) as existing:
+                current = existing.getexif().get(CARD_KEY_TAG) == f"vibe-card:{key}"
+        except (OSError, SyntaxError):
+            return False
+        if current:
+            self._rendered[output_path] = (key, mtime_ns)
+        return current
+    
+    def render_image(self, character: Dict[str, Any]) -> Image.Image:
+        """Draw the card for `character`"""
+        width, height = self.WIDTH, self.HEIGHT
+        title_font, subtitle_font = self.font(60), self.font(40)
+        regular_font, small_font = self.font(30), self.font(24)
+        
+        # Generate a background color based on the character's seed
+        bg_color = seed_to_color(character.get('core_seed', random.randint(10000, 99999999)))
+        text_color = get_contrasting_text_color(bg_color)
+        
+        img = Image.new('RGB', (width, height), bg_color)
+        draw = ImageDraw.Draw(img)
+        
+        # Draw name
+        name = character.get('name', 'Unknown Character')
+        draw.text((width // 2, 80), name, fill=text_color, font=title_font, anchor="mm")
+        
+        # Draw traits
+        y = 160
+        draw.text((50, y), "Traits:", fill=text_color, font=subtitle_font)
+        y += 60
+        for trait in character.get('traits', []):
+            draw.text((70, y), f"• {trait}", fill=text_color, font=regular_font)
+            y += 40
+        
+        # Draw speaking style and vibe keywords, wrapped to the card width
+        sections = (
+            ("Speaking Style:", character.get('style', 'No defined speaking style.')),
+            ("Vibe Keywords:", ', '.join(character.get('vibe_keywords', []))),
+        )
+        for heading, text in sections:
+            y += 30
+            draw.text((50, y), heading, fill=text_color, font=subtitle_font)
+            y += 60
+            for line in self.wrap(text, regular_font, width - 70 - 50):
+                draw.text((70, y), line, fill=text_color, font=regular_font)
+                y += 40
+        
+        # Draw seed at bottom
+        seed = character.get('core_seed', 'N/A')
+        draw.text((width // 2, height - 50), f"Seed: {seed}", fill=text_color, font=small_font, anchor="mm")
+        return img
+    
+    def render(self, character: Dict[str, Any], output_path: str, force: bool = False) -> bool:
+        """
+        Render the card for `character` to `output_path` unless it is already current.
+        
+        Returns:
+            True if the card was rendered, False if the existing file was reused
+        """
+        key = self.card_key(character, output_path)
+        if not force and self.is_current(output_path, key):
+            self.stats["skipped"] += 1
+            CARD_RENDERS.labels("skipped").inc()
+            return False
+        
+        started = time.perf_counter()
+        img = self.render_image(character)
+        exif = Image.Exif()
+        exif[CARD_KEY_TAG] = f"vibe-card:{key}"
+        if output_path.lower().endswith(".webp"):
+            encoded, options = img, {"format": "WEBP", "lossless": True, "method": 0}
+        else:
+            encoded = img.quantize(colors=self.palette_colors, method=Image.Quantize.FASTOCTREE) if self.palette_colors else img
+            options = {"format": "PNG", "compress_level": self.png_compress_level}
+        buffer = io.BytesIO()
+        encoded.save(buffer, exif=exif, **options)
+        data = buffer.getvalue()
+        
+        write_atomic(output_path, data)
+        write_thumbnails(img, output_path, content_hash(data), palette_colors=self.palette_colors)
+        self._rendered[output_path] = (key, os.stat(output_path).st_mtime_ns)
+        self.stats["rendered"] += 1
+        CARD_RENDERS.labels("rendered").inc()
+        CARD_RENDER_SECONDS.observe(time.perf_counter() - started)
+        return True
+    
+    def render_many(self, jobs: List[Tuple[Dict[str, Any], str]], workers: Optional[int] = None,
+                    force: bool = False) -> List[Tuple[bool, float]]:
+        """
+        Render (character, output_path) jobs on a process pool.
+        
+        Returns:
+            (rendered, seconds) per job, in job order
+        """
+        results: List[Tuple[bool, float]] = [(False, 0.0)] * len(jobs)
+        # Checking keys here is cheap, so only stale cards go to the pool
+        stale = [i for i, (character, output_path) in enumerate(jobs)
+                 if force or not self.is_current(output_path, self.card_key(character, output_path))]
+        self.stats["skipped"] += len(jobs) - len(stale)
+        
+        if len(stale) <= 1 or workers == 1:
+            for i in stale:
+                started = time.perf_counter()
+                results[i] = (self.render(*jobs[i], force=True), time.perf_counter() - started)
+            return results
+        
+        # Spawned (not forked) workers: callers may be running threads
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {i: pool.submit(_render_job, self.settings, *jobs[i]) for i in stale}
+            for i, future in futures.items():
+                results[i] = future.result()
+        self.stats["rendered"] += len(stale)
+        return results
+
+
+# Per-process renderers for render_many jobs, by settings
+_worker_renderers: Dict[Tuple, CardRenderer] = {}
+
+
+def _render_job(settings: Tuple, character: Dict[str, Any], output_path: str) -> Tuple[bool, float]:
+    renderer = _worker_renderers.get(settings)
+    if renderer is None:
+        renderer = _worker_renderers[settings] = CardRenderer(*settings)
+    started = time.perf_counter()
+    renderer.render(character, output_path, force=True)
+    return True, time.perf_counter() - started
+
+
+# Shared renderer, so fonts are loaded once per process
+card_renderer = CardRenderer()
+
+
+def create_character_card(character: Dict[str, Any], output_path: str) -> None:
+    """Generate a character card image from character data (skipped if the card is already current)"""
+    if card_renderer.render(character, output_path):
+        print(f"Character card saved to {output_path}")
+    else:
+        print(f"Character card {output_path} is up to date")
+
+def create_character_card_timed(character: Dict[str, Any], output_path: str) -> float:
+    """create_character_card for worker processes; returns the render time in seconds"""
+    started = time.perf_counter()
+    create_character_card(character, output_path)
+    return time.perf_counter() - started
 
 def main():
     parser = argparse.ArgumentParser(description="Generate character cards from character JSON files")
-    parser.add_argument("character_file", help="Path to character JSON file")
-    parser.add_argument("--output", "-o", help="Output path for character card image (default: same directory as JSON)")
+    parser.add_argument("character_files", nargs="+", help="Path(s) to character JSON files")
+    parser.add_argument("--output", "-o", help="Output path for character card image (single file only; default: same directory as JSON)")
+    parser.add_argument("--format", choices=["png", "webp"], default="png", help="Image format of default output paths")
+    parser.add_argument("--png-level", type=int, default=3, help="PNG compression level, 1 (fastest) to 9 (smallest)")
+    parser.add_argument("--colors", type=int, default=64, help="PNG palette size (0 keeps full RGB)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Processes rendering several cards")
+    parser.add_argument("--force", action="store_true", help="Re-render cards that are already up to date")
     args = parser.parse_args()
     
-    # Load character data
-    character = load_character(args.character_file)
+    if args.output and len(args.character_files) > 1:
+        parser.error("--output needs a single character file")
     
-    # Determine output path
-    if args.output:
-        output_path = args.output
-    else:
-        base_name = os.path.splitext(args.character_file)[0]
-        output_path = f"{base_name}_card.png"
+    # Load character data and determine output paths
+    jobs = []
+    for character_file in args.character_files:
+        character = load_character(character_file)
+        output_path = args.output or f"{os.path.splitext(character_file)[0]}_card.{args.format}"
+        jobs.append((character, output_path))
     
-    # Create character card
-    create_character_card(character, output_path)
+    # Create character cards
+    renderer = CardRenderer(png_compress_level=args.png_level, palette_colors=args.colors)
+    started = time.perf_counter()
+    results = renderer.render_many(jobs, workers=args.workers, force=args.force)
+    for (_, output_path), (rendered, _) in zip(jobs, results):
+        print(f"Character card saved to {output_path}" if rendered else f"Character card {output_path} is up to date")
+    if len(jobs) > 1:
+        rendered = sum(1 for was_rendered, _ in results if was_rendered)
+        print(f"Rendered {rendered} of {len(jobs)} cards in {time.perf_counter() - started:.2f} s")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -7,7 +7,8 @@ import readline  # For better input handling
 from colorama import init, Fore, Style, Back
 from typing import Optional, Dict
 
-from src.responder.responder import generate_response, load_character, ChatSession
+from src.responder.responder import generate_response_stream, load_character, ChatSession
+from src.responder.prompt_builder import prompt_builder
 from src.utils.logger import log_interaction
 
 
@@ -21,6 +22,14 @@ def print_character_message(character_name: str, message: str):
     print(f"{Fore.GREEN}{Style.BRIGHT}{character_name}{Style.RESET_ALL}: {message}")
 
 
+def print_character_stream(character_name: str, chunks) -> None:
+    """Print a character's message chunk by chunk as it is generated"""
+    print(f"{Fore.GREEN}{Style.BRIGHT}{character_name}{Style.RESET_ALL}: ", end="", flush=True)
+    for chunk in chunks:
+        print(chunk, end="", flush=True)
+    print()
+
+
 def print_user_message(message: str):
     """Print the user's message with styling"""
     print(f"{Fore.BLUE}{Style.BRIGHT}You{Style.RESET_ALL}: {message}")
@@ -132,31 +141,43 @@ def run_chat_session(character_path: str):
                 print_system_message(f"Ending conversation with {character['name']}...")
                 break
                 
-            # Generate response with memory and RAG
-            response, seed = generate_response(user_input, character, chat_session)
-            
-            # Display response
-            print_character_message(character['name'], response)
-            
-            # Get memories that were used for logging
-            memories_used = chat_session.memory_manager.retrieve_relevant_memories(
-                user_input,
-                chat_session.get_formatted_history(3),
-                character.get('traits', [])
+            # Generate response with memory and RAG, printing tokens as they arrive
+            seed = chat_session.current_seed
+            print_character_stream(
+                character['name'],
+                generate_response_stream(user_input, character, chat_session, seed)
             )
+            result = chat_session.last_result
             
-            # Log the interaction
+            # Log the interaction with exactly the memories the response used
             log_interaction(
                 character_name=character['name'],
                 user_input=user_input,
-                response=response,
-                seed=seed,
-                memories_used=memories_used
+                response=result.response,
+                seed=result.seed,
+                memories_used=result.memories_used,
+                memory_added=result.memory_added
             )
             
     except KeyboardInterrupt:
         print("\n")
         print_system_message(f"Conversation with {character['name']} ended.")
+    
+    # Summarize whatever the consolidation policy hasn't yet
+    try:
+        chat_session.end_session()
+    except Exception as e:
+        print_system_message(f"Could not save this conversation to memory: {e}")
+    stats = chat_session.stats
+    print_system_message(
+        f"Memory: {stats['consolidations']} summaries over {stats['turns']} turns "
+        f"({stats['llm_calls_saved']} LLM calls saved)"
+    )
+    prompt_stats = prompt_builder.stats()
+    print_system_message(
+        f"Prompt cache: {prompt_stats['prefix_hit_ratio']:.0%} persona prefix hits, "
+        f"{prompt_stats['prompt_reuse_ratio']:.0%} of prompt text reused from the previous turn"
+    )
 
 
 def main():
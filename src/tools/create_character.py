@@ -1,7 +1,7 @@
 from typing import Dict, List, Optional
 from src.generator.character_generator import generate_character
+from src.storage.storage_loader import save_character
 import json
-import os
 import re
 import random
 import argparse
@@ -91,14 +91,7 @@ def main():
     print("\n=== CLEANED CHARACTER ===\n")
     print(json.dumps(persona, indent=2, ensure_ascii=False))
 
-    # Create data directory if it doesn't exist
-    os.makedirs("data/characters", exist_ok=True)
-    
-    filename = persona["name"].lower().replace(" ", "_")
-    output_path = os.path.join("data/characters", f"{filename}.json")
-
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(persona, f, indent=2, ensure_ascii=False)
+    output_path = save_character(persona)
 
     print(f"\nCharacter saved to {output_path}")
 
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from src.generator.backends import FakeBackend
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """v1/completions and v1/models, as served by text-generation-webui"""
+    # Keep-alive, like the real server (the LLM connection pool relies on it)
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; without this, delayed ACKs add ~40 ms per response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.fake.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: Dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/v1/models":
+            self._send_json(200, {"object": "list", "data": [{"id": "fake", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        fake = self.server.fake
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "Request body is not JSON"}})
+            return
+        if self.path.rstrip("/") != "/v1/completions":
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        error_status = fake.inject_error()
+        if error_status:
+            self._send_json(error_status, {"error": {"message": "Injected error", "type": "server_error"}})
+            return
+
+        prompts = payload.get("prompt", "")
+        prompts = prompts if isinstance(prompts, list) else [prompts]
+        max_tokens = int(payload.get("max_tokens", 16))
+        seed = payload.get("seed", -1)
+        if seed is None or seed < 0:
+            # Like a real sampler, unseeded requests differ from call to call
+            seed = random.randrange(2 ** 31)
+        texts = [fake.backend.completion_text(prompt, max_tokens, seed) for prompt in prompts]
+
+        if payload.get("stream"):
+            self._stream(texts[0])
+        else:
+            self._complete(texts)
+
+    def _complete(self, texts: List[str]) -> None:
+        fake = self.server.fake
+        fake.wait(max(len(text.split()) for text in texts))
+        self._send_json(200, {
+            "id": f"cmpl-fake-{fake.count('completions')}",
+            "object": "text_completion",
+            "created": int(time.time()),
+            "model": "fake",
+            "choices": [{"index": i, "text": text, "finish_reason": "length"} for i, text in enumerate(texts)],
+            "usage": {"completion_tokens": sum(len(text.split()) for text in texts)}
+        })
+
+    def _stream(self, text: str) -> None:
+        fake = self.server.fake
+        fake.count("streams")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        fake.wait(0)
+        for i, word in enumerate(text.split(" ")):
+            if fake.tokens_per_second:
+                time.sleep(1 / fake.tokens_per_second)
+            event = {"choices": [{"index": 0, "text": word if i == 0 else f" {word}", "finish_reason": None}]}
+            self._send_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+        self._send_chunk(b"data: [DONE]\n\n")
+        self._send_chunk(b"")
+
+
+class FakeLLMServer:
+    """
+    Local OpenAI-compatible stand-in for text-generation-webui, for
+    benchmarks and offline development.
+
+    Text comes from FakeBackend, so a seeded prompt always gets the same
+    completion. Each request waits `latency` seconds plus 1/`tokens_per_second`
+    per generated word (streams emit words at that rate), and
+    a fraction `error_rate` of requests fail with `error_status`, drawn
+    from a seeded RNG so failure patterns are reproducible.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5000, latency: float = 0.0,
+                 tokens_per_second: Optional[float] = None, error_rate: float = 0.0,
+                 error_status: int = 500, error_seed: int = 0, verbose: bool = False):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.verbose = verbose
+        self.backend = FakeBackend(latency=0)
+        self._errors = random.Random(error_seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"completions": 0, "streams": 0, "errors": 0}
+
+        self.httpd = ThreadingHTTPServer((host, port), FakeLLMHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self
+
+    @property
+    def port(self) -> int:
+        """Bound port (useful with port 0)"""
+        return self.httpd.server_address[1]
+
+    def count(self, stat: str) -> int:
+        with self._lock:
+            self.stats[stat] += 1
+            return self.stats[stat]
+
+    def inject_error(self) -> Optional[int]:
+        """Status of an injected failure for this request, or None"""
+        with self._lock:
+            if self.error_rate and self._errors.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return self.error_status
+        return None
+
+    def wait(self, tokens: int) -> None:
+        """Simulate time to first token plus generating `tokens` tokens"""
+        delay = self.latency + (tokens / self.tokens_per_second if self.tokens_per_second else 0)
+        if delay:
+            time.sleep(delay)
+
+    def start(self) -> "FakeLLMServer":
+        """Serve on a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self.httpd.serve_forever()
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake OpenAI-compatible completions API")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=5000, help="Port (the default VIBE_LLM_PORT)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before the first token")
+    parser.add_argument("--tps", type=float, help="Generated tokens (words) per second")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail (0-1)")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected failures")
+    parser.add_argument("--error-seed", type=int, default=0, help="Seed of the failure pattern")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(args.host, args.port, args.latency, args.tps, args.error_rate,
+                           args.error_status, args.error_seed, args.verbose)
+    print(f"Fake LLM server on http://{args.host}:{server.port}/v1 "
+          f"(latency {args.latency} s, {args.tps or 'unlimited'} tokens/s, error rate {args.error_rate})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
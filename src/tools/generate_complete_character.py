@@ -6,6 +6,7 @@ from colorama import init, Fore, Style
 from src.tools.create_character import generate_ocean_profile, clean_output
 from src.generator.character_generator import generate_character
 from src.tools.character_card import create_character_card
+from src.storage.storage_loader import save_character
 
 def print_header(text):
     """Print a styled header"""
@@ -46,15 +47,9 @@ def generate_complete_character():
     print_header("Character Profile")
     print(json.dumps(persona, indent=2, ensure_ascii=False))
 
-    # Create data directory if it doesn't exist
-    os.makedirs(args.output_dir, exist_ok=True)
-    
     # Save character data
     name_slug = persona["name"].lower().replace(" ", "_")
-    character_path = os.path.join(args.output_dir, f"{name_slug}.json")
-    
-    with open(character_path, 'w', encoding='utf-8') as f:
-        json.dump(persona, f, indent=2, ensure_ascii=False)
+    character_path = save_character(persona, args.output_dir, name_slug)
     
     print_success(f"Character saved to {character_path}")
 
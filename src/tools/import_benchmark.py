@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List, Tuple
+
+
+# Cumulative import budget per entry point, in milliseconds
+DEFAULT_BUDGETS_MS = {
+    "src.generator.llm_loader": 150,
+    "src.tools.create_character": 250,
+    "src.tools.chat_interface": 600,
+    "src.api.main": 2000,
+}
+
+# Heavy backends that must only be imported when a local-model backend is selected
+FORBIDDEN_MODULES = ("torch", "transformers", "lmstudio", "llama_cpp", "accelerate")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Parse `python -X importtime` output.
+
+    Returns:
+        List of (module, self_us, cumulative_us, depth)
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def measure_import(module: str, runs: int = 3) -> Dict:
+    """
+    Import `module` in fresh interpreters and report the fastest run.
+
+    Returns:
+        Dict with cumulative time (ms), slowest direct dependencies and forbidden modules imported
+    """
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, cwd=os.getcwd()
+        )
+        if result.returncode != 0:
+            return {"module": module, "error": result.stderr.strip().splitlines()[-1:]}
+
+        entries = parse_importtime(result.stderr)
+        cumulative = next((cum for name, _, cum, depth in entries if name == module and depth == 0), 0)
+        if best is None or cumulative < best[0]:
+            best = (cumulative, entries)
+
+    cumulative, entries = best
+    imported = {name.split(".")[0] for name, _, _, _ in entries}
+    slowest = sorted(((cum, name) for name, _, cum, depth in entries if depth == 1), reverse=True)[:5]
+    return {
+        "module": module,
+        "cumulative_ms": round(cumulative / 1000, 1),
+        "slowest": [{"module": name, "cumulative_ms": round(cum / 1000, 1)} for cum, name in slowest],
+        "forbidden": sorted(imported.intersection(FORBIDDEN_MODULES))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import time of CLI and server entry points")
+    parser.add_argument("modules", nargs="*", help="Modules to check (default: all budgeted entry points)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreter runs per module (best is kept)")
+    parser.add_argument("--budget", type=float, help="Budget in ms applied to every module")
+    parser.add_argument("--json", action="store_true", help="Print a machine-readable report")
+    args = parser.parse_args()
+
+    modules = args.modules or list(DEFAULT_BUDGETS_MS)
+    report = []
+    failed = False
+
+    for module in modules:
+        result = measure_import(module, args.runs)
+        budget = args.budget or DEFAULT_BUDGETS_MS.get(module)
+        result["budget_ms"] = budget
+        result["ok"] = (
+            "error" not in result
+            and not result["forbidden"]
+            and (budget is None or result["cumulative_ms"] <= budget)
+        )
+        failed = failed or not result["ok"]
+        report.append(result)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for result in report:
+            status = "OK  " if result["ok"] else "FAIL"
+            if "error" in result:
+                print(f"{status} {result['module']}: import failed: {' '.join(result['error'])}")
+                continue
+            print(f"{status} {result['module']}: {result['cumulative_ms']} ms (budget {result['budget_ms']} ms)")
+            for dependency in result["slowest"]:
+                print(f"       {dependency['module']}: {dependency['cumulative_ms']} ms")
+            if result["forbidden"]:
+                print(f"       heavy modules imported: {', '.join(result['forbidden'])}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import atexit
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.utils.metrics import registry
+
+
+LOG_WRITE_SECONDS = registry.histogram("vibe_log_write_seconds", "Time to write one batch of entries to one log")
+
+_FLUSH = object()
+_STOP = object()
+
+
+class BackgroundLogWriter:
+    """
+    Writes log entries from a worker thread so logging never blocks the chat loop.
+
+    Entries are queued with `submit` and written in batches (grouped by log
+    path) once `batch_size` entries are pending or `flush_interval` seconds
+    have passed. Pending entries are flushed on `close`, which is registered
+    with atexit. If the queue is full, new entries are dropped and counted
+    rather than blocking the caller.
+    """
+
+    def __init__(self, sink: Callable[[str, List[Dict[str, Any]]], None],
+                 max_queue: int = 10000, batch_size: int = 100, flush_interval: float = 0.5):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        # Held while checking `_closed` and queueing, so nothing is queued behind _STOP
+        self._lock = threading.Lock()
+        self._closed = False
+        self.counters = {"queued": 0, "written": 0, "dropped": 0, "batches": 0, "errors": 0}
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def submit(self, log_path: str, entry: Dict[str, Any]) -> bool:
+        """
+        Queue an entry for `log_path` without blocking.
+
+        Returns:
+            False if the entry was dropped because the queue is full or the writer is closed
+        """
+        with self._lock:
+            if self._closed:
+                self.counters["dropped"] += 1
+                return False
+            self._ensure_started()
+            try:
+                self._queue.put_nowait((log_path, entry))
+            except queue.Full:
+                self.counters["dropped"] += 1
+                return False
+            self.counters["queued"] += 1
+            return True
+
+    def flush(self) -> None:
+        """Block until every entry queued so far has been written (no-op once closed)"""
+        with self._lock:
+            if self._closed or self._thread is None or not self._thread.is_alive():
+                return
+            self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self) -> None:
+        """Flush pending entries and stop the worker thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._thread is None:
+                return
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters plus the number of entries currently waiting to be written"""
+        return dict(self.counters, pending=self._queue.qsize())
+
+    def _write(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        by_path: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for log_path, entry in batch:
+            by_path[log_path].append(entry)
+        for log_path, entries in by_path.items():
+            try:
+                with LOG_WRITE_SECONDS.time():
+                    self.sink(log_path, entries)
+                self.counters["written"] += len(entries)
+            except Exception as e:
+                self.counters["errors"] += 1
+                print(f"Error writing log {log_path}: {e}")
+        self.counters["batches"] += 1
+
+    def _run(self) -> None:
+        batch: List[Tuple[str, Dict[str, Any]]] = []
+        markers = 0
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            force = item is None
+            if item is _FLUSH or item is _STOP:
+                markers += 1
+                force = True
+                stopping = item is _STOP
+            elif item is not None:
+                batch.append(item)
+
+            if batch and (force or len(batch) >= self.batch_size):
+                self._write(batch)
+                for _ in batch:
+                    self._queue.task_done()
+                batch = []
+            if force:
+                for _ in range(markers):
+                    self._queue.task_done()
+                markers = 0
+                deadline = time.monotonic() + self.flush_interval
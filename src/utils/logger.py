@@ -2,8 +2,143 @@ import json
 import os
 from datetime import datetime
 from typing import Dict, List, Any, Optional
+from src.utils.log_writer import BackgroundLogWriter
+from src.utils.tracing import traced
+from src.storage.storage_loader import get_storage
 
 
+LOG_DIR = "logs"
+
+# Legacy .json logs that have already been checked for migration in this process
+_migrated_paths = set()
+
+
+def append_log_entries(log_path: str, entries: List[Dict[str, Any]]) -> None:
+    """
+    Append entries to a JSON Lines log (one JSON object per line).
+    
+    Cost is constant per entry regardless of log size, and a crash can at most
+    leave one partial trailing line, which read_log skips. That line is
+    terminated before the next append so it doesn't swallow the next entry.
+    """
+    _migrate_legacy_log(log_path)
+    os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+    
+    data = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries).encode("utf-8")
+    with open(log_path, "a+b") as f:
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                data = b"\n" + data
+        f.write(data)
+
+
+def read_log(log_path: str) -> List[Dict[str, Any]]:
+    """
+    Read a log as a list of entries from the configured storage backend.
+    """
+    return get_storage().read_log(log_path)
+
+
+def read_jsonl_log(log_path: str) -> List[Dict[str, Any]]:
+    """
+    Read a JSON Lines log as a list of entries (the old whole-file list view).
+    
+    Falls back to the legacy .json file if the log has not been migrated yet.
+    """
+    legacy_path = os.path.splitext(log_path)[0] + ".json"
+    if not os.path.exists(log_path) and os.path.exists(legacy_path):
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return []
+    
+    entries = []
+    if os.path.exists(log_path):
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # Truncated line from an interrupted write
+    return entries
+
+
+def migrate_json_log(legacy_path: str) -> Optional[str]:
+    """
+    Convert a legacy JSON-array log into JSON Lines.
+    
+    Entries are written ahead of anything already in the .jsonl file and the
+    legacy file is renamed to `<name>.json.migrated`.
+    
+    Returns:
+        Path of the JSON Lines log, or None if there was nothing to migrate
+    """
+    if not os.path.exists(legacy_path):
+        return None
+    
+    log_path = os.path.splitext(legacy_path)[0] + ".jsonl"
+    try:
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            legacy_entries = json.load(f)
+    except json.JSONDecodeError:
+        legacy_entries = []
+    
+    existing = ""
+    if os.path.exists(log_path):
+        with open(log_path, "r", encoding="utf-8") as f:
+            existing = f.read()
+    
+    tmp_path = log_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for entry in legacy_entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        f.write(existing)
+    os.replace(tmp_path, log_path)
+    os.replace(legacy_path, legacy_path + ".migrated")
+    
+    return log_path
+
+
+def migrate_logs(log_dir: str = LOG_DIR) -> List[str]:
+    """
+    One-shot migration of every legacy .json log under `log_dir` to JSON Lines.
+    
+    Returns:
+        Paths of the migrated JSON Lines logs
+    """
+    migrated = []
+    for root, _, files in os.walk(log_dir):
+        for name in files:
+            if name.endswith(".json"):
+                log_path = migrate_json_log(os.path.join(root, name))
+                if log_path:
+                    migrated.append(log_path)
+    return migrated
+
+
+def _migrate_legacy_log(log_path: str) -> None:
+    """Migrate the legacy .json file next to `log_path` the first time it is written"""
+    if log_path in _migrated_paths:
+        return
+    _migrated_paths.add(log_path)
+    migrate_json_log(os.path.splitext(log_path)[0] + ".json")
+
+
+def write_log_entries(log_path: str, entries: List[Dict[str, Any]]) -> None:
+    """Write entries to the configured storage backend"""
+    get_storage().append_logs(log_path, entries)
+
+
+# Log entries are written off the chat hot path by a background thread
+log_writer = BackgroundLogWriter(write_log_entries)
+
+
+@traced("log.interaction")
 def log_interaction(
     character_name: str, 
     user_input: str, 
@@ -36,45 +171,12 @@ def log_interaction(
         }
     }
 
-    # Create character-specific log directory
-    log_dir = os.path.join("logs", character_name.lower().replace(" ", "_"))
-    log_path = os.path.join(log_dir, "interaction_log.json")
-    
-    # Create logs directory if it doesn't exist
-    os.makedirs(log_dir, exist_ok=True)
-
-    # Append to log
-    if os.path.exists(log_path):
-        try:
-            with open(log_path, "r", encoding="utf-8") as f:
-                logs = json.load(f)
-        except json.JSONDecodeError:
-            # If file is corrupted, start fresh
-            logs = []
-    else:
-        logs = []
-
-    logs.append(log_entry)
-
-    with open(log_path, "w", encoding="utf-8") as f:
-        json.dump(logs, f, ensure_ascii=False, indent=2)
+    # Character-specific log
+    log_dir = os.path.join(LOG_DIR, character_name.lower().replace(" ", "_"))
+    log_writer.submit(os.path.join(log_dir, "interaction_log.jsonl"), log_entry)
         
     # Also save to master log
-    master_log_path = os.path.join("logs", "vibe_log.json")
-    
-    if os.path.exists(master_log_path):
-        try:
-            with open(master_log_path, "r", encoding="utf-8") as f:
-                master_logs = json.load(f)
-        except json.JSONDecodeError:
-            master_logs = []
-    else:
-        master_logs = []
-        
-    master_logs.append(log_entry)
-    
-    with open(master_log_path, "w", encoding="utf-8") as f:
-        json.dump(master_logs, f, ensure_ascii=False, indent=2)
+    log_writer.submit(os.path.join(LOG_DIR, "vibe_log.jsonl"), log_entry)
 
 
 def log_memory_creation(character_name: str, memory_content: str, importance: float, seed: int):
@@ -96,19 +198,4 @@ def log_memory_creation(character_name: str, memory_content: str, importance: fl
         "seed": seed
     }
     
-    memory_log_path = os.path.join("logs", "memory_log.json")
-    os.makedirs(os.path.dirname(memory_log_path), exist_ok=True)
-    
-    if os.path.exists(memory_log_path):
-        try:
-            with open(memory_log_path, "r", encoding="utf-8") as f:
-                logs = json.load(f)
-        except json.JSONDecodeError:
-            logs = []
-    else:
-        logs = []
-        
-    logs.append(log_entry)
-    
-    with open(memory_log_path, "w", encoding="utf-8") as f:
-        json.dump(logs, f, ensure_ascii=False, indent=2)
+    log_writer.submit(os.path.join(LOG_DIR, "memory_log.jsonl"), log_entry)
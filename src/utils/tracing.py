@@ -0,0 +1,268 @@
+import os
+import json
+import time
+import atexit
+import inspect
+import functools
+import itertools
+import threading
+import contextvars
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Span:
+    """One timed step; spans started inside it (in the same context) become its children"""
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.span_id = next(tracer._ids)
+        self.parent_id: Optional[int] = None
+        self.start_ns = 0
+        self.end_ns = 0
+        self.thread_id = 0
+        self._token = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set(self, **attrs) -> None:
+        """Add attributes, e.g. results only known inside the span"""
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        parent = _current.get()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.thread_id = threading.get_ident()
+        self._token = _current.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.perf_counter_ns()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer.export(self)
+
+
+class _NoopSpan:
+    """Returned while tracing is disabled, so instrumented code costs one attribute check"""
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+# The innermost open span of the running thread or asyncio task
+_current: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("vibe_span", default=None)
+
+
+class JsonlExporter:
+    """Appends one JSON object per finished span to `path`"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span, start: float) -> None:
+        line = json.dumps({
+            "name": span.name,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "start": round(start, 6),
+            "duration_ms": round(span.duration_ms, 3),
+            "pid": os.getpid(),
+            "thread": span.thread_id,
+            "attrs": span.attrs,
+        }, ensure_ascii=False, default=str)
+        with self._lock:
+            # Spans still open when tracing stops are dropped
+            if not self._file.closed:
+                self._file.write(line + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class ChromeTraceExporter:
+    """
+    Collects spans as Chrome trace "complete" events and writes them to
+    `path` on close, for chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._events: List[Dict] = []
+        self._lock = threading.Lock()
+        self._epoch_ns = time.perf_counter_ns()
+
+    def export(self, span: Span, start: float) -> None:
+        event = {
+            "name": span.name,
+            "ph": "X",
+            "ts": (span.start_ns - self._epoch_ns) / 1e3,
+            "dur": (span.end_ns - span.start_ns) / 1e3,
+            "pid": os.getpid(),
+            "tid": span.thread_id,
+            "args": dict(span.attrs, span_id=span.span_id, parent_id=span.parent_id),
+        }
+        with self._lock:
+            self._events.append(event)
+
+    def close(self) -> None:
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+
+
+def create_exporter(path: str):
+    """Chrome trace for .json paths, JSON Lines otherwise"""
+    return ChromeTraceExporter(path) if path.endswith(".json") else JsonlExporter(path)
+
+
+class Tracer:
+    """
+    Span tracing for the chat pipeline (memory retrieval, prompt building,
+    LLM calls, consolidation, logging).
+
+    Disabled by default: `span()` then returns a shared no-op span and
+    `@traced` functions are called directly. Enable with VIBE_TRACE=<path>
+    (or `enable(path)`): spans go to a JSON Lines file, or a Chrome trace
+    if the path ends in .json.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.exporters: List = []
+        self._ids = itertools.count(1)
+        # Wall-clock time of perf_counter 0, so span starts need no extra clock read
+        self._wall_offset = time.time() - time.perf_counter_ns() / 1e9
+        self._lock = threading.Lock()
+
+    def enable(self, path: str) -> None:
+        """Start exporting spans to `path` (in addition to any current exporters)"""
+        with self._lock:
+            self.exporters.append(create_exporter(path))
+            self.enabled = True
+
+    def close(self) -> None:
+        """Stop tracing and flush the exporters"""
+        with self._lock:
+            self.enabled = False
+            exporters, self.exporters = self.exporters, []
+        for exporter in exporters:
+            exporter.close()
+
+    def span(self, name: str, **attrs):
+        """Context manager timing the enclosed block as `name`"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attrs)
+
+    def export(self, span: Span) -> None:
+        start = self._wall_offset + span.start_ns / 1e9
+        for exporter in list(self.exporters):
+            exporter.export(span, start)
+
+
+tracer = Tracer()
+if os.environ.get("VIBE_TRACE"):
+    tracer.enable(os.environ["VIBE_TRACE"])
+atexit.register(tracer.close)
+
+
+def span(name: str, **attrs):
+    """Time the enclosed block as a span of the process-wide tracer"""
+    if not tracer.enabled:
+        return NOOP_SPAN
+    return Span(tracer, name, attrs)
+
+
+def current_span():
+    """The innermost open span, or a no-op span, for adding attributes from inside a traced function"""
+    return _current.get() or NOOP_SPAN
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """
+    Decorator recording each call as a span (defaults to the function's qualified name).
+
+    Works for plain and async functions; not for generators, whose body runs
+    after the call returns.
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return await func(*args, **kwargs)
+                with Span(tracer, span_name, {}):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with Span(tracer, span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bind_context(func: Callable) -> Callable:
+    """`func` run in a copy of the current context, so spans it opens on a worker thread keep their parent"""
+    if not tracer.enabled:
+        return func
+    return functools.partial(contextvars.copy_context().run, func)
+
+
+def keep_context(func: Callable) -> Callable:
+    """
+    Decorator for generator functions that keep spans open across yields.
+
+    Consumers may resume a generator from different contexts (Starlette's
+    iterate_in_threadpool runs each step in a fresh copy), which would break
+    span nesting and ContextVar.reset; while tracing is enabled, every step
+    runs in the one context copied when the generator was created.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        generator = func(*args, **kwargs)
+        if not tracer.enabled:
+            return generator
+        return _run_in_context(generator, contextvars.copy_context())
+    return wrapper
+
+
+def _run_in_context(generator, context: contextvars.Context):
+    try:
+        while True:
+            try:
+                item = context.run(next, generator)
+            except StopIteration:
+                return
+            yield item
+    finally:
+        # Closes an abandoned generator, exiting its open spans in their own context
+        context.run(generator.close)